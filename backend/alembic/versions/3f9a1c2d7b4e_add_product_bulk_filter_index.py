@@ -0,0 +1,30 @@
+"""Add composite index for bulk catalog analysis filter
+
+Revision ID: 3f9a1c2d7b4e
+Revises: 9c4e2b7d1a05
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "3f9a1c2d7b4e"
+down_revision = "9c4e2b7d1a05"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Matches bulk_analyze_catalog: is_active = true [AND category = ?] [AND rotation_index >= ?]
+    # if_not_exists: databases bootstrapped with init_db() already have it from the model
+    op.create_index(
+        "ix_product_bulk_filter",
+        "products",
+        ["is_active", "category", "rotation_index"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_bulk_filter", table_name="products", if_exists=True)
@@ -0,0 +1,148 @@
+"""Initial schema
+
+Revision ID: 9c4e2b7d1a05
+Revises:
+Create Date: 2026-10-16 00:00:00.000000
+
+Tables as created by init_db() before any migration existed. Databases that
+were bootstrapped with init_db() already have them: mark them as being at this
+revision with `alembic stamp 9c4e2b7d1a05`, then run `alembic upgrade head`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9c4e2b7d1a05"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sku", sa.String(length=50), nullable=False),
+        sa.Column("ml_id", sa.String(length=50), nullable=True),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("title", sa.String(length=500), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("brand", sa.String(length=100), nullable=True),
+        sa.Column("category", sa.String(length=200), nullable=True),
+        sa.Column("warehouse_location", sa.String(length=50), nullable=True),
+        sa.Column("ml_url", sa.String(length=500), nullable=True),
+        sa.Column("current_price", sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column("cost_price", sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column("cost", sa.DECIMAL(precision=10, scale=2), nullable=True),
+        sa.Column("min_margin_percent", sa.DECIMAL(precision=5, scale=2), nullable=True),
+        sa.Column("target_percentile", sa.Integer(), nullable=True),
+        sa.Column("current_stock", sa.Integer(), nullable=True),
+        sa.Column("rotation_index", sa.DECIMAL(precision=8, scale=2), nullable=True),
+        sa.Column("total_sales", sa.Integer(), nullable=True),
+        sa.Column("sales_oct_2025", sa.Integer(), nullable=True),
+        sa.Column("sales_nov_2025", sa.Integer(), nullable=True),
+        sa.Column("sales_dec_2025", sa.Integer(), nullable=True),
+        sa.Column("sales_jan_2026", sa.Integer(), nullable=True),
+        sa.Column("normalized_title", sa.String(length=500), nullable=True),
+        sa.Column("generic_description", sa.Text(), nullable=True),
+        sa.Column("attributes", sa.JSON(), nullable=True),
+        sa.Column("key_specs", sa.JSON(), nullable=True),
+        sa.Column("search_keywords", sa.Text(), nullable=True),
+        sa.Column("embedding", sa.Text(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_products_id", "products", ["id"])
+    op.create_index("ix_products_sku", "products", ["sku"], unique=True)
+    op.create_index("ix_products_ml_id", "products", ["ml_id"], unique=True)
+    op.create_index("ix_products_category", "products", ["category"])
+
+    op.create_table(
+        "competitor_products",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ml_id", sa.String(length=50), nullable=False),
+        sa.Column("seller_id", sa.String(length=50), nullable=True),
+        sa.Column("seller_name", sa.String(length=255), nullable=True),
+        sa.Column("title", sa.String(length=500), nullable=True),
+        sa.Column("category_id", sa.String(length=50), nullable=True),
+        sa.Column("attributes", sa.JSON(), nullable=True),
+        sa.Column("embedding", sa.Text(), nullable=True),
+        sa.Column("first_seen_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.Column("last_seen_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_competitor_products_id", "competitor_products", ["id"])
+    op.create_index("ix_competitor_products_ml_id", "competitor_products", ["ml_id"], unique=True)
+    op.create_index("ix_competitor_products_seller_id", "competitor_products", ["seller_id"])
+    op.create_index("ix_competitor_products_category_id", "competitor_products", ["category_id"])
+
+    op.create_table(
+        "price_snapshots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("louder_product_id", sa.Integer(), nullable=False),
+        sa.Column("competitor_product_id", sa.Integer(), nullable=False),
+        sa.Column("price", sa.DECIMAL(precision=10, scale=2), nullable=False),
+        sa.Column("stock_available", sa.Integer(), nullable=True),
+        sa.Column("shipping_free", sa.Boolean(), nullable=True),
+        sa.Column("seller_reputation", sa.JSON(), nullable=True),
+        sa.Column("similarity_score", sa.DECIMAL(precision=5, scale=4), nullable=True),
+        sa.Column("competition_level", sa.String(length=20), nullable=True),
+        sa.Column("snapshot_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["competitor_product_id"], ["competitor_products.id"]),
+        sa.ForeignKeyConstraint(["louder_product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_price_snapshots_id", "price_snapshots", ["id"])
+    op.create_index("ix_price_snapshots_louder_product_id", "price_snapshots", ["louder_product_id"])
+    op.create_index("ix_price_snapshots_competitor_product_id", "price_snapshots", ["competitor_product_id"])
+    op.create_index("ix_price_snapshots_snapshot_at", "price_snapshots", ["snapshot_at"])
+
+    op.create_table(
+        "pricing_recommendations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("recommended_price", sa.DECIMAL(precision=10, scale=2), nullable=False),
+        sa.Column("current_price", sa.DECIMAL(precision=10, scale=2), nullable=False),
+        sa.Column("current_percentile", sa.DECIMAL(precision=5, scale=2), nullable=True),
+        sa.Column("target_percentile", sa.Integer(), nullable=True),
+        sa.Column("competitors_analyzed", sa.Integer(), nullable=True),
+        sa.Column("price_stats", sa.JSON(), nullable=True),
+        sa.Column("reasoning", sa.Text(), nullable=True),
+        sa.Column("confidence", sa.String(length=20), nullable=True),
+        sa.Column("applied", sa.Boolean(), nullable=True),
+        sa.Column("generated_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_pricing_recommendations_id", "pricing_recommendations", ["id"])
+    op.create_index("ix_pricing_recommendations_product_id", "pricing_recommendations", ["product_id"])
+    op.create_index("ix_pricing_recommendations_generated_at", "pricing_recommendations", ["generated_at"])
+
+    op.create_table(
+        "scan_logs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("scan_type", sa.String(length=50), nullable=True),
+        sa.Column("products_scanned", sa.Integer(), nullable=True),
+        sa.Column("competitors_found", sa.Integer(), nullable=True),
+        sa.Column("errors", sa.JSON(), nullable=True),
+        sa.Column("duration_seconds", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=True),
+        sa.Column("started_at", sa.TIMESTAMP(), nullable=True),
+        sa.Column("completed_at", sa.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_scan_logs_id", "scan_logs", ["id"])
+    op.create_index("ix_scan_logs_scan_type", "scan_logs", ["scan_type"])
+
+
+def downgrade() -> None:
+    op.drop_table("scan_logs")
+    op.drop_table("pricing_recommendations")
+    op.drop_table("price_snapshots")
+    op.drop_table("competitor_products")
+    op.drop_table("products")
@@ -16,10 +16,10 @@ Architecture:
 import json
 import re
 from typing import Dict, Any, List, Optional
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from app.core.logging import get_logger
 from app.core.config import settings
+from app.core.llm_clients import get_llm
 from app.core.token_costs import get_tracker
 
 logger = get_logger(__name__)
@@ -45,7 +45,7 @@ class CatalogEnrichmentAgent:
             model: OpenAI model to use (gpt-4o-mini for speed/cost)
             temperature: Low temperature for consistency (0.1)
         """
-        self.llm = ChatOpenAI(model=model, temperature=temperature)
+        self.llm = get_llm(model, temperature)
         logger.info(
             "CatalogEnrichmentAgent initialized",
             model=model,
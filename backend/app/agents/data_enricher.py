@@ -10,7 +10,6 @@ This agent takes a product and enriches its data by:
 This enriched data is then used by SearchStrategyAgent to generate better search terms.
 """
 from typing import Dict, Any, List, Optional
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
@@ -19,6 +18,7 @@ import re
 import os
 
 from app.core.config import settings
+from app.core.llm_clients import get_llm
 from app.core.logging import get_logger
 from app.core.monitoring import track_agent_execution
 from app.core.token_costs import get_tracker
@@ -53,11 +53,7 @@ class DataEnricherAgent:
         """Initialize the data enricher agent."""
         # Dynamic API Key fetch (Crucial for Streamlit Local Mode where env is set late)
         api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
-        self.llm = ChatOpenAI(
-            model=model,
-            temperature=temperature,
-            api_key=api_key
-        )
+        self.llm = get_llm(model, temperature)
         logger.info(
             "DataEnricherAgent initialized",
             model=model,
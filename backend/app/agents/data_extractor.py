@@ -8,11 +8,11 @@ This agent extracts structured data from competitor listings:
 """
 from typing import TypedDict, List, Dict, Any, Optional
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.llm_clients import get_llm
 from app.core.logging import get_logger
 from app.core.monitoring import track_agent_execution
 from app.mcp_servers.mercadolibre import batch_get_prices_tool, get_product_details_tool
@@ -62,11 +62,7 @@ class DataExtractorAgent:
     """
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_MINI,
-            temperature=0.1,
-            api_key=settings.OPENAI_API_KEY
-        )
+        self.llm = get_llm(settings.OPENAI_MODEL_MINI, temperature=0.1)
         self.graph = self._build_graph()
     
     def _build_graph(self) -> StateGraph:
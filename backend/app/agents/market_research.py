@@ -8,12 +8,12 @@ This agent performs competitive research on Mercado Libre:
 """
 from typing import TypedDict, Annotated, List, Dict, Any
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.llm_clients import get_llm
 from app.core.logging import get_logger
 from app.core.monitoring import track_agent_execution
 from app.core.token_costs import get_tracker
@@ -61,11 +61,7 @@ class MarketResearchAgent:
     """
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_MINI,
-            temperature=0.3,
-            api_key=settings.OPENAI_API_KEY
-        )
+        self.llm = get_llm(settings.OPENAI_MODEL_MINI, temperature=0.3)
         self.graph = self._build_graph()
         
         # Check if ML API is enabled
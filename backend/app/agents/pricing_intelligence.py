@@ -8,13 +8,13 @@ This agent generates optimal pricing recommendations:
 """
 from typing import TypedDict, List, Dict, Any, Optional
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 import numpy as np
 from datetime import datetime
 
 from app.core.config import settings
+from app.core.llm_clients import get_llm
 from app.core.logging import get_logger
 from app.core.monitoring import track_agent_execution
 from app.mcp_servers.analytics import generate_recommendation_tool, calculate_stats_tool
@@ -72,11 +72,7 @@ class PricingIntelligenceAgent:
     """
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_MINI,
-            temperature=0.2,
-            api_key=settings.OPENAI_API_KEY
-        )
+        self.llm = get_llm(settings.OPENAI_MODEL_MINI, temperature=0.2)
         self.graph = self._build_graph()
     
     def _build_graph(self) -> StateGraph:
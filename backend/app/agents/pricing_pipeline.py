@@ -27,9 +27,10 @@ import re
 
 from app.core.logging import get_logger
 from app.core.monitoring import track_agent_execution
-from app.core.token_costs import get_tracker, reset_tracker
+from app.core.token_costs import get_tracker, tracking_scope
 from app.services.commission_calculator import CommissionCalculator
 from app.mcp_servers.mercadolibre.scraper import MLWebScraper, ProductDetails
+from curl_cffi.requests import AsyncSession
 from app.mcp_servers.mercadolibre.stats import get_price_recommendation_data
 from app.agents.product_matching import ProductMatchingAgent
 from app.agents.pricing_intelligence import PricingIntelligenceAgent
@@ -81,15 +82,33 @@ class PricingPipeline:
     └─────────────────────────────────────┘
     """
     
-    def __init__(self):
-        self.scraper = MLWebScraper()
-        self.search_strategy_agent = SearchStrategyAgent()
+    def __init__(
+        self,
+        search_complexity_threshold: Optional[int] = None,
+        scraper_session: Optional[AsyncSession] = None
+    ):
+        """
+        Args:
+            search_complexity_threshold: Attribute count up to which the search
+                strategy skips the LLM (None or 0 = always use the LLM, the default).
+                Bulk catalog runs set it to route simple products to the cheap path.
+            scraper_session: Optional shared curl_cffi session for all Mercado Libre
+                fetches (see create_scraper_session); owned and closed by the caller.
+        """
+        self.scraper = MLWebScraper(session=scraper_session)
+        self.search_strategy_agent = SearchStrategyAgent(
+            complexity_threshold=search_complexity_threshold
+        )
         self.data_enricher_agent = DataEnricherAgent()
         self.matching_agent = ProductMatchingAgent()
         self.pricing_agent = PricingIntelligenceAgent()
         
         logger.info("PricingPipeline initialized with DataEnricherAgent")
     
+    async def aclose(self) -> None:
+        """Release the scraper's own HTTP session (a shared scraper_session stays open)."""
+        await self.scraper.aclose()
+    
     def _is_product_url(self, input_str: str) -> bool:
         """Check if input is a Mercado Libre product URL."""
         return bool(re.search(r"mercadolibre\.com\.", input_str))
@@ -124,14 +143,17 @@ class PricingPipeline:
         # Determine if input is URL or description
         is_url = self._is_product_url(product_input)
         
-        if is_url:
-            return await self._analyze_from_url(
-                product_input, max_offers, cost_price, target_margin, price_tolerance
-            )
-        else:
-            return await self._analyze_from_description(
-                product_input, max_offers, cost_price, target_margin, price_tolerance
-            )
+        # Each analysis records its LLM calls on its own tracker, so concurrent
+        # analyses (bulk endpoints) neither mix nor reset each other's usage
+        with tracking_scope():
+            if is_url:
+                return await self._analyze_from_url(
+                    product_input, max_offers, cost_price, target_margin, price_tolerance
+                )
+            else:
+                return await self._analyze_from_description(
+                    product_input, max_offers, cost_price, target_margin, price_tolerance
+                )
     
     async def _analyze_from_url(
         self,
@@ -147,9 +169,6 @@ class PricingPipeline:
         This is the preferred method for branded products where you want to
         find similar items with different brands.
         """
-        # Reset token tracker for this analysis
-        reset_tracker()
-        
         logger.info(
             "Starting pricing analysis from product URL",
             url=product_url,
@@ -504,11 +523,12 @@ class PricingPipeline:
             logger.error(error_msg, exc_info=True)
             result["errors"].append(error_msg)
         
-        # Capture real token usage from tracker
+        # Capture real token usage from this analysis' tracker
         tracker = get_tracker()
         token_summary = tracker.get_summary()
         result["token_usage"] = {
             "input_tokens": token_summary["total_input_tokens"],
+            "cached_input_tokens": token_summary["total_cached_input_tokens"],
             "output_tokens": token_summary["total_output_tokens"],
             "total_tokens": token_summary["total_tokens"],
             "total_cost_usd": token_summary["total_cost_usd"],
@@ -546,9 +566,6 @@ class PricingPipeline:
         Note: Without pivot product URL, price filtering cannot be applied.
         Consider using URL-based analysis for better results.
         """
-        # Reset token tracker for this analysis
-        reset_tracker()
-        
         logger.info(
             "Starting complete pricing analysis",
             product=product_description,
@@ -666,11 +683,12 @@ class PricingPipeline:
             logger.error(f"Pipeline error: {str(e)}", exc_info=True)
             result["errors"].append(f"Pipeline failure: {str(e)}")
         
-        # Capture real token usage from tracker
+        # Capture real token usage from this analysis' tracker
         tracker = get_tracker()
         token_summary = tracker.get_summary()
         result["token_usage"] = {
             "input_tokens": token_summary["total_input_tokens"],
+            "cached_input_tokens": token_summary["total_cached_input_tokens"],
             "output_tokens": token_summary["total_output_tokens"],
             "total_tokens": token_summary["total_tokens"],
             "total_cost_usd": token_summary["total_cost_usd"],
@@ -747,4 +765,7 @@ async def quick_price_analysis(product: str) -> Dict[str, Any]:
         Analysis result
     """
     pipeline = PricingPipeline()
-    return await pipeline.analyze_product(product)
+    try:
+        return await pipeline.analyze_product(product)
+    finally:
+        await pipeline.aclose()
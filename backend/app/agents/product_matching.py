@@ -6,20 +6,33 @@ are comparable/relevant for pricing analysis.
 
 Responsibility: Filter and classify products, NOT scraping.
 """
-from typing import TypedDict, List, Dict, Any
+from collections import OrderedDict
+from typing import TypedDict, List, Dict, Any, Optional, Tuple
+import copy
+import hashlib
+import re
+import time
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import OpenAIEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 import numpy as np
 
 from app.core.config import settings
+from app.core.llm_clients import get_llm
 from app.core.logging import get_logger
 from app.core.monitoring import track_agent_execution
 from app.core.token_costs import get_tracker
 
 logger = get_logger(__name__)
 
+# Results of previous matching runs, keyed by a fingerprint of the full input.
+# Reruns over the same scraped offers (dashboard re-analysis, bulk retries) skip
+# the classification graph and its per-offer LLM/embedding calls.
+_MATCH_CACHE: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_MATCH_CACHE_MAX_ENTRIES = 128
+_MATCH_CACHE_TTL_SECONDS = 3600
+
 
 class ProductClassification(BaseModel):
     """Classification of a single product."""
@@ -30,6 +43,49 @@ class ProductClassification(BaseModel):
     is_bundle: bool = Field(description="Whether product is a bundle/kit")
     confidence: float = Field(description="Confidence score 0-1")
     reason: str = Field(description="Brief reason for classification")
+    degraded: bool = Field(default=False, description="Verdict came from a fallback (LLM error or unparseable reply)")
+
+
+# Heuristic patterns run for every offer (and the target) during classification;
+# compiled once here instead of going through re's pattern cache on each call.
+_RE_NON_ALNUM = re.compile(r'[^a-zA-Z0-9]')
+# Common spec units that look like model codes (8ohm, 500w, 12v, 1kg, ...)
+_RE_SPEC_TOKEN = re.compile(r'^\d+(?:ohm|w|v|kw|hp|kg|g|lb|oz|ml|l|m|cm|mm|in|ft|gb|tb|hz|khz|mah)$')
+_RE_SIGNIFICANT_TOKEN = re.compile(r'\b[a-z0-9]{3,}\b')
+_RE_STANDALONE_INT = re.compile(r'\b\d+\b')
+_RE_DIGITS = re.compile(r'\d+')
+_RE_JSON_ARRAY = re.compile(r'\[.*?\]', re.DOTALL)
+
+# Stop words for token overlap (simplified Spanish/English mix)
+_OVERLAP_STOP_WORDS = frozenset({'para', 'con', 'los', 'las', 'una', 'uno', 'del', 'por', 'que', 'for', 'with', 'the', 'and'})
+
+# (spec category, pattern) pairs for _extract_specs
+_SPEC_PATTERNS = (
+    # 1. Size (Inches/Pulgadas) - e.g. 8", 15 in
+    ("size", re.compile(r'\b(\d{1,2}(?:\.\d)?)\s?(?:"|in|pulg|pulgadas)\b')),
+    # 1.1 Implicit Audio Size (e.g. "Bocina 8", "Bafle 15")
+    # Matches number strictly following typical audio nouns
+    ("size", re.compile(r'\b(?:bocina|bafle|subwoofer|parlante|woofer|medio|driver)\s+(\d{1,2})\b')),
+    # 2. Power (Watts) - e.g. 500W, 1000 Watts
+    ("power", re.compile(r'\b(\d{2,5})\s?(?:w|watts|watt)\b')),
+    # 3. Capacity (Liters) - e.g. 5L, 20 litros
+    ("capacity", re.compile(r'\b(\d{1,3})\s?(?:l|lt|litros|liter)\b')),
+    # 4. Storage (GB/TB) - e.g. 256GB, 1TB
+    ("storage", re.compile(r'\b(\d{1,4})\s?(?:gb|tb|gigas)\b')),
+    # 5. Voltage (Volts) - e.g. 12V, 110V
+    ("voltage", re.compile(r'\b(\d{1,3})\s?(?:v|volts|volt)\b')),
+    # 6. Impedance (Ohms) - e.g. 4ohm, 8 ohms
+    ("impedance", re.compile(r'\b(\d{1,2})\s?(?:ohm|ohms|Ω)\b')),
+)
+
+
+def _offer_key(offer: Dict[str, Any]) -> str:
+    """Join key between raw offers and classifications: ML item_id, or title when missing."""
+    return offer.get("item_id") or offer.get("title", "")
+
+
+def _classification_key(classification: ProductClassification) -> str:
+    return classification.item_id or classification.title
 
 
 class ProductMatchingState(TypedDict):
@@ -41,6 +97,7 @@ class ProductMatchingState(TypedDict):
     classified_offers: List[ProductClassification]
     comparable_offers: List[Dict[str, Any]]  # Filtered comparable products
     excluded_count: int
+    degraded: bool  # A fallback path replaced an LLM/embedding step (result not cached)
     errors: List[str]
 
 
@@ -62,11 +119,7 @@ class ProductMatchingAgent:
         # Dynamic API Key fetch (Crucial for Streamlit Local Mode where env is set late)
         self.api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
         
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_MINI,
-            temperature=0.1,  # Low temperature for consistent classification
-            api_key=self.api_key
-        )
+        self.llm = get_llm(settings.OPENAI_MODEL_MINI, temperature=0.1)  # Low temperature for consistent classification
         # Initialize Embeddings (text-embedding-3-small)
         # Wrap in try-except to avoid total crash if key is missing (will rely on regex/heuristic)
         try:
@@ -130,18 +183,17 @@ class ProductMatchingAgent:
     
     def _extract_essential_keywords(self, text: str) -> List[str]:
         """Extract alphanumeric model numbers/codes (e.g. 'XM5', 'S23', 'A54', '500G', '14AWG')."""
-        import re
         tokens = text.split()
         keywords = []
         for token in tokens:
              # Look for tokens with mixed alpha/numbers or ALL CAPS longer than 2 chars (likely models)
              # e.g. "XM5", "G502", "iPhone", "S23"
-             clean = re.sub(r'[^a-zA-Z0-9]', '', token)
+             clean = _RE_NON_ALNUM.sub('', token)
              if len(clean) < 2: continue
              
              # Exclude common spec units that look like models
              # e.g. 8ohm, 500w, 12v, 1kg, 2m, 3d, 4k (maybe 4k is ambiguous, but usually spec)
-             if re.match(r'^\d+(?:ohm|w|v|kw|hp|kg|g|lb|oz|ml|l|m|cm|mm|in|ft|gb|tb|hz|khz|mah)$', clean.lower()):
+             if _RE_SPEC_TOKEN.match(clean.lower()):
                  continue
                  
              # Heuristics for "Model" keywords
@@ -157,11 +209,7 @@ class ProductMatchingAgent:
         """Calculate Jaccard similarity of significant tokens."""
         def clean_tokens(text):
             # Simple tokenization: lowercase, alpha-numeric, >2 chars
-            import re
-            tokens = re.findall(r'\b[a-z0-9]{3,}\b', text.lower())
-            # Stop words (simplified Spanish/English mix)
-            stop_words = {'para', 'con', 'los', 'las', 'una', 'uno', 'del', 'por', 'que', 'for', 'with', 'the', 'and'}
-            return set(t for t in tokens if t not in stop_words)
+            return set(_RE_SIGNIFICANT_TOKEN.findall(text.lower())) - _OVERLAP_STOP_WORDS
             
         set1 = clean_tokens(s1)
         set2 = clean_tokens(s2)
@@ -175,7 +223,6 @@ class ProductMatchingAgent:
 
     def _extract_specs(self, text: str) -> Dict[str, set]:
         """Extract explicit specifications like size, power, capacity, etc."""
-        import re
         specs = {
             "size": set(),      # Inches, cm
             "power": set(),     # Watts
@@ -187,37 +234,9 @@ class ProductMatchingAgent:
         }
         text = text.lower()
         
-        # Regex Helpers
-        def add_matches(category, pattern):
-            matches = re.findall(pattern, text)
-            for m in matches:
-                # Store normalized value if possible, or raw
-                specs[category].add(m)
-
-        # 1. Size (Inches/Pulgadas) - e.g. 8", 15 in
-        add_matches("size", r'\b(\d{1,2}(?:\.\d)?)\s?(?:"|in|pulg|pulgadas)\b')
-        
-        # 1.1 Implicit Audio Size (e.g. "Bocina 8", "Bafle 15")
-        # Matches number strictly following typical audio nouns
-        add_matches("size", r'\b(?:bocina|bafle|subwoofer|parlante|woofer|medio|driver)\s+(\d{1,2})\b')
-        
-        # 2. Power (Watts) - e.g. 500W, 1000 Watts
-        add_matches("power", r'\b(\d{2,5})\s?(?:w|watts|watt)\b')
-        
-        # 3. Capacity (Liters) - e.g. 5L, 20 litros
-        add_matches("capacity", r'\b(\d{1,3})\s?(?:l|lt|litros|liter)\b')
-        
-        # 4. Storage (GB/TB) - e.g. 256GB, 1TB
-        add_matches("storage", r'\b(\d{1,4})\s?(?:gb|tb|gigas)\b')
-        
-        # 5. Voltage (Volts) - e.g. 12V, 110V
-        add_matches("voltage", r'\b(\d{1,3})\s?(?:v|volts|volt)\b')
-        
-        # 6. Impedance (Ohms) - e.g. 4ohm, 8 ohms
-        add_matches("impedance", r'\b(\d{1,2})\s?(?:ohm|ohms|Ω)\b')
-        
-        # 6. Impedance (Ohms) - e.g. 4ohm, 8 ohms
-        add_matches("impedance", r'\b(\d{1,2})\s?(?:ohm|ohms|Ω)\b')
+        for category, pattern in _SPEC_PATTERNS:
+            # Store normalized value if possible, or raw
+            specs[category].update(pattern.findall(text))
         
         return specs
 
@@ -228,7 +247,7 @@ class ProductMatchingAgent:
         This protects against "Bocina 8" matching "Bocina Búho" (no numbers).
         """
         # Find standalone digits in target
-        target_digits = set(re.findall(r'\b\d+\b', target))
+        target_digits = set(_RE_STANDALONE_INT.findall(target))
         
         # Determine "Significant" digits (avoid 1, 2 which might be packs?)
         # Actually, for sizes/models, numbers are usually key.
@@ -239,7 +258,7 @@ class ProductMatchingAgent:
             
         # Find ALL digits in offer (even non-standalone, effectively)
         # We want to be lenient on the offer side: "8" in target matches "8ohm" or "8in" or "8" in offer.
-        offer_digits_flat = re.findall(r'\d+', offer)
+        offer_digits_flat = _RE_DIGITS.findall(offer)
         offer_digits = set(offer_digits_flat)
         
         # Check intersection
@@ -418,6 +437,7 @@ Output JSON: { "classification": "comparable"|"accessory"|"bundle"|"not_comparab
                 cat = data.get("classification", "not_comparable")
                 conf = data.get("confidence", 0.5)
                 reason = data.get("reason", "LLM decision")
+                degraded = False
             except:
                  # Fallback parser
                  if "comparable" in content: cat = "comparable"
@@ -426,6 +446,7 @@ Output JSON: { "classification": "comparable"|"accessory"|"bundle"|"not_comparab
                  else: cat = "not_comparable"
                  conf = 0.6
                  reason = "Regex fallback"
+                 degraded = True
 
             is_comparable = (cat == "comparable")
             is_accessory = (cat == "accessory")
@@ -438,11 +459,13 @@ Output JSON: { "classification": "comparable"|"accessory"|"bundle"|"not_comparab
                 is_accessory=is_accessory,
                 is_bundle=is_bundle,
                 confidence=conf,
-                reason=reason
+                reason=reason,
+                degraded=degraded
             )
             
         except Exception as e:
             # Fallback heuristic
+            logger.warning(f"LLM classification failed, using heuristic fallback: {e}")
             return self._heuristic_fallback(target, offer)
 
     def _heuristic_fallback(self, target: str, offer: Dict[str, Any]) -> ProductClassification:
@@ -468,7 +491,8 @@ Output JSON: { "classification": "comparable"|"accessory"|"bundle"|"not_comparab
             is_accessory=is_accessory,
             is_bundle=is_bundle,
             confidence=0.5,
-            reason="Heuristic Fallback"
+            reason="Heuristic Fallback",
+            degraded=True
         )
 
     @track_agent_execution("product_matching_classify")
@@ -501,12 +525,14 @@ Output JSON: { "classification": "comparable"|"accessory"|"bundle"|"not_comparab
         # --- EMBEDDING PRE-CALCULATION ---
         # 1. Embed Target Product ONCE
         target_embedding = []
-        try:
-            target_str = f"{target}"
-            target_embedding = await self.embeddings.aembed_query(target_str)
-            logger.info("Computed embedding for target product")
-        except Exception as e:
-            logger.error(f"Failed to embed target: {e}")
+        if self.embeddings is not None:
+            try:
+                target_str = f"{target}"
+                target_embedding = await self.embeddings.aembed_query(target_str)
+                logger.info("Computed embedding for target product")
+            except Exception as e:
+                logger.error(f"Failed to embed target: {e}")
+                state["degraded"] = True  # Semantic pre-filter skipped for this run
 
         async def sem_task(offer):
              async with semaphore:
@@ -543,6 +569,8 @@ Output JSON: { "classification": "comparable"|"accessory"|"bundle"|"not_comparab
         all_classifications = await asyncio.gather(*tasks)
         
         state["classified_offers"] = all_classifications
+        if any(c.degraded for c in all_classifications):
+            state["degraded"] = True
         
         logger.info(
             "Classification completed",
@@ -624,9 +652,8 @@ PRODUCTOS A VALIDAR:
             
             # Parse response - expect array of booleans or confidence scores
             import json
-            import re
             
-            json_match = re.search(r'\[.*?\]', response.content, re.DOTALL)
+            json_match = _RE_JSON_ARRAY.search(response.content)
             if json_match:
                 validities = json.loads(json_match.group(0))
                 
@@ -649,6 +676,7 @@ PRODUCTOS A VALIDAR:
         
         except Exception as e:
             logger.warning(f"Equivalence validation failed: {e}. Keeping original classifications.")
+            state["degraded"] = True
         
         return state
     
@@ -665,13 +693,13 @@ PRODUCTOS A VALIDAR:
         raw_offers = state["raw_offers"]
         
         # PASS 1: Get strict comparables (LLM said YES)
-        comparable_titles = {
-            c.title for c in classified if c.is_comparable
+        comparable_keys = {
+            _classification_key(c) for c in classified if c.is_comparable
         }
         
         comparable_offers = [
             o for o in raw_offers
-            if o['title'] in comparable_titles
+            if _offer_key(o) in comparable_keys
         ]
         
         # PASS 2: If no strict comparables, try uncertain ones (LLM had low confidence)
@@ -682,14 +710,14 @@ PRODUCTOS A VALIDAR:
             )
             
             # Find products where LLM was uncertain (low confidence)
-            uncertain_titles = {
-                c.title for c in classified 
+            uncertain_keys = {
+                _classification_key(c) for c in classified 
                 if not c.is_comparable and c.confidence < 0.7  # Uncertain rejection
             }
             
             comparable_offers = [
                 o for o in raw_offers
-                if o['title'] in uncertain_titles
+                if _offer_key(o) in uncertain_keys
             ]
             
             if comparable_offers:
@@ -697,7 +725,7 @@ PRODUCTOS A VALIDAR:
                     "✅ Found uncertain classifications to include as fallback",
                     selected=len(comparable_offers),
                     avg_confidence=round(
-                        sum(c.confidence for c in classified if c.title in uncertain_titles) / len(uncertain_titles), 2
+                        sum(c.confidence for c in classified if _classification_key(c) in uncertain_keys) / len(uncertain_keys), 2
                     )
                 )
         
@@ -747,32 +775,93 @@ PRODUCTOS A VALIDAR:
             "classified_offers": [],
             "comparable_offers": [],
             "excluded_count": 0,
+            "degraded": False,
             "errors": []
         }
         
+        cache_key = self._match_cache_key(target_product, raw_offers, reference_price, target_image_url)
+        cached = _match_cache_get(cache_key)
+        if cached is not None:
+            logger.info(
+                "ProductMatchingAgent result served from cache",
+                offers=len(raw_offers),
+                comparable=cached["comparable_count"]
+            )
+            return cached
+        
         final_state = await self.graph.ainvoke(initial_state)
         
         # Build excluded offers list with reasons
         excluded_offers = []
-        comparable_titles = {o['title'] for o in final_state["comparable_offers"]}
+        # Index raw offers once (first occurrence wins)
+        offers_by_key = {}
+        for o in final_state["raw_offers"]:
+            offers_by_key.setdefault(_offer_key(o), o)
         
         for classification in final_state["classified_offers"]:
             if not classification.is_comparable:
                 # Find the raw offer data
-                matching_offer = next((o for o in final_state["raw_offers"] if o.get('title') == classification.title), None)
+                matching_offer = offers_by_key.get(_classification_key(classification))
                 if matching_offer:
                     excluded_offers.append({
                         **matching_offer,  # Include all original fields
                         "exclusion_reason": classification.reason
                     })
         
-        return {
+        result = {
             "target_product": final_state["target_product"],
             "total_offers": len(final_state["raw_offers"]),
             "comparable_offers": final_state["comparable_offers"],
             "comparable_count": len(final_state["comparable_offers"]),
             "excluded_count": final_state["excluded_count"],
             "excluded_offers": excluded_offers,
-            "classifications": [c.dict() for c in final_state["classified_offers"]],
+            "classifications": [c.model_dump() for c in final_state["classified_offers"]],
+            "degraded": final_state["degraded"],
             "errors": final_state["errors"]
         }
+        # Fallback verdicts (rate limit, outage) must not be replayed for the TTL
+        if not result["errors"] and not result["degraded"]:
+            _match_cache_put(cache_key, result)
+        return result
+    
+    @staticmethod
+    def _match_cache_key(
+        target_product: str,
+        raw_offers: List[Dict[str, Any]],
+        reference_price: float,
+        target_image_url: str
+    ) -> str:
+        """Fingerprint of every input that influences classification."""
+        offers_fp = []
+        for o in raw_offers:
+            if hasattr(o, "to_dict"):
+                o = o.to_dict()
+            offers_fp.append((
+                str(o.get("item_id", "")),
+                str(o.get("title", "")),
+                str(o.get("price", "")),
+                str(o.get("image_url") or ""),  # Vision classification looks at it
+            ))
+        offers_fp.sort()
+        raw = repr((target_product, reference_price, target_image_url, offers_fp))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _match_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    entry = _MATCH_CACHE.get(key)
+    if entry is None:
+        return None
+    stored_at, result = entry
+    if time.monotonic() - stored_at > _MATCH_CACHE_TTL_SECONDS:
+        del _MATCH_CACHE[key]
+        return None
+    _MATCH_CACHE.move_to_end(key)
+    # Callers may mutate the returned lists/dicts; keep the cached copy pristine
+    return copy.deepcopy(result)
+
+
+def _match_cache_put(key: str, result: Dict[str, Any]) -> None:
+    _MATCH_CACHE[key] = (time.monotonic(), copy.deepcopy(result))
+    _MATCH_CACHE.move_to_end(key)
+    while len(_MATCH_CACHE) > _MATCH_CACHE_MAX_ENTRIES:
+        _MATCH_CACHE.popitem(last=False)
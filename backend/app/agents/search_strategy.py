@@ -9,77 +9,80 @@ Enhanced with DataEnricherAgent for detailed specification extraction and analys
 Use case: You import and rebrand products, so you need to find competitors with similar
 specifications, not the same brand.
 """
-from typing import Dict, Any, List, Optional
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from langchain_core.prompts import ChatPromptTemplate
 import json
 import asyncio
 import os
+import re
 
 from app.core.config import settings
+from app.core.llm_clients import get_llm
 from app.core.logging import get_logger
 from app.core.monitoring import track_agent_execution
+from app.core.semantic_cache import get_semantic_cache
 from app.core.token_costs import get_tracker
 from app.mcp_servers.mercadolibre.scraper import ProductDetails
 
 logger = get_logger(__name__)
 
+# Fallback JSON extraction for non-conforming LLM output
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
 
-class SearchStrategyAgent:
+# Products with at most this many attributes and a short description are
+# "simple": title-based terms are good enough, so the LLM call is skipped.
+# Routing is opt-in (agents default to always using the LLM); the bulk catalog
+# endpoints use this threshold.
+BULK_COMPLEXITY_THRESHOLD = 3
+SIMPLE_DESCRIPTION_MAX_CHARS = 200
+
+
+@lru_cache(maxsize=1024)
+def _describe_product(
+    title: str,
+    price: float,
+    currency: str,
+    condition: str,
+    brand: Optional[str],
+    category: Optional[str],
+    attributes: Tuple[Tuple[str, str], ...],
+    description: Optional[str],
+) -> str:
     """
-    Agent that determines optimal search strategy for finding similar products.
-    
-    Input: Complete product details (specifications, attributes)
-    Output: Optimized search terms that focus on product category and key specifications
+    Render the product block for the LLM prompt.
+
+    Cached on the rendered fields, so bulk re-runs and retries of the same
+    product (even with a freshly scraped ProductDetails) reuse the string.
     """
+    lines = [
+        f"Título: {title}",
+        f"Precio: ${price:,.2f} {currency}",
+        f"Condición: {condition}",
+    ]
     
-    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.2):
-        """
-        Initialize the search strategy agent.
-        
-        Args:
-            model: OpenAI model to use
-            temperature: Temperature for generation (0.2 = more focused)
-        """
-        # Dynamic API Key fetch (Crucial for Streamlit Local Mode where env is set late)
-        api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
-        self.llm = ChatOpenAI(
-            model=model,
-            temperature=temperature,
-            api_key=api_key
-        )
-        logger.info(
-            "SearchStrategyAgent initialized",
-            model=model,
-            temperature=temperature,
-            has_api_key=bool(api_key)
-        )
+    if brand:
+        lines.append(f"Marca: {brand}")
     
-    def generate_search_terms(self, product: ProductDetails) -> Dict[str, Any]:
-        """
-        Generate optimal search terms based on product characteristics.
-        
-        Args:
-            product: Complete product details
-            
-        Returns:
-            Dict with:
-                - primary_search: Main search term (most likely to find similar products)
-                - alternative_searches: List of alternative search terms
-                - key_specs: Key specifications to focus on
-                - reasoning: Why these terms were chosen
-        """
-        logger.info(
-            "Generating search strategy",
-            product_id=product.product_id,
-            title=product.title
-        )
-        
-        # Build product description for LLM
-        product_info = self._build_product_description(product)
-        
-        # Create prompt
-        prompt = f"""Eres un experto en análisis de productos electrónicos y estrategias de búsqueda para e-commerce.
+    if category:
+        lines.append(f"Categoría: {category}")
+    
+    if attributes:
+        lines.append("\nEspecificaciones técnicas:")
+        for key, value in attributes:
+            lines.append(f"  - {key}: {value}")
+    
+    if description:
+        lines.append(f"\nDescripción: {description}")
+    
+    return "\n".join(lines)
+
+
+# Static instructions sent as the system message. Keeping them byte-identical
+# across requests lets OpenAI serve them from its prompt cache; only the
+# short product block in the user message changes between calls.
+SEARCH_STRATEGY_SYSTEM_PROMPT = """Eres un experto en análisis de productos electrónicos y estrategias de búsqueda para e-commerce.
 
 Tu tarea es analizar un producto que el usuario importa y rebrandea, y generar los MEJORES términos de búsqueda para encontrar productos FUNCIONALMENTE EQUIVALENTES de OTRAS marcas/proveedores en Mercado Libre.
 
@@ -106,9 +109,6 @@ ESTRATEGIAS REQUERIDAS:
    - Ejemplo: "bafle" → ["bocina", "altavoz", "parlante"]
    - Ejemplo: "tripie" → ["pedestal", "stand", "soporte"]
 
-PRODUCTO A ANALIZAR:
-{product_info}
-
 IMPORTANTE - FILTRADO INTELIGENTE:
 - EXCLUIR la marca propia del usuario (si aparece en el título)
 - EXCLUIR marcas premium que no compiten en mismo segmento de precio
@@ -152,25 +152,117 @@ Responde SOLO en formato JSON válido:
   "exclude_premium_brands": ["Marca Premium 1", "Marca Premium 2"],
   "reasoning": "explicación de estrategia"
 }}"""
+
+SEARCH_STRATEGY_USER_PROMPT = """PRODUCTO A ANALIZAR:
+{product_info}
+
+Responde SOLO en formato JSON válido con la estructura indicada."""
+
+
+class SearchStrategyAgent:
+    """
+    Agent that determines optimal search strategy for finding similar products.
+    
+    Input: Complete product details (specifications, attributes)
+    Output: Optimized search terms that focus on product category and key specifications
+    """
+    
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        temperature: float = 0.2,
+        complexity_threshold: Optional[int] = None
+    ):
+        """
+        Initialize the search strategy agent.
+        
+        Args:
+            model: OpenAI model to use (defaults to settings.OPENAI_MODEL_MINI)
+            temperature: Temperature for generation (0.2 = more focused)
+            complexity_threshold: Max attribute count for a product to be routed to
+                the title-based strategy without an LLM call (None or 0 = always use LLM)
+        """
+        model = model or settings.OPENAI_MODEL_MINI
+        self.model = model
+        self.complexity_threshold = complexity_threshold
+        # Dynamic API Key fetch (Crucial for Streamlit Local Mode where env is set late)
+        api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+        # JSON mode guarantees a parseable object (no markdown fences / prose)
+        self.llm = get_llm(model, temperature, json_mode=True)
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", SEARCH_STRATEGY_SYSTEM_PROMPT),
+            ("user", SEARCH_STRATEGY_USER_PROMPT),
+        ])
+        # Reuse strategies for near-duplicate products (no-op unless REDIS_ENABLED)
+        self.cache = get_semantic_cache("search_strategy")
+        logger.info(
+            "SearchStrategyAgent initialized",
+            model=model,
+            temperature=temperature,
+            complexity_threshold=complexity_threshold,
+            has_api_key=bool(api_key)
+        )
+    
+    def generate_search_terms(self, product: ProductDetails) -> Dict[str, Any]:
+        """
+        Generate optimal search terms based on product characteristics.
+        
+        Args:
+            product: Complete product details
+            
+        Returns:
+            Dict with:
+                - primary_search: Main search term (most likely to find similar products)
+                - alternative_searches: List of alternative search terms
+                - key_specs: Key specifications to focus on
+                - reasoning: Why these terms were chosen
+        """
+        logger.info(
+            "Generating search strategy",
+            product_id=product.product_id,
+            title=product.title
+        )
+        
+        if self._is_simple(product):
+            logger.info(
+                "Simple product - using title-based strategy without LLM",
+                attributes=len(product.attributes or {}),
+                description_chars=len(product.description or "")
+            )
+            return self._fallback_strategy(product)
+        
+        # Build product description for LLM
+        product_info = self._build_product_description(product)
+        
+        cached = self.cache.check(product_info)
+        if cached is not None:
+            logger.info(
+                "Search strategy served from semantic cache",
+                primary_search=cached.get("primary_search")
+            )
+            return cached
         
         try:
-            response = self.llm.invoke(prompt)
+            response = (self.prompt | self.llm).invoke({"product_info": product_info})
             
             # Capture token usage if available
             try:
                 if hasattr(response, 'response_metadata') and 'token_usage' in response.response_metadata:
                     usage = response.response_metadata['token_usage']
+                    cached_tokens = (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0)
                     tracker = get_tracker()
                     tracker.add_call(
-                        model=settings.OPENAI_MODEL_MINI,
+                        model=self.model,
                         input_tokens=usage.get('prompt_tokens', 0),
-                        output_tokens=usage.get('completion_tokens', 0)
+                        output_tokens=usage.get('completion_tokens', 0),
+                        cached_input_tokens=cached_tokens
                     )
-                    logger.info(f"✅ Tokens captured: {usage.get('prompt_tokens', 0)} input, {usage.get('completion_tokens', 0)} output")
+                    logger.info(f"✅ Tokens captured: {usage.get('prompt_tokens', 0)} input ({cached_tokens} cached), {usage.get('completion_tokens', 0)} output")
             except Exception as e:
                 logger.debug(f"Could not capture token usage: {e}")
             
             result = self._parse_llm_response(response.content)
+            self.cache.store(product_info, result)
             
             logger.info(
                 "Search strategy generated",
@@ -183,57 +275,60 @@ Responde SOLO en formato JSON válido:
         except Exception as e:
             logger.error(f"Error generating search strategy: {e}")
             # Fallback to basic strategy
+            logger.warning("Using fallback search strategy")
             return self._fallback_strategy(product)
     
+    def _is_simple(self, product: ProductDetails) -> bool:
+        """Check whether a product is simple enough to skip the LLM."""
+        if not self.complexity_threshold:
+            return False
+        # No attributes means none were scraped (JSON-LD / search-bypass paths),
+        # not that the product is simple
+        attributes = product.attributes
+        if not attributes:
+            return False
+        return (
+            len(attributes) <= self.complexity_threshold
+            and len(product.description or "") <= SIMPLE_DESCRIPTION_MAX_CHARS
+        )
+    
     def _build_product_description(self, product: ProductDetails) -> str:
         """Build a comprehensive product description for the LLM."""
-        lines = [
-            f"Título: {product.title}",
-            f"Precio: ${product.price:,.2f} {product.currency}",
-            f"Condición: {product.condition}",
-        ]
-        
-        if product.brand:
-            lines.append(f"Marca: {product.brand}")
-        
-        if product.category:
-            lines.append(f"Categoría: {product.category}")
-        
-        if product.attributes:
-            lines.append("\nEspecificaciones técnicas:")
-            for key, value in product.attributes.items():
-                lines.append(f"  - {key}: {value}")
-        
-        if product.description:
-            desc_short = product.description[:500] if len(product.description) > 500 else product.description
-            lines.append(f"\nDescripción: {desc_short}")
-        
-        return "\n".join(lines)
+        attributes = tuple(
+            (key, str(value)) for key, value in (product.attributes or {}).items()
+        )
+        description = product.description[:500] if product.description else None
+        return _describe_product(
+            product.title,
+            product.price,
+            product.currency,
+            product.condition,
+            product.brand,
+            product.category,
+            attributes,
+            description,
+        )
     
     def _parse_llm_response(self, content: str) -> Dict[str, Any]:
         """Parse LLM JSON response."""
-        import json
-        import re
-        
-        # Try to extract JSON from markdown code blocks
-        json_match = re.search(r"```(?:json)?\s*(\{.*\})\s*```", content, re.DOTALL)
-        if json_match:
-            content = json_match.group(1)
-        
-        # Try direct parse
+        # JSON mode returns a bare object, so a direct parse is the normal path
         try:
             return json.loads(content)
         except json.JSONDecodeError:
-            # Try to find JSON object in text
-            json_match = re.search(r"\{.*\}", content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(0))
-            raise
+            pass
+        
+        # Fallback: extract JSON from markdown code blocks or surrounding text
+        json_match = _JSON_FENCE_RE.search(content)
+        if json_match:
+            return json.loads(json_match.group(1))
+        
+        json_match = _JSON_OBJECT_RE.search(content)
+        if json_match:
+            return json.loads(json_match.group(0))
+        return json.loads(content)
     
     def _fallback_strategy(self, product: ProductDetails) -> Dict[str, Any]:
-        """Fallback strategy when LLM fails."""
-        logger.warning("Using fallback search strategy")
-        
+        """Title-based strategy for simple products or when the LLM fails."""
         # Extract key terms from title (remove brand)
         title_clean = product.title.lower()
         if product.brand:
@@ -204,12 +204,15 @@ async def analyze_adhoc(request: AdHocAnalysisRequest):
     pipeline = PricingPipeline()
     
     # Run analysis
-    result = await pipeline.analyze_product(
-        product_input=request.product_input,
-        max_offers=50, # Higher limit for better charts
-        cost_price=request.cost,
-        target_margin=request.margin
-    )
+    try:
+        result = await pipeline.analyze_product(
+            product_input=request.product_input,
+            max_offers=50, # Higher limit for better charts
+            cost_price=request.cost,
+            target_margin=request.margin
+        )
+    finally:
+        await pipeline.aclose()
     
     # Extract recommendation
     rec = result.get("final_recommendation", {})
@@ -1,12 +1,19 @@
-from typing import List, Optional
+import asyncio
+from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+import orjson
+
 from ...database import get_db
 from ...models import Product
 from ...schemas import ProductCreate, ProductUpdate, ProductResponse, ProductList
 from ...agents.pricing_pipeline import PricingPipeline
+from ...agents.search_strategy import BULK_COMPLEXITY_THRESHOLD
+from ...mcp_servers.mercadolibre.scraper import create_scraper_session
 from ...core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -33,11 +40,16 @@ async def list_products(
     if category:
         query = query.filter(Product.category == category)
     
-    # Total count
-    total = query.count()
-    
-    # Paginación
-    products = query.offset((page - 1) * page_size).limit(page_size).all()
+    # Paginación + total en una sola consulta (COUNT(*) OVER () window)
+    rows = (
+        query.add_columns(func.count().over().label("total"))
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+    products = [row[0] for row in rows]
+    # Página fuera de rango: no hay filas de donde leer el total
+    total = rows[0].total if rows else query.count()
     
     return ProductList(
         total=total,
@@ -55,7 +67,7 @@ async def get_product(
     """
     Obtiene un producto por ID.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -90,7 +102,7 @@ async def update_product(
     """
     Actualiza un producto existente.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -112,7 +124,7 @@ async def delete_product(
     """
     Elimina (desactiva) un producto.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -129,7 +141,7 @@ async def trigger_product_scan(
     """
     Trigger un scan on-demand para un producto específico.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -144,46 +156,13 @@ async def trigger_product_scan(
     }
 
 
-@router.post("/catalog/bulk-analyze")
-async def bulk_analyze_catalog(
-    product_ids: Optional[List[int]] = None,
-    category: Optional[str] = None,
-    price_tolerance: float = 0.30,
-    max_offers_per_product: int = 25,
-    skip_low_rotation: bool = True,
-    db: Session = Depends(get_db),
-):
-    """
-    Analiza múltiples productos del catálogo vs competencia.
-    
-    Args:
-        product_ids: Lista específica de product IDs a analizar (si None, analiza todos)
-        category: Filtrar por categoría (ej: "BOCINAS GENERAL")
-        price_tolerance: Rango de precio ±tolerance para búsqueda (0.30 = ±30%)
-        max_offers_per_product: Máximo de competidores a analizar por producto
-        skip_low_rotation: Omitir productos con rotación baja (<1.5)
-        db: Database session
-    
-    Returns:
-        Dict con resultados de análisis de múltiples productos
-        
-    Example:
-        POST /api/products/catalog/bulk-analyze
-        {
-            "product_ids": [1, 2, 3],
-            "price_tolerance": 0.30,
-            "max_offers_per_product": 25
-        }
-    """
-    logger.info(
-        "Starting bulk catalog analysis",
-        product_ids=product_ids,
-        category=category,
-        price_tolerance=price_tolerance,
-        skip_low_rotation=skip_low_rotation
-    )
-    
-    # Build query
+def _query_bulk_products(
+    db: Session,
+    product_ids: Optional[List[int]],
+    category: Optional[str],
+    skip_low_rotation: bool,
+) -> List[Product]:
+    """Load the active catalog products selected for bulk analysis."""
     query = db.query(Product).filter(Product.is_active == True)
     
     # Filter by specific IDs if provided
@@ -198,49 +177,44 @@ async def bulk_analyze_catalog(
     if skip_low_rotation:
         query = query.filter(Product.rotation_index >= 1.5)
     
-    products = query.all()
-    
-    if not products:
+    return query.all()
+
+
+async def _analyze_catalog_product(
+    pipeline: PricingPipeline,
+    semaphore: asyncio.Semaphore,
+    product: Product,
+    idx: int,
+    total: int,
+    price_tolerance: float,
+    max_offers: int,
+) -> Dict[str, Any]:
+    """Analyze a single catalog product and shape its bulk result entry."""
+    # Skip if no ML URL
+    if not product.ml_url:
+        logger.warning(f"Skipping product {product.sku}: no ML URL")
         return {
-            "status": "no_products",
-            "message": "No products found matching criteria",
-            "analyzed": 0,
-            "results": []
+            "product_id": product.id,
+            "sku": product.sku,
+            "title": product.title,
+            "status": "skipped",
+            "reason": "No MercadoLibre URL"
         }
     
-    logger.info(f"Found {len(products)} products to analyze")
-    
-    # Initialize pipeline
-    pipeline = PricingPipeline()
-    results = []
-    
-    # Analyze each product
-    for idx, product in enumerate(products, 1):
+    async with semaphore:
         try:
             logger.info(
-                f"Analyzing product {idx}/{len(products)}",
+                f"Analyzing product {idx}/{total}",
                 sku=product.sku,
                 title=product.title
             )
             
-            # Skip if no ML URL
-            if not product.ml_url:
-                logger.warning(f"Skipping product {product.sku}: no ML URL")
-                results.append({
-                    "product_id": product.id,
-                    "sku": product.sku,
-                    "title": product.title,
-                    "status": "skipped",
-                    "reason": "No MercadoLibre URL"
-                })
-                continue
-            
             # Run analysis
             analysis = await pipeline.analyze_product(
                 product_input=product.ml_url,
                 cost_price=float(product.cost_price or 0),
                 price_tolerance=price_tolerance,
-                max_offers=max_offers_per_product
+                max_offers=max_offers
             )
             
             # Extract recommendation
@@ -248,16 +222,15 @@ async def bulk_analyze_catalog(
             search_strategy = analysis.get("pipeline_steps", {}).get("search_strategy", {})
             
             if final_rec and analysis.get("success", True):
-                status = "success"
                 current_price = analysis.get("pipeline_steps", {}).get("pivot_product", {}).get("price", 0)
                 recommended_price = final_rec.get("recommended_price", 0)
                 price_gap = ((current_price - recommended_price) / recommended_price * 100) if recommended_price > 0 else 0
                 
-                result = {
+                return {
                     "product_id": product.id,
                     "sku": product.sku,
                     "title": product.title,
-                    "status": status,
+                    "status": "success",
                     "current_price": current_price,
                     "recommended_price": recommended_price,
                     "price_gap_percent": round(price_gap, 2),
@@ -268,19 +241,18 @@ async def bulk_analyze_catalog(
                     "search_strategy": {
                         "primary_search": search_strategy.get("primary_search"),
                         "alternative_searches": search_strategy.get("alternative_searches", [])
-                    }
-                }
-            else:
-                status = "error"
-                result = {
-                    "product_id": product.id,
-                    "sku": product.sku,
-                    "title": product.title,
-                    "status": status,
-                    "error": analysis.get("errors", ["Unknown error"])
+                    },
+                    "token_usage": analysis.get("token_usage")
                 }
             
-            results.append(result)
+            return {
+                "product_id": product.id,
+                "sku": product.sku,
+                "title": product.title,
+                "status": "error",
+                "error": analysis.get("errors", ["Unknown error"]),
+                "token_usage": analysis.get("token_usage")
+            }
             
         except Exception as e:
             logger.error(
@@ -288,13 +260,96 @@ async def bulk_analyze_catalog(
                 error=str(e),
                 exc_info=True
             )
-            results.append({
+            return {
                 "product_id": product.id,
                 "sku": product.sku,
                 "title": product.title,
                 "status": "error",
                 "error": str(e)
-            })
+            }
+
+
+def _sse_event(payload: Any) -> str:
+    """Format a payload as a Server-Sent Events data line."""
+    return f"data: {orjson.dumps(payload, default=str).decode()}\n\n"
+
+
+@router.post("/catalog/bulk-analyze")
+async def bulk_analyze_catalog(
+    product_ids: Optional[List[int]] = None,
+    category: Optional[str] = None,
+    price_tolerance: float = 0.30,
+    max_offers_per_product: int = 25,
+    skip_low_rotation: bool = True,
+    concurrency: int = Query(8, ge=1, le=20),
+    search_complexity_threshold: int = Query(BULK_COMPLEXITY_THRESHOLD, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Analiza múltiples productos del catálogo vs competencia.
+    
+    Args:
+        product_ids: Lista específica de product IDs a analizar (si None, analiza todos)
+        category: Filtrar por categoría (ej: "BOCINAS GENERAL")
+        price_tolerance: Rango de precio ±tolerance para búsqueda (0.30 = ±30%)
+        max_offers_per_product: Máximo de competidores a analizar por producto
+        skip_low_rotation: Omitir productos con rotación baja (<1.5)
+        concurrency: Máximo de análisis simultáneos (respeta rate limits de ML/OpenAI)
+        search_complexity_threshold: Productos con entre 1 y N atributos (y descripción
+            corta) usan búsqueda por título sin LLM; subirlo abarata catálogos grandes,
+            0 lo desactiva (todos usan el LLM)
+        db: Database session
+    
+    Returns:
+        Dict con resultados de análisis de múltiples productos
+        
+    Example:
+        POST /api/products/catalog/bulk-analyze
+        {
+            "product_ids": [1, 2, 3],
+            "price_tolerance": 0.30,
+            "max_offers_per_product": 25
+        }
+    """
+    logger.info(
+        "Starting bulk catalog analysis",
+        product_ids=product_ids,
+        category=category,
+        price_tolerance=price_tolerance,
+        skip_low_rotation=skip_low_rotation,
+        concurrency=concurrency
+    )
+    
+    products = _query_bulk_products(db, product_ids, category, skip_low_rotation)
+    
+    if not products:
+        return {
+            "status": "no_products",
+            "message": "No products found matching criteria",
+            "analyzed": 0,
+            "results": []
+        }
+    
+    logger.info(f"Found {len(products)} products to analyze")
+    
+    # Bound concurrent analyses to respect ML rate limits and OpenAI TPM
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    # One pooled scraper session for the whole run (keep-alive across products)
+    async with create_scraper_session(max_clients=concurrency * 2) as session:
+        pipeline = PricingPipeline(
+            search_complexity_threshold=search_complexity_threshold,
+            scraper_session=session
+        )
+        
+        # Analyze all products concurrently (results keep catalog order)
+        results = await asyncio.gather(*(
+            _analyze_catalog_product(
+                pipeline, semaphore, product, idx, len(products),
+                price_tolerance, max_offers_per_product
+            )
+            for idx, product in enumerate(products, 1)
+        ))
     
     # Count successes
     successful = sum(1 for r in results if r.get("status") == "success")
@@ -313,3 +368,87 @@ async def bulk_analyze_catalog(
         "price_tolerance": price_tolerance,
         "results": results
     }
+
+
+@router.post("/catalog/bulk-analyze/stream")
+async def bulk_analyze_catalog_stream(
+    product_ids: Optional[List[int]] = None,
+    category: Optional[str] = None,
+    price_tolerance: float = 0.30,
+    max_offers_per_product: int = 25,
+    skip_low_rotation: bool = True,
+    concurrency: int = Query(8, ge=1, le=20),
+    search_complexity_threshold: int = Query(BULK_COMPLEXITY_THRESHOLD, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Igual que /catalog/bulk-analyze pero emite cada resultado como Server-Sent Event
+    en cuanto termina su análisis, sin acumular todo el catálogo en memoria.
+    
+    Eventos (en orden):
+        data: {"status": "started", "total": N}
+        data: {...resultado de un producto...}   (N veces, en orden de finalización)
+        data: {"status": "completed", "analyzed": N, "successful": M, ...}
+        data: [DONE]
+    """
+    logger.info(
+        "Starting streamed bulk catalog analysis",
+        product_ids=product_ids,
+        category=category,
+        price_tolerance=price_tolerance,
+        skip_low_rotation=skip_low_rotation,
+        concurrency=concurrency
+    )
+    
+    products = _query_bulk_products(db, product_ids, category, skip_low_rotation)
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def event_stream():
+        # The pooled scraper session must live as long as the stream itself
+        session = create_scraper_session(max_clients=concurrency * 2)
+        tasks: List[asyncio.Task] = []
+        analyzed = 0
+        successful = 0
+        try:
+            pipeline = PricingPipeline(
+                search_complexity_threshold=search_complexity_threshold,
+                scraper_session=session
+            )
+            tasks = [
+                asyncio.create_task(_analyze_catalog_product(
+                    pipeline, semaphore, product, idx, len(products),
+                    price_tolerance, max_offers_per_product
+                ))
+                for idx, product in enumerate(products, 1)
+            ]
+            yield _sse_event({"status": "started", "total": len(tasks)})
+            
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                analyzed += 1
+                if result.get("status") == "success":
+                    successful += 1
+                yield _sse_event(result)
+        finally:
+            # Client disconnected mid-stream: stop pending analyses and wait for
+            # them to unwind before closing the session they share
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await session.close()
+        
+        logger.info(
+            "Streamed bulk analysis completed",
+            total=analyzed,
+            successful=successful
+        )
+        yield _sse_event({
+            "status": "completed",
+            "timestamp": datetime.utcnow().isoformat(),
+            "analyzed": analyzed,
+            "successful": successful,
+            "price_tolerance": price_tolerance
+        })
+        yield "data: [DONE]\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -1,3 +1,3 @@
-from .config import settings
+from .config import settings, get_settings
 
-__all__ = ["settings"]
+__all__ = ["settings", "get_settings"]
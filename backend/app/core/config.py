@@ -1,4 +1,5 @@
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 import os
 
@@ -23,6 +24,8 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_ENABLED: bool = False
+    SEMANTIC_CACHE_DISTANCE_THRESHOLD: float = 0.05  # cosine distance (similarity > 0.95)
+    SEMANTIC_CACHE_TTL: int = 604800  # 7 days
     
     # Mercado Libre
     ML_CLIENT_ID: str = ""
@@ -54,10 +57,23 @@ class Settings(BaseSettings):
         "http://localhost:8504",  # Dashboard simple
     ]
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    # frozen: settings are read-only after load (hashable, no accidental mutation)
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        frozen=True,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide Settings singleton.
+    Usable as a FastAPI dependency (Depends(get_settings)) so tests can
+    override it via app.dependency_overrides instead of reloading the module.
+    """
+    return Settings()
 
 
 # Create settings instance
-settings = Settings()
+settings = get_settings()
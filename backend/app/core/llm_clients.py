@@ -0,0 +1,46 @@
+"""
+Shared LLM clients.
+
+Every ChatOpenAI instance owns its own httpx connection pool. Agents are
+created per pipeline (and bulk runs build many pipelines), so handing out one
+client per configuration keeps TCP/TLS connections to OpenAI alive and reused.
+"""
+import os
+from functools import lru_cache
+from typing import Optional
+
+from langchain_openai import ChatOpenAI
+
+from app.core.config import settings
+
+
+def get_llm(
+    model: Optional[str] = None,
+    temperature: float = 0.2,
+    json_mode: bool = False,
+) -> ChatOpenAI:
+    """
+    Get the shared ChatOpenAI client for a model/temperature/JSON-mode combination.
+
+    The API key is resolved on every call (Streamlit local mode sets the env var
+    late), so a key that appears later gets its own client instead of reusing one
+    built without credentials.
+    """
+    api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+    return _build_llm(model or settings.OPENAI_MODEL_MINI, temperature, json_mode, api_key)
+
+
+@lru_cache(maxsize=16)
+def _build_llm(
+    model: str,
+    temperature: float,
+    json_mode: bool,
+    api_key: Optional[str],
+) -> ChatOpenAI:
+    model_kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=api_key,
+        model_kwargs=model_kwargs,
+    )
@@ -0,0 +1,94 @@
+"""
+Semantic cache for LLM responses backed by Redis vector search.
+
+Prompts are embedded and stored in a Redis HNSW index; a new prompt whose
+cosine distance to a cached one is below the threshold reuses the cached
+response instead of calling the LLM again.
+"""
+import json
+import os
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class SemanticLLMCache:
+    """
+    Thin wrapper around redisvl's SemanticCache.
+
+    All Redis/embedding failures are logged and treated as cache misses so the
+    caller always falls back to the LLM.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        distance_threshold: Optional[float] = None,
+        ttl: Optional[int] = None,
+    ):
+        self.name = name
+        self._cache = None
+
+        if not settings.REDIS_ENABLED:
+            return
+
+        try:
+            from redisvl.extensions.cache.llm import SemanticCache
+            from redisvl.utils.vectorize import OpenAITextVectorizer
+
+            api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+            self._cache = SemanticCache(
+                name=name,
+                redis_url=settings.REDIS_URL,
+                distance_threshold=distance_threshold or settings.SEMANTIC_CACHE_DISTANCE_THRESHOLD,
+                ttl=ttl or settings.SEMANTIC_CACHE_TTL,
+                vectorizer=OpenAITextVectorizer(
+                    model=settings.OPENAI_EMBEDDING_MODEL,
+                    api_config={"api_key": api_key},
+                ),
+            )
+            logger.info("Semantic cache initialized", name=name)
+        except Exception as e:
+            logger.warning(f"Semantic cache '{name}' disabled: {e}")
+            self._cache = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache is not None
+
+    def check(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """Return the cached JSON response for a semantically similar prompt, if any."""
+        if self._cache is None:
+            return None
+        try:
+            hits = self._cache.check(prompt=prompt, num_results=1)
+            if hits:
+                logger.info("Semantic cache hit", name=self.name)
+                return json.loads(hits[0]["response"])
+        except Exception as e:
+            logger.debug(f"Semantic cache lookup failed: {e}")
+        return None
+
+    def store(self, prompt: str, response: Dict[str, Any]) -> None:
+        """Store a JSON-serializable response for the given prompt."""
+        if self._cache is None:
+            return
+        try:
+            self._cache.store(prompt=prompt, response=json.dumps(response, ensure_ascii=False))
+        except Exception as e:
+            logger.debug(f"Semantic cache store failed: {e}")
+
+
+_caches: Dict[str, SemanticLLMCache] = {}
+
+
+def get_semantic_cache(name: str) -> SemanticLLMCache:
+    """Get or create the named semantic cache (one Redis index per name)."""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = SemanticLLMCache(name)
+        _caches[name] = cache
+    return cache
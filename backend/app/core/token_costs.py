@@ -3,19 +3,30 @@ Token cost tracking for OpenAI API calls.
 Provides pricing information and cost calculation utilities.
 """
 
-from dataclasses import dataclass
-from typing import Dict, Optional
+import sys
+import threading
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Deque, Dict, Iterator, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # OpenAI pricing as of January 2026
 # Reference: https://openai.com/pricing
 OPENAI_PRICING = {
     "gpt-4o": {
         "input": 0.0025,      # $2.50 per 1M input tokens = $0.0025 per 1K
+        "cached_input": 0.00125,  # $1.25 per 1M cached input tokens
         "output": 0.010,      # $10.00 per 1M output tokens = $0.010 per 1K
         "name": "GPT-4 Omni"
     },
     "gpt-4o-mini": {
         "input": 0.00015,     # $0.15 per 1M input tokens = $0.00015 per 1K
+        "cached_input": 0.000075,  # $0.075 per 1M cached input tokens
         "output": 0.0006,     # $0.60 per 1M output tokens = $0.0006 per 1K
         "name": "GPT-4 Omni Mini"
     },
@@ -42,93 +53,241 @@ OPENAI_PRICING = {
 }
 
 
-@dataclass
+# Per-token (input, cached input, output) prices and display name, derived once
+# from the per-1K table so pricing a call is a lookup and three multiplications.
+# Unknown models are priced at zero and displayed under their own id. Keys are
+# interned, as are model ids entering the tracker, so lookups hit the identity
+# fast path.
+_PRICING_FLAT: Dict[str, Tuple[float, float, float, str]] = {
+    sys.intern(model): (
+        pricing["input"] / 1000,
+        pricing.get("cached_input", pricing["input"]) / 1000,
+        pricing["output"] / 1000,
+        pricing["name"],
+    )
+    for model, pricing in OPENAI_PRICING.items()
+}
+_UNPRICED: Tuple[float, float, float, str] = (0.0, 0.0, 0.0, "")
+
+
+def _price_call(model: str, input_tokens: int, output_tokens: int, cached_input_tokens: int) -> Tuple[float, float]:
+    """(input cost, output cost) in USD for one call"""
+    input_price, cached_price, output_price, _ = _PRICING_FLAT.get(model, _UNPRICED)
+    uncached_input = input_tokens - cached_input_tokens
+    return uncached_input * input_price + cached_input_tokens * cached_price, output_tokens * output_price
+
+
+def _model_name(model: str) -> str:
+    """Human-readable name for a model id (the id itself when unknown)"""
+    return _PRICING_FLAT.get(model, _UNPRICED)[3] or model
+
+
+@dataclass(slots=True)
 class TokenUsage:
     """Tracks token usage for a single API call"""
     model: str
     input_tokens: int = 0
     output_tokens: int = 0
-    total_tokens: int = 0
+    cached_input_tokens: int = 0  # Subset of input_tokens served from OpenAI prompt cache
+    # Costs are fixed once the call is recorded, so price them once up front
+    input_cost: float = field(init=False, default=0.0)
+    output_cost: float = field(init=False, default=0.0)
+    
+    def __post_init__(self) -> None:
+        self.input_cost, self.output_cost = _price_call(
+            self.model, self.input_tokens, self.output_tokens, self.cached_input_tokens
+        )
+    
+    @property
+    def total_tokens(self) -> int:
+        """Input plus output tokens"""
+        return self.input_tokens + self.output_tokens
     
     @property
     def total_cost_usd(self) -> float:
         """Calculate total cost in USD"""
-        if self.model not in OPENAI_PRICING:
-            return 0.0
-        
-        pricing = OPENAI_PRICING[self.model]
-        input_cost = (self.input_tokens / 1000) * pricing["input"]
-        output_cost = (self.output_tokens / 1000) * pricing["output"]
-        return input_cost + output_cost
+        return self.input_cost + self.output_cost
     
     @property
     def model_name(self) -> str:
         """Get human-readable model name"""
-        return OPENAI_PRICING.get(self.model, {}).get("name", self.model)
+        return _model_name(self.model)
+
+
+def compute_costs(
+    models: Sequence[str],
+    input_tokens: Sequence[int],
+    output_tokens: Sequence[int],
+    cached_input_tokens: Optional[Sequence[int]] = None,
+) -> "np.ndarray":
+    """
+    Per-call USD cost for a batch of calls, e.g. when re-costing a historical
+    usage log. Same pricing as TokenUsage, vectorized with numpy: model ids are
+    mapped to integer rows of a rate table once, then costs are gathered and
+    combined in a handful of array operations.
+    """
+    import numpy as np  # Only needed for bulk costing; keep the tracker import light
+    
+    model_rows: Dict[str, int] = {}
+    ids = np.fromiter(
+        (model_rows.setdefault(model, len(model_rows)) for model in models),
+        dtype=np.intp,
+        count=len(models),
+    )
+    rates = np.array(
+        [_PRICING_FLAT.get(model, _UNPRICED)[:3] for model in model_rows],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+    
+    ins = np.asarray(input_tokens, dtype=np.float64)
+    outs = np.asarray(output_tokens, dtype=np.float64)
+    cached = (
+        np.zeros_like(ins) if cached_input_tokens is None
+        else np.asarray(cached_input_tokens, dtype=np.float64)
+    )
+    return (ins - cached) * rates[ids, 0] + cached * rates[ids, 1] + outs * rates[ids, 2]
+
+
+# Fixed part of format_summary_for_display, filled from get_summary()
+_SUMMARY_TEMPLATE = (
+    "📊 API USAGE SUMMARY\n"
+    "Total Calls: {total_calls}\n"
+    "\n"
+    "🔤 TOKENS\n"
+    "  Input:  {total_input_tokens:,}\n"
+    "  Output: {total_output_tokens:,}\n"
+    "  Total:  {total_tokens:,}\n"
+    "\n"
+    "💰 COSTS\n"
+    "  Total Cost: ${total_cost_usd:.6f} USD\n"
+    "  Cost per 1K tokens: ${cost_per_1k_tokens:.6f}"
+)
+
+# How many recent TokenUsage records a tracker keeps for inspection; totals and
+# the per-model breakdown cover every call regardless
+MAX_RECORDED_CALLS = 2048
 
 
 class TokenCostTracker:
     """Track and aggregate token costs across multiple API calls"""
     
-    def __init__(self):
-        self.calls: list[TokenUsage] = []
+    def __init__(self, max_recorded_calls: int = MAX_RECORDED_CALLS):
+        # Ring buffer of the most recent calls (debugging/inspection only)
+        self.calls: Deque[TokenUsage] = deque(maxlen=max_recorded_calls)
+        # Running totals kept by track() so the summary properties are O(1)
+        self._call_count = 0
+        self._total_input = 0
+        self._total_cached_input = 0
+        self._total_output = 0
+        self._total_cost = 0.0
+        # model -> [input, output, cost], also maintained by track()
+        self._by_model: Dict[str, list] = {}
+        # (call count it was built at, text) for format_summary_for_display
+        self._display_cache: Tuple[int, str] = (-1, "")
+    
+    def track(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cached_input_tokens: int = 0
+    ) -> float:
+        """Add a call to the running totals without recording it; returns its cost in USD"""
+        model = sys.intern(model)
+        input_cost, output_cost = _price_call(model, input_tokens, output_tokens, cached_input_tokens)
+        cost = input_cost + output_cost
+        
+        self._call_count += 1
+        self._total_input += input_tokens
+        self._total_cached_input += cached_input_tokens
+        self._total_output += output_tokens
+        self._total_cost += cost
+        
+        row = self._by_model.get(model)
+        if row is None:
+            row = self._by_model[model] = [0, 0, 0.0]
+        row[0] += input_tokens
+        row[1] += output_tokens
+        row[2] += cost
+        return cost
     
-    def add_call(self, model: str, input_tokens: int, output_tokens: int) -> None:
-        """Record a token usage from an API call"""
-        usage = TokenUsage(
+    def add_call(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cached_input_tokens: int = 0
+    ) -> None:
+        """Record a token usage from an API call (totals plus the recent-calls buffer)"""
+        model = sys.intern(model)
+        self.track(model, input_tokens, output_tokens, cached_input_tokens)
+        self.calls.append(TokenUsage(
             model=model,
             input_tokens=input_tokens,
             output_tokens=output_tokens,
-            total_tokens=input_tokens + output_tokens
-        )
-        self.calls.append(usage)
+            cached_input_tokens=cached_input_tokens
+        ))
+    
+    def merge(self, other: "TokenCostTracker") -> None:
+        """Add another tracker's totals and per-model breakdown into this one"""
+        self._call_count += other._call_count
+        self._total_input += other._total_input
+        self._total_cached_input += other._total_cached_input
+        self._total_output += other._total_output
+        self._total_cost += other._total_cost
+        for model, other_row in list(other._by_model.items()):
+            row = self._by_model.get(model)
+            if row is None:
+                row = self._by_model[model] = [0, 0, 0.0]
+            for i, value in enumerate(other_row):
+                row[i] += value
     
     @property
     def total_input_tokens(self) -> int:
         """Get total input tokens across all calls"""
-        return sum(call.input_tokens for call in self.calls)
+        return self._total_input
+    
+    @property
+    def total_cached_input_tokens(self) -> int:
+        """Get total input tokens served from the prompt cache"""
+        return self._total_cached_input
     
     @property
     def total_output_tokens(self) -> int:
         """Get total output tokens across all calls"""
-        return sum(call.output_tokens for call in self.calls)
+        return self._total_output
     
     @property
     def total_tokens(self) -> int:
         """Get total tokens (input + output)"""
-        return self.total_input_tokens + self.total_output_tokens
+        return self._total_input + self._total_output
     
     @property
     def total_cost_usd(self) -> float:
         """Get total cost in USD for all calls"""
-        return sum(call.total_cost_usd for call in self.calls)
+        return self._total_cost
     
     @property
     def cost_breakdown_by_model(self) -> Dict[str, Dict]:
-        """Get cost breakdown by model"""
-        breakdown = {}
-        for call in self.calls:
-            model = call.model
-            if model not in breakdown:
-                breakdown[model] = {
-                    "model_name": call.model_name,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "total_tokens": 0,
-                    "cost_usd": 0.0
-                }
-            breakdown[model]["input_tokens"] += call.input_tokens
-            breakdown[model]["output_tokens"] += call.output_tokens
-            breakdown[model]["total_tokens"] += call.total_tokens
-            breakdown[model]["cost_usd"] += call.total_cost_usd
-        return breakdown
+        """Get cost breakdown by model (built from the running per-model totals)"""
+        return {
+            model: {
+                "model_name": _model_name(model),
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+                "cost_usd": cost
+            }
+            for model, (input_tokens, output_tokens, cost) in self._by_model.items()
+        }
     
     def get_summary(self) -> Dict:
         """Get comprehensive summary of token usage and costs"""
         return {
-            "total_calls": len(self.calls),
+            "total_calls": self._call_count,
             "total_input_tokens": self.total_input_tokens,
             "total_output_tokens": self.total_output_tokens,
+            "total_cached_input_tokens": self.total_cached_input_tokens,
             "total_tokens": self.total_tokens,
             "total_cost_usd": self.total_cost_usd,
             "cost_per_1k_tokens": (self.total_cost_usd / max(self.total_tokens / 1000, 1)),
@@ -136,46 +295,78 @@ class TokenCostTracker:
         }
     
     def format_summary_for_display(self) -> str:
-        """Format summary as readable string"""
+        """Format summary as readable string (rebuilt only after new calls are tracked)"""
+        # _call_count grows on every tracked call, so it doubles as a version stamp
+        built_at, text = self._display_cache
+        if built_at == self._call_count:
+            return text
+        
         summary = self.get_summary()
-        lines = [
-            f"📊 API USAGE SUMMARY",
-            f"Total Calls: {summary['total_calls']}",
-            f"",
-            f"🔤 TOKENS",
-            f"  Input:  {summary['total_input_tokens']:,}",
-            f"  Output: {summary['total_output_tokens']:,}",
-            f"  Total:  {summary['total_tokens']:,}",
-            f"",
-            f"💰 COSTS",
-            f"  Total Cost: ${summary['total_cost_usd']:.6f} USD",
-            f"  Cost per 1K tokens: ${summary['cost_per_1k_tokens']:.6f}",
-        ]
+        lines = [_SUMMARY_TEMPLATE.format_map(summary)]
         
         if summary['cost_by_model']:
-            lines.append("")
-            lines.append("📈 COST BY MODEL")
-            for model, data in summary['cost_by_model'].items():
-                lines.append(f"  {data['model_name']}:")
-                lines.append(f"    Tokens: {data['total_tokens']:,} ({data['input_tokens']:,}→{data['output_tokens']:,})")
-                lines.append(f"    Cost: ${data['cost_usd']:.6f}")
+            # One three-line block per model
+            lines += ["", "📈 COST BY MODEL"]
+            lines += [
+                f"  {data['model_name']}:\n"
+                f"    Tokens: {data['total_tokens']:,} ({data['input_tokens']:,}→{data['output_tokens']:,})\n"
+                f"    Cost: ${data['cost_usd']:.6f}"
+                for data in summary['cost_by_model'].values()
+            ]
         
-        return "\n".join(lines)
+        text = "\n".join(lines)
+        self._display_cache = (self._call_count, text)
+        return text
+
+
+# One tracker per context: asyncio copies the current context into every task,
+# so a tracker installed with tracking_scope() collects the calls of the
+# coroutine that opened it (and of tasks it spawns), while concurrent analyses
+# on the same event loop, or on other threads, each keep their own totals.
+# Every live tracker is also registered weakly so aggregate_all() can report
+# process-wide usage.
+_current: ContextVar[Optional["TokenCostTracker"]] = ContextVar("token_cost_tracker", default=None)
+_registry: "weakref.WeakSet[TokenCostTracker]" = weakref.WeakSet()
+_registry_lock = threading.Lock()
 
 
-# Global tracker instance
-_tracker: Optional[TokenCostTracker] = None
+def _new_tracker() -> TokenCostTracker:
+    tracker = TokenCostTracker()
+    with _registry_lock:
+        _registry.add(tracker)
+    return tracker
 
 
 def get_tracker() -> TokenCostTracker:
-    """Get or create the global token cost tracker"""
-    global _tracker
-    if _tracker is None:
-        _tracker = TokenCostTracker()
-    return _tracker
+    """Get the current context's token cost tracker"""
+    tracker = _current.get()
+    if tracker is None:
+        tracker = _new_tracker()
+        _current.set(tracker)
+    return tracker
+
+
+@contextmanager
+def tracking_scope() -> Iterator[TokenCostTracker]:
+    """Record calls made inside the block on a fresh tracker, restoring the previous one on exit"""
+    tracker = _new_tracker()
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
 
 
 def reset_tracker() -> None:
-    """Reset the global tracker"""
-    global _tracker
-    _tracker = TokenCostTracker()
+    """Start a fresh tracker for the current context"""
+    _current.set(_new_tracker())
+
+
+def aggregate_all() -> TokenCostTracker:
+    """Combined totals of every live tracker (recent-calls buffer left empty)"""
+    combined = TokenCostTracker()
+    with _registry_lock:
+        trackers = list(_registry)
+    for tracker in trackers:
+        combined.merge(tracker)
+    return combined
@@ -3,6 +3,7 @@ OpenAI API wrapper with automatic token cost tracking.
 Intercepts API calls to record token usage.
 """
 
+import inspect
 import logging
 from typing import Optional, Any
 from functools import wraps
@@ -10,60 +11,50 @@ from app.core.token_costs import get_tracker
 
 logger = logging.getLogger(__name__)
 
+_NO_USAGE = object()
+
+
+def _record_usage(response: Any, model: str) -> None:
+    """Add the response's token usage (if it has any) to the global tracker"""
+    usage = getattr(response, 'usage', _NO_USAGE)
+    if usage is _NO_USAGE:
+        return
+
+    input_tokens = getattr(usage, 'prompt_tokens', 0)
+    output_tokens = getattr(usage, 'completion_tokens', 0)
+    get_tracker().add_call(
+        model=model,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens
+    )
+    # %-style args: logging only interpolates when DEBUG is actually enabled
+    logger.debug("Tracked tokens for %s: %s input, %s output", model, input_tokens, output_tokens)
+
 
 def track_tokens(model: str):
     """Decorator to track tokens from function that returns OpenAI response"""
     def decorator(func):
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            result = await func(*args, **kwargs)
-            
-            # Try to extract token usage from response
-            if hasattr(result, 'usage'):
-                usage = result.usage
-                tracker = get_tracker()
-                tracker.add_call(
-                    model=model,
-                    input_tokens=getattr(usage, 'prompt_tokens', 0),
-                    output_tokens=getattr(usage, 'completion_tokens', 0)
-                )
-                logger.debug(f"Tracked tokens for {model}: {getattr(usage, 'prompt_tokens', 0)} input, {getattr(usage, 'completion_tokens', 0)} output")
-            
-            return result
-        
+        # Return async or sync wrapper based on function type (decided once, here)
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                result = await func(*args, **kwargs)
+                _record_usage(result, model)
+                return result
+
+            return async_wrapper
+
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
             result = func(*args, **kwargs)
-            
-            # Try to extract token usage from response
-            if hasattr(result, 'usage'):
-                usage = result.usage
-                tracker = get_tracker()
-                tracker.add_call(
-                    model=model,
-                    input_tokens=getattr(usage, 'prompt_tokens', 0),
-                    output_tokens=getattr(usage, 'completion_tokens', 0)
-                )
-                logger.debug(f"Tracked tokens for {model}: {getattr(usage, 'prompt_tokens', 0)} input, {getattr(usage, 'completion_tokens', 0)} output")
-            
+            _record_usage(result, model)
             return result
-        
-        # Return async or sync wrapper based on function type
-        if hasattr(func, '__code__') and func.__code__.co_flags & 0x100:
-            return async_wrapper
+
         return sync_wrapper
-    
+
     return decorator
 
 
 def extract_and_track_tokens(response: Any, model: str) -> None:
     """Extract tokens from response and track them"""
-    if hasattr(response, 'usage'):
-        usage = response.usage
-        tracker = get_tracker()
-        tracker.add_call(
-            model=model,
-            input_tokens=getattr(usage, 'prompt_tokens', 0),
-            output_tokens=getattr(usage, 'completion_tokens', 0)
-        )
-        logger.debug(f"Tracked tokens for {model}: {getattr(usage, 'prompt_tokens', 0)} input, {getattr(usage, 'completion_tokens', 0)} output")
+    _record_usage(response, model)
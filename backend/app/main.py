@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from prometheus_client import make_asgi_app
 import time
@@ -54,6 +55,7 @@ app = FastAPI(
     version=settings.VERSION,
     description="Sistema de monitoreo de precios competitivos para Louder Audio",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -1,12 +1,15 @@
 """
 Data models for Mercado Libre scraping and analysis.
 Extracted from agente_precios_ml_gagr.ipynb
+
+Models are slotted dataclasses: a scrape produces hundreds of Offer
+instances, and __slots__ drops the per-instance __dict__.
 """
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 
 
-@dataclass
+@dataclass(slots=True)
 class IdentifiedProduct:
     """Producto identificado a partir de descripción."""
     brand: Optional[str]
@@ -15,7 +18,7 @@ class IdentifiedProduct:
     signature: str  # Unique identifier for the product
 
 
-@dataclass
+@dataclass(slots=True)
 class Offer:
     """Oferta individual de un producto en Mercado Libre."""
     title: str
@@ -23,7 +26,6 @@ class Offer:
     condition: str  # new, used, unknown
     url: str
     item_id: str
-    item_id: str
     source: str  # preloaded_state, jsonld
     image_url: Optional[str] = None
     seller_name: Optional[str] = None
@@ -48,7 +50,7 @@ class Offer:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class PriceStatistics:
     """Estadísticas de precios para un grupo de ofertas."""
     n: int
@@ -78,7 +80,7 @@ class PriceStatistics:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ScrapingResult:
     """Resultado completo del scraping de Mercado Libre."""
     identified_product: IdentifiedProduct
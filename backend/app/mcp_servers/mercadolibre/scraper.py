@@ -1,13 +1,21 @@
 import re
-import json
+import logging
 import time
 import asyncio
 import random
+import sys
+import orjson
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import islice
 # from httpx import AsyncClient, Timeout
+from curl_cffi import CurlHttpVersion
 from curl_cffi.requests import AsyncSession
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 from datetime import datetime
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+from lxml.etree import XPath
 
 from .models import IdentifiedProduct, Offer, ScrapingResult
 from app.core.logging import get_logger
@@ -77,6 +85,140 @@ DEFAULT_HEADERS = {
 }
 
 
+def create_scraper_session(timeout: float = 30.0, max_clients: int = 10) -> AsyncSession:
+    """
+    Create a curl_cffi session configured like the scraper's own fetches.
+    
+    Share one across many scrapes (e.g. a bulk catalog run) so TCP/TLS
+    connections to Mercado Libre are pooled instead of re-established per request;
+    HTTP/2 lets concurrent fetches to the same host multiplex over one connection.
+    Chrome 110 is sometimes more stable for bypassing than latest bleeding edge.
+    """
+    return AsyncSession(
+        impersonate="chrome110",
+        timeout=timeout,
+        allow_redirects=True,
+        verify=True,
+        max_clients=max_clients,
+        http_version=CurlHttpVersion.V2TLS
+    )
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate equivalent to the CSS class selector `.name`."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Precompiled XPath for product pages (_extract_details_from_html).
+# Tuples are fallbacks tried in order (see _first_match).
+_XP_PAGE_TITLE = XPath("//title/text()")
+_XP_H1 = XPath("(//h1)[1]")
+_XP_TITLE = (
+    XPath(f"(//*[{_has_class('ui-pdp-title')}])[1]"),
+    XPath("(//h1)[1]"),
+)
+_XP_PRICE_META = XPath("//meta[@itemprop='price']/@content")
+_XP_PRICE_FRAC = (
+    XPath(f"(//*[{_has_class('ui-pdp-price__second-line')}]//*[{_has_class('andes-money-amount__fraction')}])[1]"),
+    XPath(f"(//*[{_has_class('andes-money-amount__fraction')}])[1]"),
+)
+# Image sources in priority order: meta content first, then the first <img> per selector
+_XP_IMAGE_META = (
+    XPath("//meta[@property='og:image']/@content"),
+    XPath("//meta[@name='twitter:image']/@content"),
+)
+_XP_IMAGE_IMG = (
+    XPath(f"(//*[{_has_class('ui-pdp-gallery__figure')}]//img)[1]"),
+    XPath("(//img[contains(@alt, 'imagen')])[1]"),
+    XPath("(//img[contains(@alt, 'producto')])[1]"),
+    XPath("((//*[contains(@class, 'gallery')])[1]//img)[1]"),
+    XPath("((//*[contains(@class, 'carousel')])[1]//img)[1]"),
+)
+_XP_MAIN = (
+    XPath("(//main)[1]"),
+    XPath("(//*[@role='main'])[1]"),
+)
+_XP_DESC_IMG = XPath(".//img")
+# Filters run inside libxml2 so Python only sees candidates. Last-resort image:
+# first <img> src longer than 50 chars without "tracking"/"pixel" (any case)
+_LOWER_SRC = "translate(@src, 'ACEGIKLNPRTX', 'acegiklnprtx')"
+_XP_LAST_RESORT_IMG_SRC = XPath(
+    "(//img[string-length(@src) > 50]"
+    f"[not(contains({_LOWER_SRC}, 'tracking'))][not(contains({_LOWER_SRC}, 'pixel'))])[1]/@src"
+)
+_XP_SPECS_ROWS = XPath(f"//*[{_has_class('ui-pdp-specs__table')}]//tr[count(.//th | .//td) = 2]")
+_XP_CELLS = XPath(".//th | .//td")
+_XP_SCRIPTS = XPath("//script")
+
+# Precompiled XPath for listing pages (offers_from_html), relative to each result item
+_XP_LIST_ITEMS = XPath(f"//*[{_has_class('ui-search-layout__item')}]")
+_XP_ITEM_TITLE = (
+    XPath(f"(.//*[{_has_class('ui-search-item__title')}])[1]"),
+    XPath(f"(.//*[{_has_class('poly-component__title')}])[1]"),
+)
+_XP_ITEM_PRICE = (
+    XPath(f"(.//*[{_has_class('ui-search-price__part')}])[1]"),
+    XPath(f"(.//*[{_has_class('andes-money-amount')}])[1]"),
+)
+_XP_ITEM_PRICE_FRAC = XPath(f"(.//*[{_has_class('andes-money-amount__fraction')}])[1]")
+_XP_ITEM_LINK = (
+    XPath(f"(.//a[{_has_class('ui-search-link')}])[1]"),
+    XPath("(.//a)[1]"),
+)
+_XP_ITEM_IMG = (
+    XPath(f"(.//img[{_has_class('ui-search-result-image__element')}])[1]"),
+    XPath(f"(.//*[{_has_class('poly-component__picture')}])[1]"),
+)
+_XP_ITEM_SELLER = (
+    XPath(f"(.//*[{_has_class('ui-search-official-store-label')}])[1]"),
+    XPath(f"(.//*[{_has_class('poly-component__seller')}])[1]"),
+)
+_XP_ITEM_FULL = (
+    XPath(f"(.//*[{_has_class('ui-search-item__fulfillment-label')}])[1]"),
+    XPath(f"(.//*[{_has_class('poly-component__shipping-badge')}])[1]"),
+)
+_XP_ITEM_FULL_ICON = XPath(f"(.//span[{_has_class('ui-search-item__fulfillment-label')}]//svg)[1]")
+_XP_ITEM_POLY_SHIPPING = XPath(f"(.//*[{_has_class('poly-component__shipping-badge')}])[1]")
+_XP_DESC_SVG = XPath("(.//svg)[1]")
+_XP_ITEM_RATING = (
+    XPath(f"(.//*[{_has_class('ui-search-reviews__rating-number')}])[1]"),
+    XPath(f"(.//*[{_has_class('poly-reviews__rating')}])[1]"),
+)
+_XP_ITEM_REVIEWS = (
+    XPath(f"(.//*[{_has_class('ui-search-reviews__amount')}])[1]"),
+    XPath(f"(.//*[{_has_class('poly-reviews__total')}])[1]"),
+)
+
+
+def _parse_html(html: str) -> Optional[lxml.html.HtmlElement]:
+    """Parse a page once with lxml; None for empty or unparseable documents."""
+    try:
+        return lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def _first(results: list) -> Any:
+    """First XPath result, or None."""
+    return results[0] if results else None
+
+
+def _first_match(node: lxml.html.HtmlElement, xpaths: tuple) -> Any:
+    """First result of the first XPath in `xpaths` that matches anything."""
+    for xp in xpaths:
+        results = xp(node)
+        if results:
+            return results[0]
+    return None
+
+
+def _img_src(img: Optional[lxml.html.HtmlElement]) -> Optional[str]:
+    """src (or lazy-loaded data-src) of an <img> element."""
+    if img is None:
+        return None
+    return img.get('src') or img.get('data-src')
+
+
 # Accessory keywords to filter out
 ACCESSORY_NEGATIVES = [
     "funda", "case", "carcasa", "protector", "mica", "glass", "templado", "cable",
@@ -84,21 +226,73 @@ ACCESSORY_NEGATIVES = [
     "almohadillas", "earpads", "estuche", "solo caja"
 ]
 
+# All negatives as one alternation so a title is scanned once, not once per keyword
+_ACCESSORY_RE = re.compile("|".join(re.escape(w) for w in ACCESSORY_NEGATIVES))
+
+
+# Precompiled patterns for the text/JSON helpers below
+_RE_NONALNUM = re.compile(r"[^a-z0-9]")
+_RE_SLUG = re.compile(r"[^a-z0-9]+")
+_RE_MODEL = re.compile(r"\b([a-z]{1,4}\s*[-]?\s*\d{2,6}\s*[a-z]{0,6}\d*)\b")
+_PRELOAD_MARKER = "__PRELOADED_STATE__"
+_RE_PRELOAD = re.compile(r"__PRELOADED_STATE__\s*=\s*")
+_RE_UNDEF = re.compile(r"\bundefined\b")
+_RE_TRAIL_COMMA = re.compile(r",\s*([}\]])")
+# Tokens for extract_js_object_by_brackets: "..." / '...' literals (no groups),
+# then (1) "{", (2) "}", (3) an unterminated quote
+_RE_JS_TOKENS = re.compile(
+    r'"[^"\\]*(?:\\.[^"\\]*)*"|\'[^\'\\]*(?:\\.[^\'\\]*)*\'|(\{)|(\})|(["\'])',
+    re.DOTALL
+)
+_RE_SCRIPT_LD = re.compile(
+    r'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE
+)
+_RE_SCRIPT = re.compile(r"<script([^>]*)>(.*?)</script>", re.DOTALL | re.IGNORECASE)
+_RE_ITEM_ID = re.compile(r"ML[A-Z]-?\d+")
+# str.translate tables for ASCII fast paths: every char outside [a-z0-9] is
+# deleted (normalize_model) or turned into a space (listing_url slugs)
+_ASCII_NON_SLUG_CHARS = "".join(chr(c) for c in range(128) if not (48 <= c <= 57 or 97 <= c <= 122))
+_ASCII_NONALNUM_TABLE = str.maketrans("", "", _ASCII_NON_SLUG_CHARS)
+_ASCII_SLUG_TABLE = str.maketrans(_ASCII_NON_SLUG_CHARS, " " * len(_ASCII_NON_SLUG_CHARS))
+# Thousands separators in listing prices ("1.299" / "1,299") and the
+# parentheses around review counts ("(123)")
+_PRICE_STRIP = str.maketrans("", "", ".,")
+_PARENS_STRIP = str.maketrans("", "", "()")
 
+
+def ml_item_id(url: str) -> str:
+    """Mercado Libre item id in a URL without its dash (MLM-123 -> MLM123), or ""."""
+    match = _RE_ITEM_ID.search(url)
+    return match.group(0).replace("-", "") if match else ""
+
+
+# normalize_* and match_title are pure and hit repeatedly with the same titles
+# (once per candidate, again across extraction strategies and pages), so memoize.
+@lru_cache(maxsize=4096)
 def normalize_text(s: str) -> str:
     """Normalize text: lowercase and single spaces."""
-    return re.sub(r"\s+", " ", s.lower().strip())
+    # split()/join collapses whitespace runs in C, same as \s+ -> " " plus strip
+    return " ".join(s.lower().split())
 
 
+@lru_cache(maxsize=4096)
 def normalize_model(s: str) -> str:
     """Normalize model: alphanumeric only."""
-    return re.sub(r"[^a-z0-9]", "", normalize_text(s))
+    s = s.lower()
+    if s.isascii():
+        return s.translate(_ASCII_NONALNUM_TABLE)
+    return _RE_NONALNUM.sub("", s)
 
 
+@lru_cache(maxsize=256)
 def extract_product(description: str) -> IdentifiedProduct:
     """
     Extract product brand and model from description.
     
+    Memoized: repeated searches for the same description share one
+    IdentifiedProduct instance, so callers must not mutate it.
+    
     Args:
         description: Product description or name
         
@@ -111,7 +305,7 @@ def extract_product(description: str) -> IdentifiedProduct:
     brand = "sony" if " sony " in f" {d} " else None
     
     # Extract model pattern (e.g., "WH-1000XM5", "MDR-ZX110")
-    mm = re.search(r"\b([a-z]{1,4}\s*[-]?\s*\d{2,6}\s*[a-z]{0,6}\d*)\b", d)
+    mm = _RE_MODEL.search(d)
     model = mm.group(1) if mm else None
     model_norm = normalize_model(model) if model else None
     
@@ -132,19 +326,25 @@ def match_title(title: str, product: IdentifiedProduct) -> bool:
     Returns:
         True if title matches product
     """
+    # IdentifiedProduct is unhashable; the verdict only depends on these fields
+    return _match_title(title, product.model_norm, product.brand)
+
+
+@lru_cache(maxsize=4096)
+def _match_title(title: str, model_norm: Optional[str], brand: Optional[str]) -> bool:
     t = normalize_text(title)
     
     # Filter out accessories
-    if any(x in t for x in ACCESSORY_NEGATIVES):
+    if _ACCESSORY_RE.search(t):
         return False
     
     # Match by model (strongest match)
-    if product.model_norm:
-        return product.model_norm in normalize_model(title)
+    if model_norm:
+        return model_norm in normalize_model(title)
     
     # Match by brand (weaker match)
-    if product.brand:
-        return product.brand in t
+    if brand:
+        return brand in t
     
     # Default: accept (for generic searches)
     return True
@@ -166,7 +366,12 @@ def listing_url(query: str, price_min: Optional[float] = None, price_max: Option
         listing_url("cable xlr", 200, 300)
         → https://listado.mercadolibre.com.mx/cable-xlr#D[A:200-300]
     """
-    slug = re.sub(r"[^a-z0-9]+", "-", normalize_text(query)).strip("-")
+    text = normalize_text(query)
+    if text.isascii():
+        # Non-alnum runs -> single "-" without the regex engine
+        slug = "-".join(text.translate(_ASCII_SLUG_TABLE).split())
+    else:
+        slug = _RE_SLUG.sub("-", text).strip("-")
     base_url = f"https://listado.mercadolibre.com.mx/{slug}"
     
     # Add price filter if specified
@@ -196,6 +401,10 @@ def extract_js_object_by_brackets(text: str, start_idx: int) -> Optional[str]:
     Extract JavaScript object by balanced bracket matching.
     More robust than regex for nested objects.
     
+    The scan runs on _RE_JS_TOKENS: each match is a whole quoted string
+    (skipped in C, escapes included), a brace, or an unterminated quote, so
+    Python only handles braces instead of every character of a multi-MB blob.
+    
     Args:
         text: Full text containing JS object
         start_idx: Index of opening brace '{'
@@ -208,32 +417,21 @@ def extract_js_object_by_brackets(text: str, start_idx: int) -> Optional[str]:
         return None
     
     depth = 0
-    in_str = False
-    esc = False
-    quote = ""
     
-    for j in range(i, len(text)):
-        ch = text[j]
-        
-        if in_str:
-            if esc:
-                esc = False
-            elif ch == "\\":
-                esc = True
-            elif ch == quote:
-                in_str = False
+    for m in _RE_JS_TOKENS.finditer(text, i):
+        kind = m.lastindex
+        if kind is None:
+            # Complete string literal
             continue
+        if kind == 1:
+            depth += 1
+        elif kind == 2:
+            depth -= 1
+            if depth == 0:
+                return text[i:m.end()]
         else:
-            if ch in ("'", '"'):
-                in_str = True
-                quote = ch
-                continue
-            if ch == "{":
-                depth += 1
-            elif ch == "}":
-                depth -= 1
-                if depth == 0:
-                    return text[i:j+1]
+            # Quote that never closes: the rest of the text is inside a string
+            return None
     
     return None
 
@@ -250,7 +448,15 @@ def extract_preloaded_state(html: str) -> Optional[dict]:
     Returns:
         Parsed dict or None
     """
-    m = re.search(r"__PRELOADED_STATE__\s*=\s*", html)
+    # Locate the marker with str.find (C fastsearch) and only run the regex
+    # at its occurrences to check for the assignment
+    m = None
+    idx = html.find(_PRELOAD_MARKER)
+    while idx != -1:
+        m = _RE_PRELOAD.match(html, idx)
+        if m:
+            break
+        idx = html.find(_PRELOAD_MARKER, idx + len(_PRELOAD_MARKER))
     if not m:
         return None
     
@@ -263,69 +469,215 @@ def extract_preloaded_state(html: str) -> Optional[dict]:
     if not obj_str:
         return None
     
-    # Try direct JSON parse
+    # Try direct JSON parse (orjson: the state blob can be several MB)
     try:
-        return json.loads(obj_str)
+        return orjson.loads(obj_str)
     except Exception:
         pass
     
     # Clean common JS issues
     cleaned = obj_str
-    cleaned = re.sub(r"\bundefined\b", "null", cleaned)
-    cleaned = re.sub(r",\s*([}\]])", r"\1", cleaned)
+    cleaned = _RE_UNDEF.sub("null", cleaned)
+    cleaned = _RE_TRAIL_COMMA.sub(r"\1", cleaned)
     
     try:
-        return json.loads(cleaned)
+        return orjson.loads(cleaned)
     except Exception:
         logger.warning("Failed to parse __PRELOADED_STATE__")
         return None
 
 
-def extract_jsonld_nodes(html: str) -> List[Dict[str, Any]]:
+def _iter_dicts(root: Any):
     """
-    Extract JSON-LD nodes from HTML (fallback method).
+    Yield every dict in a parsed JSON tree (iterative depth-first walk).
+    
+    Uses exact `type(...) is` checks instead of isinstance: orjson only
+    produces plain dicts/lists, and the __PRELOADED_STATE__ tree can have
+    hundreds of thousands of nodes.
+    """
+    stack = [root]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        x = pop()
+        t = type(x)
+        if t is dict:
+            yield x
+            for v in x.values():
+                tv = type(v)
+                if tv is dict or tv is list:
+                    push(v)
+        elif t is list:
+            for v in x:
+                tv = type(v)
+                if tv is dict or tv is list:
+                    push(v)
+
+
+def extract_script_blobs(html: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Collect the embedded JSON sources of a page in a single pass over its <script> tags.
     
     Args:
         html: Page HTML
         
+    Returns:
+        (body of the script holding __PRELOADED_STATE__ or None, JSON-LD script bodies)
+    """
+    state_script = None
+    jsonld_scripts: List[str] = []
+    
+    for m in _RE_SCRIPT.finditer(html):
+        attrs, body = m.group(1), m.group(2)
+        if "application/ld+json" in attrs.lower():
+            jsonld_scripts.append(body)
+        elif state_script is None and _PRELOAD_MARKER in body:
+            state_script = body
+    
+    return state_script, jsonld_scripts
+
+
+def script_blobs_from_doc(doc: lxml.html.HtmlElement) -> Tuple[Optional[str], List[str]]:
+    """
+    Same as extract_script_blobs, for a page already parsed with lxml.
+    
+    Args:
+        doc: Parsed page (see _parse_html)
+        
+    Returns:
+        (body of the script holding __PRELOADED_STATE__ or None, JSON-LD script bodies)
+    """
+    state_script = None
+    jsonld_scripts: List[str] = []
+    
+    for script in _XP_SCRIPTS(doc):
+        body = script.text or ""
+        if "application/ld+json" in (script.get("type") or "").lower():
+            jsonld_scripts.append(body)
+        elif state_script is None and _PRELOAD_MARKER in body:
+            state_script = body
+    
+    return state_script, jsonld_scripts
+
+
+def jsonld_nodes_from_scripts(scripts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Parse JSON-LD script bodies and collect their product nodes.
+    
+    Args:
+        scripts: Raw JSON-LD <script> contents
+        
     Returns:
         List of JSON-LD nodes with product data
     """
     nodes = []
     
-    for m in re.finditer(
-        r'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>',
-        html,
-        re.DOTALL | re.IGNORECASE
-    ):
-        raw = m.group(1).strip()
+    for raw in scripts:
         try:
-            data = json.loads(raw)
+            data = orjson.loads(raw.strip())
         except Exception:
             continue
         
         # Traverse object tree to find product nodes
-        stack = [data]
-        while stack:
-            x = stack.pop()
-            if isinstance(x, dict):
-                if ("name" in x or "title" in x) and ("offers" in x or "price" in x):
-                    nodes.append(x)
-                for v in x.values():
-                    if isinstance(v, (dict, list)):
-                        stack.append(v)
-            elif isinstance(x, list):
-                for v in x:
-                    if isinstance(v, (dict, list)):
-                        stack.append(v)
+        for x in _iter_dicts(data):
+            if ("name" in x or "title" in x) and ("offers" in x or "price" in x):
+                nodes.append(x)
     
     return nodes
 
 
+def extract_jsonld_nodes(html: str) -> List[Dict[str, Any]]:
+    """
+    Extract JSON-LD nodes from HTML (fallback method).
+    
+    Args:
+        html: Page HTML
+        
+    Returns:
+        List of JSON-LD nodes with product data
+    """
+    return jsonld_nodes_from_scripts([m.group(1) for m in _RE_SCRIPT_LD.finditer(html)])
+
+
+def jsonld_nodes_by_type(nodes: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Index JSON-LD nodes by schema.org @type (first node wins per type).
+    
+    @type may be a single string or a list of types; a node is indexed under
+    each of them.
+    """
+    by_type: Dict[str, Dict[str, Any]] = {}
+    for node in nodes:
+        types = node.get("@type")
+        if isinstance(types, str):
+            by_type.setdefault(types, node)
+        elif isinstance(types, list):
+            for t in types:
+                if isinstance(t, str):
+                    by_type.setdefault(t, node)
+    return by_type
+
+
+# Where listing pages keep their results in __PRELOADED_STATE__
+_STATE_RESULTS_PATHS = (
+    ("pageState", "initialState", "results"),
+    ("initialState", "results"),
+    ("results",),
+)
+
+
+def _state_results(state: dict) -> Optional[List[dict]]:
+    """Return the results list at a known state path if it looks like offers."""
+    for path in _STATE_RESULTS_PATHS:
+        node: Any = state
+        for key in path:
+            if type(node) is not dict:
+                break
+            node = node.get(key)
+        if type(node) is list and node and all(
+            type(r) is dict and ("title" in r or "name" in r) and "price" in r for r in node
+        ):
+            return node
+    return None
+
+
+def _offer_from_state_node(x: dict, product: IdentifiedProduct) -> Optional[Offer]:
+    """Build an Offer from an offer-shaped state node that matches the product."""
+    g = x.get
+    # Most nodes in the state are not listings: check price first and
+    # only read the remaining fields for candidate offers.
+    price = g("price")
+    if type(price) is dict:
+        price = price.get("amount") or price.get("value")
+    title = (g("title") or g("name")) if price is not None else None
+    if not title:
+        return None
+    
+    try:
+        p = float(price)
+        if not match_title(str(title), product):
+            return None
+        url = g("permalink") or g("url") or ""
+        item_id = g("id") or g("item_id") or ""
+        return Offer(
+            title=str(title),
+            price=p,
+            condition=sys.intern(str(g("condition") or "unknown")),
+            url=str(url),
+            item_id=str(item_id),
+            source="preloaded_state",
+        )
+    except Exception:
+        return None
+
+
 def offers_from_state(state: dict, product: IdentifiedProduct, limit: int = 150) -> List[Offer]:
     """
     Extract offers from __PRELOADED_STATE__.
     
+    Known results paths are probed first; the whole tree is only walked
+    when none of them holds an offer list.
+    
     Args:
         state: Parsed __PRELOADED_STATE__ dict
         product: Target product for filtering
@@ -335,41 +687,17 @@ def offers_from_state(state: dict, product: IdentifiedProduct, limit: int = 150)
         List of Offer objects
     """
     out: List[Offer] = []
-    stack = [state]
     
-    while stack and len(out) < limit:
-        x = stack.pop()
-        
-        if isinstance(x, dict):
-            title = x.get("title") or x.get("name")
-            price = x.get("price")
-            if isinstance(price, dict):
-                price = price.get("amount") or price.get("value")
-            url = x.get("permalink") or x.get("url") or ""
-            item_id = x.get("id") or x.get("item_id") or ""
-            
-            if title and price is not None:
-                try:
-                    p = float(price)
-                    if match_title(str(title), product):
-                        out.append(Offer(
-                            title=str(title),
-                            price=p,
-                            condition=str(x.get("condition") or "unknown"),
-                            url=str(url),
-                            item_id=str(item_id),
-                            source="preloaded_state",
-                        ))
-                except Exception:
-                    pass
-            
-            for v in x.values():
-                if isinstance(v, (dict, list)):
-                    stack.append(v)
-        elif isinstance(x, list):
-            for v in x:
-                if isinstance(v, (dict, list)):
-                    stack.append(v)
+    nodes = _state_results(state)
+    if nodes is None:
+        nodes = _iter_dicts(state)
+    
+    for x in nodes:
+        offer = _offer_from_state_node(x, product)
+        if offer is not None:
+            out.append(offer)
+            if len(out) >= limit:
+                break
     
     return out
 
@@ -425,6 +753,69 @@ def offers_from_jsonld(nodes: List[Dict[str, Any]], product: IdentifiedProduct,
     return out
 
 
+def extract_listing_offers(
+    html: str,
+    product: IdentifiedProduct,
+    max_offers: int
+) -> Tuple[List[Offer], str]:
+    """
+    Run the listing-page strategies in priority order: HTML, __PRELOADED_STATE__, JSON-LD.
+    
+    Args:
+        html: Listing page HTML
+        product: Target product for filtering
+        max_offers: Offers wanted (JSON strategies collect up to 6x before trimming)
+        
+    Returns:
+        (offers, strategy name)
+    """
+    # Try HTML parsing (lxml) - Primary strategy for new layout
+    offers = list(islice(offers_from_html(html, product), max_offers))
+    if offers:
+        logger.info("Extracted offers", source="html_parsing", count=len(offers))
+        return offers, "html_parsing"
+    strategy = "no_offers"
+    
+    # JSON fallbacks: locate both embedded sources in one pass over the page
+    state_script, jsonld_scripts = extract_script_blobs(html)
+    
+    # Try __PRELOADED_STATE__ (Legacy)
+    if state_script:
+        state = extract_preloaded_state(state_script)
+        if isinstance(state, dict):
+            offers = offers_from_state(state, product, limit=max_offers * 6)
+            strategy = "preloaded_state"
+            logger.info("Extracted offers", source="preloaded_state", count=len(offers))
+    
+    # Fallback to JSON-LD
+    if not offers:
+        nodes = jsonld_nodes_from_scripts(jsonld_scripts)
+        offers = offers_from_jsonld(nodes, product, limit=max_offers * 6)
+        strategy = "jsonld" if offers else strategy
+        if offers:
+            logger.info("Extracted offers", source="jsonld", count=len(offers))
+    
+    return offers, strategy
+
+
+# (second, ISO string) of the last timestamp handed out by _iso_now
+_TS_CACHE: List[Any] = [-1, ""]
+
+
+def _iso_now() -> str:
+    """Local ISO-8601 timestamp at second resolution, formatted once per second."""
+    t = int(time.time())
+    if _TS_CACHE[0] != t:
+        _TS_CACHE[0] = t
+        _TS_CACHE[1] = datetime.fromtimestamp(t).isoformat()
+    return _TS_CACHE[1]
+
+
+# Short-lived cache of fetched pages (search bypass + batches re-request listings)
+FETCH_CACHE_TTL = 60.0
+FETCH_CACHE_MAX_ENTRIES = 128
+
+
 class MLWebScraper:
     """
     Mercado Libre web scraper.
@@ -432,8 +823,41 @@ class MLWebScraper:
     Uses curl_cffi to impersonate Chrome and bypass Captchas.
     """
     
-    def __init__(self):
+    def __init__(self, session: Optional[AsyncSession] = None):
+        """
+        Args:
+            session: Optional shared curl_cffi session (see create_scraper_session).
+                The caller owns it and must close it. Without one, the scraper
+                creates its own on first use and reuses it for every fetch;
+                release it with aclose() (or `async with MLWebScraper() as s`).
+        """
         self.timeout = 30.0
+        self.session = session
+        self._owns_session = False
+        # url -> (fetched_at, html); recent pages are served without a new request
+        self._fetch_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # url -> in-flight fetch, so concurrent callers share a single request
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self) -> "MLWebScraper":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the session this scraper created (a caller-provided one is left open)."""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+
+    def _get_session(self) -> AsyncSession:
+        """Shared session for all requests of this scraper, created lazily."""
+        if self.session is None:
+            self.session = create_scraper_session(timeout=self.timeout)
+            self._owns_session = True
+        return self.session
 
     def _get_headers(self) -> Dict[str, str]:
         """Get highly trusted Chrome headers."""
@@ -451,50 +875,78 @@ class MLWebScraper:
             
         Raises:
             Exception: If request fails after retries
+        
+        Successful responses are cached for FETCH_CACHE_TTL seconds, and
+        concurrent calls for the same URL wait on one shared request.
         """
-        max_retries = 3
-        base_delay = 2
+        cached = self._fetch_cache.get(url)
+        if cached is not None and time.monotonic() - cached[0] < FETCH_CACHE_TTL:
+            self._fetch_cache.move_to_end(url)
+            logger.debug(f"Fetch cache hit for {url}")
+            return cached[1]
         
-        # We create a new session for each fetch to avoid stale states/cookies if desired,
-        # or we could keep one. For simplicity and robustness, new session per request.
-        # Chrome 110 is sometimes more stable for bypassing than latest bleeding edge
-        async with AsyncSession(
-            impersonate="chrome110", 
-            timeout=self.timeout,
-            allow_redirects=True,
-            verify=True
-        ) as client:
-            for attempt in range(max_retries):
-                try:
-                    headers = self._get_headers()
-                    # Randomize delay slightly to feel organic
-                    await asyncio.sleep(random.uniform(0.5, 1.5))
-                    
-                    response = await client.get(url, headers=headers)
-                    
-                    if response.status_code == 200:
-                        return response.text
-                    
-                    if response.status_code in (429, 503):
-                        # Rate limit or server busy
-                        delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
-                        logger.warning(f"Got {response.status_code} for {url}. Retrying in {delay:.2f}s...")
-                        await asyncio.sleep(delay)
-                        continue
+        task = self._inflight.get(url)
+        if task is None:
+            max_retries = 3
+            base_delay = 2
+            task = asyncio.ensure_future(
+                self._fetch_with_retries(self._get_session(), url, max_retries, base_delay)
+            )
+            self._inflight[url] = task
+            task.add_done_callback(lambda t: self._on_fetch_done(url, t))
+        
+        # Shield: one cancelled caller must not abort the fetch others are awaiting
+        return await asyncio.shield(task)
+    
+    def _on_fetch_done(self, url: str, task: asyncio.Future) -> None:
+        """Store a finished fetch in the cache (failures are not cached)."""
+        self._inflight.pop(url, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._fetch_cache[url] = (time.monotonic(), task.result())
+        self._fetch_cache.move_to_end(url)
+        while len(self._fetch_cache) > FETCH_CACHE_MAX_ENTRIES:
+            self._fetch_cache.popitem(last=False)
+    
+    async def _fetch_with_retries(
+        self,
+        client: AsyncSession,
+        url: str,
+        max_retries: int,
+        base_delay: float
+    ) -> str:
+        """GET url with retry/backoff on rate limiting and transient errors."""
+        for attempt in range(max_retries):
+            try:
+                headers = self._get_headers()
+                # Randomize delay slightly to feel organic
+                await asyncio.sleep(random.uniform(0.5, 1.5))
+                
+                response = await client.get(url, headers=headers)
+                
+                if response.status_code == 200:
+                    return response.text
+                
+                if response.status_code in (429, 503):
+                    # Rate limit or server busy
+                    delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
+                    logger.warning(f"Got {response.status_code} for {url}. Retrying in {delay:.2f}s...")
+                    await asyncio.sleep(delay)
+                    continue
+                 
+                if response.status_code == 404:
+                     raise Exception(f"404 Not Found: {url}")
                      
-                    if response.status_code == 404:
-                         raise Exception(f"404 Not Found: {url}")
-                         
-                    # Standard error raising for other codes
-                    response.raise_for_status()
-                    
-                except Exception as e:
-                    logger.warning(f"Request error for {url}: {e}. Attempt {attempt + 1}/{max_retries}")
-                    if attempt == max_retries - 1:
-                        raise e
-                    await asyncio.sleep(1)
-            
-            raise Exception(f"Failed to fetch {url} after {max_retries} attempts")
+                # Standard error raising for other codes
+                response.raise_for_status()
+                
+            except Exception as e:
+                logger.warning(f"Request error for {url}: {e}. Attempt {attempt + 1}/{max_retries}")
+                if attempt == max_retries - 1:
+                    raise e
+                await asyncio.sleep(1)
+        
+        raise Exception(f"Failed to fetch {url} after {max_retries} attempts")
     
     async def search_products(
         self,
@@ -555,34 +1007,12 @@ class MLWebScraper:
                 strategy="error",
                 listing_url=url,
                 offers=[],
-                timestamp=datetime.now().isoformat()
+                timestamp=_iso_now()
             )
         
-        offers: List[Offer] = []
-        strategy = "none"
-        
-        # Try HTML parsing (BeautifulSoup) - Primary strategy for new layout
-        if not offers:
-            offers = offers_from_html(html, product, limit=max_offers)
-            strategy = "html_parsing" if offers else "no_offers"
-            if offers:
-                logger.info(f"Extracted {len(offers)} offers from HTML parsing")
-
-        # Try __PRELOADED_STATE__ (Legacy)
-        if not offers:
-            state = extract_preloaded_state(html)
-            if isinstance(state, dict):
-                offers = offers_from_state(state, product, limit=max_offers * 6)
-                strategy = "preloaded_state"
-                logger.info(f"Extracted {len(offers)} offers from __PRELOADED_STATE__")
-        
-        # Fallback to JSON-LD
-        if not offers:
-            nodes = extract_jsonld_nodes(html)
-            offers = offers_from_jsonld(nodes, product, limit=max_offers * 6)
-            strategy = "jsonld" if offers else strategy
-            if offers:
-                logger.info(f"Extracted {len(offers)} offers from JSON-LD")
+        # Parsing is CPU-bound (multi-MB pages): keep it off the event loop so
+        # concurrent scrapes keep fetching while this page is parsed
+        offers, strategy = await asyncio.to_thread(extract_listing_offers, html, product, max_offers)
         
         # Limit offers
         offers = offers[:max_offers]
@@ -598,7 +1028,7 @@ class MLWebScraper:
             strategy=strategy,
             listing_url=url,
             offers=offers,
-            timestamp=datetime.now().isoformat()
+            timestamp=_iso_now()
         )
     
     async def extract_product_details(self, product_url: str) -> Optional[ProductDetails]:
@@ -613,10 +1043,7 @@ class MLWebScraper:
         logger.info("Extracting product details...", url=product_url)
         
         # 1. Extract Product ID (Always needed)
-        product_id = ""
-        match = re.search(r"ML[A-Z]-?\d+", product_url)
-        if match:
-            product_id = match.group(0).replace("-", "")
+        product_id = ml_item_id(product_url)
             
         # 2. Try API Strategy (If Token Exists)
         import os
@@ -675,162 +1102,169 @@ class MLWebScraper:
             logger.error(f"Failed to fetch product page: {e}")
             raise Exception(f"Network/Block Error: {str(e)} (API Context: {api_error})")
         
+        # Parse the page once: the tree yields the embedded JSON scripts here and
+        # is reused by the HTML fallback and the error report below
+        doc = _parse_html(html)
+        if doc is not None:
+            state_script, jsonld_scripts = script_blobs_from_doc(doc)
+        else:
+            state_script, jsonld_scripts = extract_script_blobs(html)
+        
         # Try to extract from __PRELOADED_STATE__
-        state = extract_preloaded_state(html)
+        state = extract_preloaded_state(state_script) if state_script else None
         if state:
             details = self._extract_details_from_state(state, product_url)
             if details:
                 return details
         
         # Fallback to JSON-LD
-        nodes = extract_jsonld_nodes(html)
+        nodes = jsonld_nodes_from_scripts(jsonld_scripts)
         if nodes:
             details = self._extract_details_from_jsonld(nodes, product_url)
             if details:
                 return details
         
-        # Fallback to HTML Parsing (BeautifulSoup)
-        details = self._extract_details_from_html(html, product_url)
+        # Fallback to HTML Parsing (lxml)
+        details = self._extract_details_from_html(html, product_url, doc=doc)
         if details:
             return details
         
         # If we got here, we have HTML but couldn't parse it.
-        if "captcha" in html.lower() or "security" in html.lower():
+        html_lower = html.lower()
+        if "captcha" in html_lower or "security" in html_lower:
              raise Exception(f"Blocked: MercadoLibre serving Captcha. (API Strategy Failed: {api_error})")
-             
-        raise Exception(f"Parsing Error: HTML length {len(html)} but no data found. (API Strategy Failed: {api_error}) Title: {BeautifulSoup(html, 'lxml').title.string if BeautifulSoup(html, 'lxml').title else 'No Title'}")
+        
+        # Title for the report comes from the tree parsed above, not a fresh parse
+        page_title = _first(_XP_PAGE_TITLE(doc)) if doc is not None else None
+        raise Exception(f"Parsing Error: HTML length {len(html)} but no data found. (API Strategy Failed: {api_error}) Title: {page_title or 'No Title'}")
 
     async def _extract_details_from_api(self, item_id: str, token: str) -> Optional[ProductDetails]:
         """Fetch product details from official MercadoLibre API."""
         url = f"https://api.mercadolibre.com/items/{item_id}"
+        desc_url = f"https://api.mercadolibre.com/items/{item_id}/description"
         headers = {"Authorization": f"Bearer {token}"}
         
-        async with AsyncSession(timeout=self.timeout) as client:
-            resp = await client.get(url, headers=headers)
-            if resp.status_code == 200:
-                data = resp.json()
-                
-                # Fetch Description
-                desc_url = f"https://api.mercadolibre.com/items/{item_id}/description"
-                desc_resp = await client.get(desc_url, headers=headers)
-                description = desc_resp.json().get("plain_text", "") if desc_resp.status_code == 200 else ""
+        # Item and description are independent: fetch both in one round trip
+        client = self._get_session()
+        resp, desc_resp = await asyncio.gather(
+            client.get(url, headers=headers),
+            client.get(desc_url, headers=headers),
+            return_exceptions=True
+        )
+        if isinstance(resp, BaseException):
+            raise resp
+        
+        if resp.status_code == 200:
+            data = orjson.loads(resp.content)
+            
+            description = ""
+            if not isinstance(desc_resp, BaseException) and desc_resp.status_code == 200:
+                description = orjson.loads(desc_resp.content).get("plain_text", "")
 
-                attributes = {attr["id"]: attr.get("value_name") for attr in data.get("attributes", [])}
-                
-                return ProductDetails(
-                    product_id=data.get("id"),
-                    title=data.get("title"),
-                    price=float(data.get("price", 0)),
-                    currency=data.get("currency_id"),
-                    condition=data.get("condition"),
-                    brand=attributes.get("BRAND"),
-                    model=attributes.get("MODEL"),
-                    category=data.get("category_id"),
-                    attributes=attributes,
-                    description=description,
-                    images=[p["url"] for p in data.get("pictures", [])],
-                    seller_name=None, # API doesn't expose seller name directly in public item view sometimes
-                    permalink=data.get("permalink"),
-                    image_url=data.get("thumbnail")
-                )
-            elif resp.status_code == 403:
-                raise Exception("API Token Refused (403)")
-            elif resp.status_code == 404:
-                return None
-            else:
-                raise Exception(f"API Error {resp.status_code}")
+            attributes = {attr["id"]: attr.get("value_name") for attr in data.get("attributes", [])}
+            
+            return ProductDetails(
+                product_id=data.get("id"),
+                title=data.get("title"),
+                price=float(data.get("price", 0)),
+                currency=data.get("currency_id"),
+                condition=data.get("condition"),
+                brand=attributes.get("BRAND"),
+                model=attributes.get("MODEL"),
+                category=data.get("category_id"),
+                attributes=attributes,
+                description=description,
+                images=[p["url"] for p in data.get("pictures", [])],
+                seller_name=None, # API doesn't expose seller name directly in public item view sometimes
+                permalink=data.get("permalink"),
+                image_url=data.get("thumbnail")
+            )
+        elif resp.status_code == 403:
+            raise Exception("API Token Refused (403)")
+        elif resp.status_code == 404:
+            return None
+        else:
+            raise Exception(f"API Error {resp.status_code}")
 
-    def _extract_details_from_html(self, html: str, url: str) -> Optional[ProductDetails]:
-        """Extract product details directly from HTML using BeautifulSoup."""
+    def _extract_details_from_html(
+        self,
+        html: str,
+        url: str,
+        doc: Optional[lxml.html.HtmlElement] = None
+    ) -> Optional[ProductDetails]:
+        """Extract product details directly from HTML using lxml + precompiled XPath."""
         try:
-            soup = BeautifulSoup(html, 'lxml')
+            if doc is None:
+                doc = _parse_html(html)
+            if doc is None:
+                logger.warning("Could not parse product page HTML")
+                return None
+            
+            page_title = _first(_XP_PAGE_TITLE(doc)) or "No Title"
             
-            # Debugging: Log what we are seeing
-            page_title = soup.title.string if soup.title else "No Title"
-            h1_text = soup.select_one('h1').get_text().strip() if soup.select_one('h1') else "No H1"
-            logger.info(f"HTML Parsing Debug - Title: {page_title} | H1: {h1_text} | Length: {len(html)}")
+            # Debugging: Log what we are seeing (only gathered when DEBUG is on)
+            if logger.isEnabledFor(logging.DEBUG):
+                h1 = _first(_XP_H1(doc))
+                logger.debug(
+                    "HTML Parsing Debug",
+                    title=page_title,
+                    h1=h1.text_content().strip() if h1 is not None else "No H1",
+                    length=len(html)
+                )
             
             if "captcha" in page_title.lower() or "security" in page_title.lower():
                 logger.error("SCRAPER BLOCKED: Captcha detected")
                 return None
 
-            # 1. Extract Title
-            # Try multiple selectors for title
-            title_tag = soup.select_one('.ui-pdp-title') or soup.find('h1', {'class': 'ui-pdp-title'}) or soup.select_one('h1')
-            if not title_tag:
+            # 1. Extract Title (.ui-pdp-title first, then any h1)
+            title_tag = _first_match(doc, _XP_TITLE)
+            if title_tag is None:
                 logger.warning("Could not find title tag with primary selectors")
                 return None
-            title = title_tag.get_text().strip()
+            title = title_tag.text_content().strip()
             
             # 2. Extract Price
             price = 0.0
-            # Try specific price container first, then generic
             # Sometimes price is in meta tag
-            meta_price = soup.find('meta', itemprop='price')
+            meta_price = _first(_XP_PRICE_META(doc))
             if meta_price:
                 try:
-                    price = float(meta_price['content'])
-                except:
+                    price = float(meta_price)
+                except ValueError:
                     pass
             
             if price == 0.0:
-                price_fraction = soup.select_one('.ui-pdp-price__second-line .andes-money-amount__fraction')
-                if not price_fraction:
-                     price_fraction = soup.select_one('.andes-money-amount__fraction')
-                
-                if price_fraction:
+                # Specific price container first, then generic
+                price_fraction = _first_match(doc, _XP_PRICE_FRAC)
+                if price_fraction is not None:
                     try:
-                        price = float(price_fraction.get_text().strip().replace('.', '').replace(',', ''))
-                    except:
+                        price = float(price_fraction.text_content().strip().translate(_PRICE_STRIP))
+                    except ValueError:
                         pass
             
             # 3. Extract Image with multiple fallbacks
             image_url = None
             
-            # Method 1: Try meta tag og:image (Open Graph)
-            meta_image = soup.find('meta', property='og:image')
-            if meta_image:
-                image_url = self._normalize_image_url(meta_image['content'])
-            
-            # Method 2: Try meta tag twitter:image
-            if not image_url:
-                meta_twitter = soup.find('meta', attrs={'name': 'twitter:image'})
-                if meta_twitter:
-                    image_url = self._normalize_image_url(meta_twitter.get('content'))
-            
-            # Method 3: Try main gallery image selectors
-            if not image_url:
-                img_tag = soup.select_one('.ui-pdp-gallery__figure img')
-                if img_tag:
-                    src = img_tag.get('src') or img_tag.get('data-src')
-                    if src:
-                        image_url = self._normalize_image_url(src)
+            # Methods 1-5: og:image / twitter:image meta, then gallery <img> candidates
+            for xp in _XP_IMAGE_META:
+                content = _first(xp(doc))
+                if content:
+                    image_url = self._normalize_image_url(content)
+                    break
             
-            # Method 4: Try different gallery selector
             if not image_url:
-                img_tag = soup.select_one('img[alt*="imagen"]') or soup.select_one('img[alt*="producto"]')
-                if img_tag:
-                    src = img_tag.get('src') or img_tag.get('data-src')
+                for xp in _XP_IMAGE_IMG:
+                    src = _img_src(_first(xp(doc)))
                     if src:
                         image_url = self._normalize_image_url(src)
-            
-            # Method 5: Try any image in gallery/pictures container
-            if not image_url:
-                gallery = soup.select_one('[class*="gallery"]') or soup.select_one('[class*="carousel"]')
-                if gallery:
-                    img_tag = gallery.select_one('img')
-                    if img_tag:
-                        src = img_tag.get('src') or img_tag.get('data-src')
-                        if src:
-                            image_url = self._normalize_image_url(src)
+                        break
             
             # Method 6: Try first significant image tag in main content
             if not image_url:
-                main_content = soup.select_one('main') or soup.select_one('[role="main"]')
-                if main_content:
-                    img_tags = main_content.select('img')
-                    for img_tag in img_tags:
-                        src = img_tag.get('src') or img_tag.get('data-src')
+                main_content = _first_match(doc, _XP_MAIN)
+                if main_content is not None:
+                    for img_tag in _XP_DESC_IMG(main_content):
+                        src = _img_src(img_tag)
                         # Avoid small icons/logos
                         if src and ('thumb' in src.lower() or 'product' in src.lower() or 'item' in src.lower()):
                             image_url = self._normalize_image_url(src)
@@ -838,28 +1272,20 @@ class MLWebScraper:
             
             # Method 7: Last resort - any img with src that looks like a product image
             if not image_url:
-                for img_tag in soup.find_all('img'):
-                    src = img_tag.get('src') or ''
-                    # Filter out tracking pixels and tiny images
-                    if src and len(src) > 50 and 'tracking' not in src.lower() and 'pixel' not in src.lower():
-                        image_url = self._normalize_image_url(src)
-                        break
+                # Tracking pixels and tiny images are filtered out by the XPath itself
+                src = _first(_XP_LAST_RESORT_IMG_SRC(doc))
+                if src:
+                    image_url = self._normalize_image_url(src)
 
             # 4. Extract Product ID from URL
-            product_id = ""
-            match = re.search(r"ML[A-Z]-?\d+", url)
-            if match:
-                product_id = match.group(0).replace("-", "")
+            product_id = ml_item_id(url)
             
             # 5. Extract Attributes (Basic)
             attributes = {}
-            # Try to grab specs table
-            for row in soup.select('.ui-pdp-specs__table tr'):
-                cols = row.select('th, td')
-                if len(cols) == 2:
-                    k = cols[0].get_text().strip()
-                    v = cols[1].get_text().strip()
-                    attributes[k] = v
+            # Try to grab specs table (rows are pre-filtered to exactly two cells)
+            for row in _XP_SPECS_ROWS(doc):
+                k, v = _XP_CELLS(row)
+                attributes[k.text_content().strip()] = v.text_content().strip()
             
             # Extract Brand/Model from attributes if available
             brand = attributes.get('Marca') or attributes.get('Brand')
@@ -909,74 +1335,77 @@ class MLWebScraper:
             # Navigate the state structure to find product info
             components = state.get("components", {})
             
-            # Try different paths where product data might be
-            product_data = None
-            for key, value in components.items():
-                if isinstance(value, dict) and "product" in value:
-                    product_data = value.get("product")
-                    break
-                elif isinstance(value, dict) and "item" in value:
-                    product_data = value.get("item")
-                    break
+            # First component carrying product data ("product" preferred over "item")
+            product_data = next(
+                (
+                    data
+                    for value in components.values()
+                    if isinstance(value, dict)
+                    for data in (value.get("product") or value.get("item"),)
+                    if data
+                ),
+                None,
+            )
             
             if not product_data:
                 return None
+            pd = product_data
             
             # Extract attributes
             attributes = {}
-            if "attributes" in product_data:
-                for attr in product_data.get("attributes", []):
-                    if isinstance(attr, dict):
-                        name = attr.get("name") or attr.get("id")
-                        value = attr.get("value_name") or attr.get("value")
-                        if name and value:
-                            attributes[name] = value
+            for attr in pd.get("attributes") or ():
+                if isinstance(attr, dict):
+                    name = attr.get("name") or attr.get("id")
+                    value = attr.get("value_name") or attr.get("value")
+                    if name and value:
+                        attributes[name] = value
             
             # Extract images with multiple fallback paths
-            images = []
+            normalize_image = self._normalize_image_url
             
             # Method 1: Try "pictures" array (primary source)
-            if "pictures" in product_data:
-                for pic in product_data.get("pictures", []):
-                    if isinstance(pic, dict) and "url" in pic:
-                        img_url = pic["url"]
-                        if img_url:
-                            images.append(self._normalize_image_url(img_url))
+            images = [
+                normalize_image(pic["url"])
+                for pic in pd.get("pictures") or ()
+                if isinstance(pic, dict) and pic.get("url")
+            ]
             
             # Method 2: Try "thumbnail" field
-            if not images and "thumbnail" in product_data:
-                thumb = product_data.get("thumbnail")
+            if not images:
+                thumb = pd.get("thumbnail")
                 if thumb:
-                    images.append(self._normalize_image_url(thumb))
+                    images.append(normalize_image(thumb))
             
-            # Method 3: Try "image" or "image_url" fields
+            # Method 3: First non-empty of "image", "image_url" or "main_picture"
             if not images:
-                for field in ["image", "image_url", "main_picture"]:
-                    if field in product_data and product_data.get(field):
-                        img_url = product_data.get(field)
-                        if img_url:
-                            images.append(self._normalize_image_url(img_url))
-                        break
+                img_url = next((pd[f] for f in ("image", "image_url", "main_picture") if pd.get(f)), None)
+                if img_url:
+                    images.append(normalize_image(img_url))
             
             # Get first valid image URL (filter out tracking pixels)
             image_url = None
-            if images:
-                valid_images = [img for img in images if img and 'pixel' not in img.lower() and 'tracker' not in img.lower()]
-                image_url = valid_images[0] if valid_images else None
+            for img in images:
+                if img:
+                    lowered = img.lower()
+                    if 'pixel' not in lowered and 'tracker' not in lowered:
+                        image_url = img
+                        break
+            
+            seller = pd.get("seller")
             
             return ProductDetails(
-                product_id=product_data.get("id", ""),
-                title=product_data.get("title", ""),
-                price=float(product_data.get("price", 0)),
-                currency=product_data.get("currency_id", "MXN"),
-                condition=product_data.get("condition", "unknown"),
+                product_id=pd.get("id", ""),
+                title=pd.get("title", ""),
+                price=float(pd.get("price", 0)),
+                currency=pd.get("currency_id", "MXN"),
+                condition=pd.get("condition", "unknown"),
                 brand=attributes.get("Marca") or attributes.get("BRAND"),
                 model=attributes.get("Modelo") or attributes.get("MODEL"),
-                category=product_data.get("category_id"),
+                category=pd.get("category_id"),
                 attributes=attributes,
-                description=product_data.get("description"),
+                description=pd.get("description"),
                 images=images,
-                seller_name=product_data.get("seller", {}).get("nickname") if isinstance(product_data.get("seller"), dict) else None,
+                seller_name=seller.get("nickname") if isinstance(seller, dict) else None,
                 permalink=url,
                 image_url=image_url
             )
@@ -987,12 +1416,8 @@ class MLWebScraper:
     def _extract_details_from_jsonld(self, nodes: List[dict], url: str) -> Optional[ProductDetails]:
         """Extract product details from JSON-LD."""
         try:
-            # Find Product node
-            product_node = None
-            for node in nodes:
-                if node.get("@type") == "Product":
-                    product_node = node
-                    break
+            # Find Product node (also matches "@type": ["Product", ...])
+            product_node = jsonld_nodes_by_type(nodes).get("Product")
             
             if not product_node:
                 return None
@@ -1027,8 +1452,7 @@ class MLWebScraper:
             # Extract product ID from URL or sku
             product_id = product_node.get("sku", "")
             if not product_id:
-                match = re.search(r"ML[A-Z]-?\d+", url)
-                product_id = match.group(0).replace("-", "") if match else ""
+                product_id = ml_item_id(url)
             
             return ProductDetails(
                 product_id=product_id,
@@ -1050,155 +1474,136 @@ class MLWebScraper:
             return None
 
 
-def offers_from_html(html: str, product: IdentifiedProduct, limit: int = 150) -> List[Offer]:
+def _offer_from_item(item: lxml.html.HtmlElement, product: IdentifiedProduct) -> Optional[Offer]:
+    """Build an Offer from one listing result item; None if it has no title or doesn't match."""
+    # Extract Title
+    title_tag = _first_match(item, _XP_ITEM_TITLE)
+    if title_tag is None:
+        return None
+    title = title_tag.text_content().strip()
+    
+    # Filter on the title before paying for the remaining subtree queries
+    if not match_title(title, product):
+        return None
+    
+    # Extract Price
+    price_text = "0"
+    # Try finding the price container
+    price_container = _first_match(item, _XP_ITEM_PRICE)
+    if price_container is not None:
+        # Usually contains a fractional part class
+        fraction = _first(_XP_ITEM_PRICE_FRAC(price_container))
+        if fraction is not None:
+            price_text = fraction.text_content().strip().translate(_PRICE_STRIP)
+    
+    price = float(price_text)
+    
+    # Extract URL
+    link_tag = _first_match(item, _XP_ITEM_LINK)
+    url = (link_tag.get('href') or "") if link_tag is not None else ""
+    
+    # Extract ID from URL if possible (MLM...)
+    item_id = ml_item_id(url)
+    
+    # Condition (ML usually puts it in a span like "Usado")
+    # This is harder to find consistently, default to unknown
+    condition = "unknown"
+    
+    # Extract Image URL
+    image_url = None
+    img_tag = _first_match(item, _XP_ITEM_IMG)
+    if img_tag is not None:
+        image_url = img_tag.get('data-src') or img_tag.get('src')
+
+    # Extract Seller Name
+    seller_name = None
+    seller_tag = _first_match(item, _XP_ITEM_SELLER)
+    if seller_tag is not None:
+        seller_name = seller_tag.text_content().strip().replace("por ", "")
+    
+    # Extract Full Status
+    is_full = False
+    # 1. Look for text "Full"
+    full_tag = _first_match(item, _XP_ITEM_FULL)
+    if full_tag is not None and "full" in full_tag.text_content().lower():
+        is_full = True
+    
+    # 2. Look for the Lightning Icon (SVG) usually associated with Full
+    if not is_full:
+        # Generic check for SVG inside the fulfillment label
+        if _XP_ITEM_FULL_ICON(item):
+            is_full = True
+        
+        # New layout specific check
+        poly_shipping = _first(_XP_ITEM_POLY_SHIPPING(item))
+        if poly_shipping is not None:
+            # Check for svg inside
+            if _XP_DESC_SVG(poly_shipping) or "full" in poly_shipping.text_content().lower():
+                is_full = True
+
+    # Extract Reviews
+    reviews_count = 0
+    stars = None
+    
+    # Stars (Rating)
+    rating_tag = _first_match(item, _XP_ITEM_RATING)
+    if rating_tag is not None:
+        try:
+            stars = float(rating_tag.text_content().strip())
+        except ValueError:
+            pass
+    
+    # Review Count
+    reviews_tag = _first_match(item, _XP_ITEM_REVIEWS)
+    if reviews_tag is not None:
+        try:
+            reviews_text = reviews_tag.text_content().strip().translate(_PARENS_STRIP)
+            reviews_count = int(reviews_text)
+        except ValueError:
+            pass
+    
+    return Offer(
+        title=title,
+        price=price,
+        condition=condition,
+        url=url,
+        item_id=item_id,
+        source="html_parsing",
+        image_url=image_url,
+        seller_name=seller_name,
+        is_full=is_full,
+        stars=stars,
+        reviews_count=reviews_count
+    )
+
+
+def offers_from_html(html: str, product: IdentifiedProduct) -> Iterator[Offer]:
     """
-    Extract offers by parsing HTML structure (BeautifulSoup).
+    Extract offers by parsing HTML structure (lxml + precompiled XPath).
+    
+    Lazy: items are only processed as offers are consumed, so callers cap the
+    count with itertools.islice and nothing past the limit is extracted.
     
     Args:
         html: Raw HTML
         product: Identified product for filtering
-        limit: Max offers
         
-    Returns:
-        List of Offer objects
+    Yields:
+        Offer objects matching the product
     """
-    out: List[Offer] = []
     try:
-        soup = BeautifulSoup(html, 'lxml')
-        # Standard ML list items
-        items = soup.select('.ui-search-layout__item')
+        doc = _parse_html(html)
+        if doc is None:
+            return
         
-        for item in items:
+        # Standard ML list items
+        for item in _XP_LIST_ITEMS(doc):
             try:
-                # Extract Title
-                title_tag = item.select_one('.ui-search-item__title') or item.select_one('.poly-component__title')
-                if not title_tag:
-                    continue
-                title = title_tag.get_text().strip()
-                
-                # Extract Price
-                price_text = "0"
-                # Try finding the price container
-                price_container = item.select_one('.ui-search-price__part') or item.select_one('.andes-money-amount')
-                if price_container:
-                     # Usually contains a fractional part class
-                     fraction = price_container.select_one('.andes-money-amount__fraction')
-                     if fraction:
-                         price_text = fraction.get_text().strip().replace('.', '').replace(',', '')
-                
-                price = float(price_text)
-                
-                # Extract URL
-                link_tag = item.select_one('a.ui-search-link') or item.select_one('a')
-                url = link_tag.get('href') if link_tag else ""
-                
-                # Extract ID from URL if possible (MLM...) or use a hash
-                item_id = ""
-                match = re.search(r"ML[A-Z]-?\d+", url)
-                if match:
-                    item_id = match.group(0).replace("-", "")
-                
-                # Condition (ML usually puts it in a span like "Usado")
-                # This is harder to find consistently, default to unknown
-                condition = "unknown"
-                
-                # Extract Image URL
-                image_url = None
-                img_tag = item.select_one('img.ui-search-result-image__element') or item.select_one('.poly-component__picture')
-                if img_tag:
-                    image_url = img_tag.get('data-src') or img_tag.get('src')
-
-                # Extract Seller Name
-                seller_name = None
-                seller_tag = item.select_one('.ui-search-official-store-label') or item.select_one('.poly-component__seller')
-                if seller_tag:
-                    seller_name = seller_tag.get_text().strip().replace("por ", "")
-                
-                # Extract Full Status
-                is_full = False
-                # 1. Look for text "Full"
-                full_tag = item.select_one('.ui-search-item__fulfillment-label') or item.select_one('.poly-component__shipping-badge')
-                if full_tag and "full" in full_tag.get_text().lower():
-                    is_full = True
-                
-                # 2. Look for the Lightning Icon (SVG) usually associated with Full
-                if not is_full:
-                    # Generic check for SVG or icon container containing 'full' in class or aria-label
-                    icon_full = item.select_one('span.ui-search-item__fulfillment-label svg')
-                    if icon_full: is_full = True
-                    
-                    # New layout specific check
-                    poly_shipping = item.select_one('.poly-component__shipping-badge')
-                    if poly_shipping:
-                        # Check for svg inside
-                        if poly_shipping.select_one('svg') or "full" in poly_shipping.get_text().lower():
-                            is_full = True
-
-                # Extract Reviews
-                reviews_count = 0
-                stars = None
-                
-                # Stars (Rating)
-                rating_tag = item.select_one('.ui-search-reviews__rating-number') or item.select_one('.poly-reviews__rating')
-                if rating_tag:
-                    try:
-                        stars = float(rating_tag.get_text().strip())
-                    except:
-                        pass
-                
-                # Review Count
-                reviews_tag = item.select_one('.ui-search-reviews__amount') or item.select_one('.poly-reviews__total')
-                if reviews_tag:
-                    try:
-                        reviews_text = reviews_tag.get_text().strip().replace('(', '').replace(')', '')
-                        reviews_count = int(reviews_text)
-                    except:
-                        pass
-                        
-                # Extract Sales Volume (e.g. "+1000 vendidos")
-                sales_count = 0 # Approximate
-                sales_tag = item.select_one('.ui-search-item__group__element.ui-search-item__group__element--mock_sold')
-                if not sales_tag:
-                    # Try finding text "vendidos" in any span
-                    for span in item.find_all('span', string=re.compile(r'vendidos', re.IGNORECASE)):
-                         sales_tag = span
-                         break
-                
-                if sales_tag:
-                    try:
-                        txt = sales_tag.get_text().lower().replace('+', '').replace('vendidos', '').replace('mil', '000').strip()
-                        sales_count = int(txt)
-                    except:
-                        pass
-
-                if rating_tag:
-                     try:
-                         stars = float(rating_tag.get_text().strip())
-                     except:
-                         pass
-
-                if match_title(title, product):
-                    out.append(Offer(
-                        title=title,
-                        price=price,
-                        condition=condition,
-                        url=url,
-                        item_id=item_id,
-                        source="html_parsing",
-                        image_url=image_url,
-                        seller_name=seller_name,
-                        is_full=is_full,
-                        stars=stars,
-                        reviews_count=reviews_count
-                    ))
-                    
-                if len(out) >= limit:
-                    break
-                    
-            except Exception as e:
+                offer = _offer_from_item(item, product)
+            except Exception:
                 continue
+            if offer is not None:
+                yield offer
                 
     except Exception as e:
-        logger.error(f"Error parsing HTML with BeautifulSoup: {e}")
-        
-    return out
+        logger.error(f"Error parsing listing HTML: {e}")
@@ -2,16 +2,20 @@
 Statistical analysis for pricing data.
 Migrated from agente_precios_ml_gagr.ipynb
 """
-import statistics
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Sequence, Tuple
+
+import numpy as np
 
 from .models import Offer, PriceStatistics
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# min, q1, median, q3, max: one np.quantile call (one sort) yields all five
+_SUMMARY_QUANTILES = (0.0, 0.25, 0.5, 0.75, 1.0)
+
 
-def percentile(values: List[float], p: float) -> float:
+def percentile(values: Sequence[float], p: float) -> float:
     """
     Calculate percentile of a list of values.
     
@@ -20,23 +24,12 @@ def percentile(values: List[float], p: float) -> float:
         p: Percentile (0.0 to 1.0)
         
     Returns:
-        Percentile value
+        Percentile value (linear interpolation between closest ranks)
     """
-    xs = sorted(values)
-    if len(xs) == 1:
-        return xs[0]
-    
-    k = (len(xs) - 1) * p
-    f = int(k)
-    c = min(f + 1, len(xs) - 1)
-    
-    if f == c:
-        return xs[f]
-    
-    return xs[f] + (k - f) * (xs[c] - xs[f])
+    return float(np.quantile(np.asarray(values, dtype=np.float64), p))
 
 
-def iqr_bounds(values: List[float]) -> Tuple[float, float, float, float]:
+def iqr_bounds(values: Sequence[float]) -> Tuple[float, float, float, float]:
     """
     Calculate IQR (Interquartile Range) bounds for outlier detection.
     
@@ -46,8 +39,8 @@ def iqr_bounds(values: List[float]) -> Tuple[float, float, float, float]:
     Returns:
         Tuple of (q1, q3, lower_bound, upper_bound)
     """
-    q1 = percentile(values, 0.25)
-    q3 = percentile(values, 0.75)
+    q1, q3 = np.quantile(np.asarray(values, dtype=np.float64), (0.25, 0.75))
+    q1, q3 = float(q1), float(q3)
     iqr = q3 - q1
     
     lower_bound = q1 - 1.5 * iqr
@@ -56,7 +49,7 @@ def iqr_bounds(values: List[float]) -> Tuple[float, float, float, float]:
     return q1, q3, lower_bound, upper_bound
 
 
-def calculate_statistics(values: List[float]) -> PriceStatistics:
+def calculate_statistics(values: Sequence[float]) -> PriceStatistics:
     """
     Calculate basic statistics for a list of prices.
     
@@ -66,28 +59,28 @@ def calculate_statistics(values: List[float]) -> PriceStatistics:
     Returns:
         PriceStatistics object
     """
-    if not values:
+    if len(values) == 0:
         raise ValueError("Cannot calculate statistics for empty list")
     
-    xs = sorted(values)
-    mean_val = sum(xs) / len(xs)
-    
-    # Calculate standard deviation
-    variance = sum((x - mean_val) ** 2 for x in xs) / len(xs)
-    std_dev_val = variance ** 0.5
+    return _statistics_from_array(np.asarray(values, dtype=np.float64))
+
+
+def _statistics_from_array(xs: np.ndarray) -> PriceStatistics:
+    """PriceStatistics for a non-empty float64 array (one sort for all quantiles)."""
+    min_val, q1, median_val, q3, max_val = (float(v) for v in np.quantile(xs, _SUMMARY_QUANTILES))
     
+    # Plain Python floats so to_dict() stays JSON-serializable with any encoder
     stats = PriceStatistics(
-        n=len(xs),
-        min=xs[0],
-        max=xs[-1],
-        mean=mean_val,
-        median=statistics.median(xs),
-        std_dev=std_dev_val
+        n=int(xs.size),
+        min=min_val,
+        max=max_val,
+        mean=float(xs.mean()),
+        median=median_val,
+        std_dev=float(xs.std())  # population std dev
     )
     
     # Calculate IQR if enough data points
-    if len(xs) >= 4:
-        q1, q3, _, _ = iqr_bounds(xs)
+    if xs.size >= 4:
         stats.q1 = q1
         stats.q3 = q3
         stats.iqr = q3 - q1
@@ -109,11 +102,30 @@ def remove_outliers(offers: List[Offer]) -> Tuple[List[Offer], List[Offer]]:
         # Not enough data for outlier detection
         return offers, []
     
-    prices = [o.price for o in offers]
-    q1, q3, lower, upper = iqr_bounds(prices)
+    prices = _prices_array(offers)
+    q1, q3 = np.quantile(prices, (0.25, 0.75))
+    inliers, outliers, _ = _split_outliers(offers, prices, float(q1), float(q3))
+    return inliers, outliers
+
+
+def _prices_array(offers: List[Offer]) -> np.ndarray:
+    return np.fromiter((o.price for o in offers), dtype=np.float64, count=len(offers))
+
+
+def _split_outliers(
+    offers: List[Offer],
+    prices: np.ndarray,
+    q1: float,
+    q3: float
+) -> Tuple[List[Offer], List[Offer], np.ndarray]:
+    """Split offers on the 1.5*IQR fences; also returns the inlier mask over `prices`."""
+    iqr = q3 - q1
+    lower = q1 - 1.5 * iqr
+    upper = q3 + 1.5 * iqr
     
-    inliers = [o for o in offers if lower <= o.price <= upper]
-    outliers = [o for o in offers if o.price < lower or o.price > upper]
+    keep = (prices >= lower) & (prices <= upper)
+    inliers = [o for o, k in zip(offers, keep, strict=True) if k]
+    outliers = [o for o, k in zip(offers, keep, strict=True) if not k]
     
     logger.info(
         "Outlier detection completed",
@@ -126,7 +138,7 @@ def remove_outliers(offers: List[Offer]) -> Tuple[List[Offer], List[Offer]]:
         upper_bound=upper
     )
     
-    return inliers, outliers
+    return inliers, outliers, keep
 
 
 def analyze_by_condition(offers: List[Offer]) -> Dict[str, Any]:
@@ -155,24 +167,20 @@ def analyze_by_condition(offers: List[Offer]) -> Dict[str, Any]:
             result[condition] = None
             continue
         
-        prices = [o.price for o in cond_offers]
+        prices = _prices_array(cond_offers)
         
-        # All offers stats
-        stats_all = calculate_statistics(prices)
+        # All offers stats (quartiles from the same sort feed the outlier fences)
+        stats_all = _statistics_from_array(prices)
         
         # Remove outliers if enough data
-        inliers = cond_offers
-        outliers_removed = 0
         stats_clean = None
         
         if len(cond_offers) >= 4:
-            inliers, outliers = remove_outliers(cond_offers)
-            outliers_removed = len(outliers)
+            inliers, outliers, keep = _split_outliers(cond_offers, prices, stats_all.q1, stats_all.q3)
             
             if inliers:
-                clean_prices = [o.price for o in inliers]
-                stats_clean = calculate_statistics(clean_prices)
-                stats_clean.outliers_removed = outliers_removed
+                stats_clean = _statistics_from_array(prices[keep])
+                stats_clean.outliers_removed = len(outliers)
         
         result[condition] = {
             "count": len(cond_offers),
@@ -210,13 +218,16 @@ def get_price_recommendation_data(offers: List[Offer]) -> Dict[str, Any]:
     by_condition = analyze_by_condition(offers)
     
     # Overall statistics (all conditions combined)
-    all_prices = [o.price for o in offers]
-    overall_stats = calculate_statistics(all_prices)
+    all_prices = _prices_array(offers)
+    overall_stats = _statistics_from_array(all_prices)
     
-    # Remove outliers from overall
-    inliers, outliers = remove_outliers(offers)
-    clean_prices = [o.price for o in inliers]
-    clean_stats = calculate_statistics(clean_prices) if clean_prices else None
+    # Remove outliers from overall, reusing the quartiles computed above
+    if len(offers) >= 4:
+        inliers, outliers, keep = _split_outliers(offers, all_prices, overall_stats.q1, overall_stats.q3)
+        clean_prices = all_prices[keep]
+    else:
+        inliers, outliers, clean_prices = offers, [], all_prices
+    clean_stats = _statistics_from_array(clean_prices) if inliers else None
     
     if clean_stats:
         clean_stats.outliers_removed = len(outliers)
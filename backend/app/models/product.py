@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DECIMAL, Boolean, TIMESTAMP, JSON
+from sqlalchemy import Column, Integer, String, Text, DECIMAL, Boolean, TIMESTAMP, JSON, Index
 from sqlalchemy.sql import func
 
 from ..database import Base
@@ -11,6 +11,10 @@ class Product(Base):
     Incluye historial de ventas mensual y datos de inventario.
     """
     __tablename__ = "products"
+    __table_args__ = (
+        # Filtro de bulk_analyze_catalog: is_active + category + rotation_index
+        Index("ix_product_bulk_filter", "is_active", "category", "rotation_index"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     sku = Column(String(50), unique=True, nullable=False, index=True)
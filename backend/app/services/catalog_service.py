@@ -3,14 +3,25 @@ Catalog Service - Load and manage product catalog
 """
 import csv
 import os
+import threading
+from bisect import bisect_right
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from dataclasses import dataclass
 
 
-@dataclass
+# Caracteres a eliminar del costo ("$1,234.50" -> "1234.50")
+_COSTO_STRIP = str.maketrans('', '', '$,')
+
+# Separadores de la columna de búsqueda: entre registros y entre título e ID
+_RECORD_SEP = '\x01'
+_FIELD_SEP = '\x00'
+
+
+@dataclass(slots=True)
 class CatalogProduct:
-    """Representa un producto del catálogo."""
+    """Representa un producto del catálogo (con __slots__: sin __dict__ por fila)."""
     id_articulo: str
     marca: str
     linea: str
@@ -24,22 +35,84 @@ class CatalogProduct:
         return f"{self.marca} - {self.titulo} (${self.costo:.2f})"
 
 
+@dataclass(frozen=True, slots=True)
+class _CatalogSnapshot:
+    """
+    Productos de una carga del CSV junto con todos sus índices.
+    
+    Se publica con una sola asignación y nunca se modifica, así que un lector que
+    toma una referencia ve productos e índices de la misma carga aunque otro hilo
+    esté recargando el catálogo.
+    """
+    products: List[CatalogProduct]
+    mtime: Optional[float]  # st_mtime del CSV cargado, para reload_if_changed
+    # Índices por ID y por marca/línea en minúsculas
+    by_id: Dict[str, CatalogProduct]
+    by_marca: Dict[str, List[CatalogProduct]]
+    by_linea: Dict[str, List[CatalogProduct]]
+    # Columna de búsqueda: claves en minúsculas de todos los productos concatenadas
+    # en un solo string (separadas por _RECORD_SEP) y el offset donde empieza cada una
+    search_blob: str
+    search_starts: List[int]
+    # Listas ordenadas de marcas/líneas
+    marcas: List[str]
+    lineas: List[str]
+
+
+def _build_snapshot(products: List[CatalogProduct], mtime: Optional[float]) -> _CatalogSnapshot:
+    """Indexar productos por ID, marca y línea para búsquedas O(1)."""
+    by_id: Dict[str, CatalogProduct] = {}
+    by_marca: Dict[str, List[CatalogProduct]] = defaultdict(list)
+    by_linea: Dict[str, List[CatalogProduct]] = defaultdict(list)
+    search_keys: List[str] = []
+    search_starts: List[int] = []
+    offset = 0
+    
+    for p in products:
+        by_id.setdefault(p.id_articulo, p)  # El primero gana, como en el recorrido lineal
+        by_marca[p.marca.lower()].append(p)
+        by_linea[p.linea.lower()].append(p)
+        # Título e ID separados para que una consulta no pueda abarcar ambos
+        key = f"{p.titulo.lower()}{_FIELD_SEP}{p.id_articulo.lower()}".replace(_RECORD_SEP, ' ')
+        search_keys.append(key)
+        search_starts.append(offset)
+        offset += len(key) + 1
+    
+    return _CatalogSnapshot(
+        products=products,
+        mtime=mtime,
+        by_id=by_id,
+        by_marca=dict(by_marca),
+        by_linea=dict(by_linea),
+        search_blob=_RECORD_SEP.join(search_keys),
+        search_starts=search_starts,
+        marcas=sorted({p.marca for p in products}),
+        lineas=sorted({p.linea for p in products}),
+    )
+
+
+_EMPTY_SNAPSHOT = _build_snapshot([], None)
+
+
 class CatalogService:
     """Servicio para cargar y gestionar el catálogo de productos."""
     
     _instance = None
-    _products = None
+    _lock = threading.Lock()
+    # Carga actual (productos + índices); load_catalog la reemplaza entera
+    _snapshot: _CatalogSnapshot = _EMPTY_SNAPSHOT
     
     def __new__(cls):
-        """Singleton pattern."""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-    
-    def __init__(self):
-        """Inicializar el servicio de catálogo."""
-        if self._products is None:
-            self.load_catalog()
+        """Singleton: el catálogo se carga una sola vez, al crear la instancia."""
+        instance = cls._instance
+        if instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance.load_catalog()
+                    cls._instance = instance
+                instance = cls._instance
+        return instance
     
     @staticmethod
     def get_catalog_path() -> Path:
@@ -55,73 +128,109 @@ class CatalogService:
         if not catalog_path.exists():
             raise FileNotFoundError(f"Catálogo no encontrado en: {catalog_path}")
         
-        self._products = []
+        mtime = catalog_path.stat().st_mtime
+        products: List[CatalogProduct] = []
         
         with open(catalog_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
+            header = next(reader, [])
+            # Resolver cada columna una sola vez; None si no existe en el archivo
+            columns = [
+                header.index(name) if name in header else None
+                for name in ('Id_Articulo', 'Marca', 'Linea', 'Titulo', 'Ubicacion', 'enlace', 'costo')
+            ]
+            # Sin columna de costo se asume 0; un costo vacío sí es un error de la fila
+            has_costo = columns[-1] is not None
+            
             for row in reader:
+                if not row:
+                    continue  # Línea vacía (DictReader también las omitía)
                 try:
-                    # Limpiar el precio (remover $ y espacios)
-                    costo_str = row.get('costo', '0').strip().replace('$', '').replace(',', '')
-                    costo = float(costo_str)
-                    
-                    product = CatalogProduct(
-                        id_articulo=row.get('Id_Articulo', '').strip(),
-                        marca=row.get('Marca', '').strip(),
-                        linea=row.get('Linea', '').strip(),
-                        titulo=row.get('Titulo', '').strip(),
-                        ubicacion=row.get('Ubicacion', '').strip(),
-                        enlace=row.get('enlace', '').strip(),
-                        costo=costo
+                    id_articulo, marca, linea, titulo, ubicacion, enlace, costo_raw = (
+                        row[i].strip() if i is not None and i < len(row) else ''
+                        for i in columns
                     )
                     
+                    # Limpiar el precio (remover $ y comas)
+                    costo = float(costo_raw.translate(_COSTO_STRIP) if has_costo else '0')
+                    
                     # Solo agregar si tiene URL y título
-                    if product.enlace and product.titulo:
-                        self._products.append(product)
+                    if enlace and titulo:
+                        products.append(CatalogProduct(
+                            id_articulo=id_articulo,
+                            marca=marca,
+                            linea=linea,
+                            titulo=titulo,
+                            ubicacion=ubicacion,
+                            enlace=enlace,
+                            costo=costo
+                        ))
                 except (ValueError, KeyError) as e:
                     print(f"Error procesando fila: {e}")
                     continue
+        
+        # Una sola asignación: los lectores ven la carga anterior o la nueva completa
+        self._snapshot = _build_snapshot(products, mtime)
+    
+    def reload_if_changed(self) -> bool:
+        """Recargar el catálogo si el CSV cambió desde la última carga; True si se recargó."""
+        try:
+            mtime = self.get_catalog_path().stat().st_mtime
+        except OSError:
+            return False  # CSV ausente un momento (p. ej. mientras se reescribe): conservar la carga actual
+        if mtime == self._snapshot.mtime:
+            return False
+        with self._lock:
+            if mtime == self._snapshot.mtime:
+                return False  # Otro hilo ya lo recargó
+            self.load_catalog()
+        return True
     
     def get_all_products(self) -> List[CatalogProduct]:
         """Obtener todos los productos del catálogo."""
-        return self._products or []
+        return self._snapshot.products
     
     def get_products_by_marca(self, marca: str) -> List[CatalogProduct]:
         """Filtrar productos por marca."""
-        return [p for p in (self._products or []) if p.marca.lower() == marca.lower()]
+        return list(self._snapshot.by_marca.get(marca.lower(), []))
     
     def get_products_by_linea(self, linea: str) -> List[CatalogProduct]:
         """Filtrar productos por línea."""
-        return [p for p in (self._products or []) if p.linea.lower() == linea.lower()]
+        return list(self._snapshot.by_linea.get(linea.lower(), []))
     
     def get_product_by_id(self, id_articulo: str) -> Optional[CatalogProduct]:
         """Obtener producto por ID."""
-        for p in (self._products or []):
-            if p.id_articulo == id_articulo:
-                return p
-        return None
+        return self._snapshot.by_id.get(id_articulo)
     
     def search_products(self, query: str) -> List[CatalogProduct]:
         """Buscar productos por título o ID."""
         query_lower = query.lower()
-        return [
-            p for p in (self._products or [])
-            if query_lower in p.titulo.lower() or query_lower in p.id_articulo.lower()
-        ]
+        if _RECORD_SEP in query_lower or _FIELD_SEP in query_lower:
+            return []  # Ninguna clave puede contener los separadores internos
+        
+        # Un solo str.find sobre la columna concatenada; cada coincidencia se mapea
+        # a su registro y la búsqueda continúa desde el siguiente
+        snapshot = self._snapshot  # Offsets y productos de la misma carga
+        products, blob, starts = snapshot.products, snapshot.search_blob, snapshot.search_starts
+        if not starts:
+            return []
+        matches: List[CatalogProduct] = []
+        pos = blob.find(query_lower)
+        while pos != -1:
+            idx = bisect_right(starts, pos) - 1
+            matches.append(products[idx])
+            if idx + 1 >= len(starts):
+                break
+            pos = blob.find(query_lower, starts[idx + 1])
+        return matches
     
     def get_marcas(self) -> List[str]:
         """Obtener lista de marcas disponibles."""
-        marcas = set()
-        for p in (self._products or []):
-            marcas.add(p.marca)
-        return sorted(list(marcas))
+        return list(self._snapshot.marcas)
     
     def get_lineas(self) -> List[str]:
         """Obtener lista de líneas disponibles."""
-        lineas = set()
-        for p in (self._products or []):
-            lineas.add(p.linea)
-        return sorted(list(lineas))
+        return list(self._snapshot.lineas)
     
     def get_product_dict(self, product: CatalogProduct) -> Dict[str, Any]:
         """Convertir producto a diccionario."""
@@ -5,16 +5,288 @@ Minimalist version with statistics and product listings
 import streamlit as st
 import sys
 import os
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from pathlib import Path
 
 # Add backend to path
 backend_path = Path(__file__).parent.parent / "backend"
 sys.path.insert(0, str(backend_path))
 
-from app.services.catalog_service import CatalogService
+# pandas/plotly are imported where results are rendered, so sessions that never
+# reach the charts don't pay for loading them
+
+
+@st.cache_resource
+def _get_catalog():
+    """Catálogo compartido por todas las sesiones (se carga una vez por proceso)."""
+    from app.services.catalog_service import CatalogService
+    return CatalogService()
+
+
+# cache_resource (no pickling) because the catalog objects are shared read-only;
+# the TTL lets an edited CSV be picked up without restarting the app
+@st.cache_resource(ttl=300)
+def _get_products():
+    catalog = _get_catalog()
+    catalog.reload_if_changed()
+    return catalog.get_all_products()
+
+
+@st.cache_resource(ttl=300, max_entries=256)
+def _search_catalog(query: str):
+    return _get_catalog().search_products(query)
+
+
+@st.cache_resource(ttl=300, max_entries=256)
+def _product_options(query: str):
+    """Opciones del selector (nombre para mostrar → producto) por búsqueda."""
+    products = _search_catalog(query) if query else _get_products()
+    return {p.get_display_name(): p for p in products}
+
+
+class _AnalysisFailed(Exception):
+    """Análisis con errores: se lanza para que st.cache_data no lo guarde."""
+    
+    def __init__(self, result):
+        super().__init__(result.get("errors"))
+        self.result = result
+
+
+# cache_data (pickled copy per caller) because the result dict is later edited
+# in place when the user re-runs with manual selections. The pipeline itself is
+# not cached: its HTTP session is bound to the event loop asyncio.run creates.
+# Failed runs raise _AnalysisFailed, so a transient block isn't replayed.
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def _run_analysis(product_url: str, cost: float, margin: float, tolerance: float):
+    """Ejecuta el pipeline completo; mismos parámetros → resultado en caché."""
+    import asyncio
+    from app.agents.pricing_pipeline import PricingPipeline
+    
+    async def run():
+        pipeline = PricingPipeline()
+        try:
+            return await pipeline.analyze_product(
+                product_input=product_url,
+                max_offers=25,
+                cost_price=cost,
+                target_margin=margin,
+                price_tolerance=tolerance
+            )
+        finally:
+            await pipeline.aclose()
+    
+    result = asyncio.run(run())
+    if result.get("errors"):
+        raise _AnalysisFailed(result)
+    return result
+
+
+def _offer_id(offer):
+    """Clave estable de una oferta para indexar las selecciones del usuario."""
+    return offer.get("item_id") or offer.get("url") or offer.get("title")
+
+
+def _offer_selector(products, detail_label, details, check_label, check_help):
+    """
+    Tabla de ofertas (miniatura, título, precio, detalle, enlace) con una columna
+    de casillas; un solo widget en lugar de columnas/imagen/botón por fila.
+    Devuelve los productos marcados.
+    """
+    import pandas as pd
+    
+    df = pd.DataFrame({
+        "Imagen": [p.get("image_url") or p.get("thumbnail") for p in products],
+        "Producto": [p.get("title", "Sin título") for p in products],
+        "Precio": [p.get("price", 0) for p in products],
+        detail_label: details,
+        "Enlace": [p.get("permalink") for p in products],
+        check_label: [False] * len(products),
+    })
+    edited = st.data_editor(
+        df,
+        column_config={
+            "Imagen": st.column_config.ImageColumn(width="small"),
+            "Precio": st.column_config.NumberColumn(format="dollar"),
+            "Enlace": st.column_config.LinkColumn(),
+            check_label: st.column_config.CheckboxColumn(help=check_help),
+        },
+        disabled=[c for c in df.columns if c != check_label],
+        hide_index=True,
+        width="stretch",
+    )
+    return [p for p, checked in zip(products, edited[check_label], strict=True) if checked]
+
+
+@st.fragment
+def _matching_section(result, cost):
+    """
+    Clasificación de ofertas (comparables/excluidas) con selección manual.
+    Es un fragmento: mover ofertas solo re-ejecuta esta sección.
+    """
+    steps = result.get("pipeline_steps", {})
+    matching = steps["matching"]
+    st.markdown("### 🎯 Clasificación de Productos")
+
+    # Initialize session state for selections at the top of result display
+    # (sets de IDs de oferta: pertenencia O(1) y estado de sesión liviano)
+    if "products_to_exclude_ids" not in st.session_state:
+        st.session_state.products_to_exclude_ids = set()
+    if "products_to_include_ids" not in st.session_state:
+        st.session_state.products_to_include_ids = set()
+
+    # FUNCIÓN: Reconstruir listas de productos basadas en selecciones del usuario
+    def rebuild_product_lists():
+        """Reconstruir comparable_offers y excluded_offers basado en user_selections"""
+        all_comparable = matching.get("comparable_offers", [])
+        all_excluded = matching.get("excluded_offers", [])
+
+        # IDs de los seleccionados por usuario
+        included_ids = st.session_state.products_to_include_ids
+        excluded_ids = st.session_state.products_to_exclude_ids
+
+        # Reconstruir listas
+        new_comparable = [
+            p for p in all_comparable 
+            if _offer_id(p) not in excluded_ids
+        ]
+        # Agregar los que el usuario movió a comparables desde excluidos
+        new_comparable.extend([
+            p for p in all_excluded 
+            if _offer_id(p) in included_ids
+        ])
+
+        new_excluded = [
+            p for p in all_excluded 
+            if _offer_id(p) not in included_ids
+        ]
+        # Agregar los que el usuario movió a excluidos desde comparables
+        new_excluded.extend([
+            p for p in all_comparable 
+            if _offer_id(p) in excluded_ids
+        ])
+
+        return new_comparable, new_excluded
+
+    # Reconstruir las listas con las selecciones del usuario
+    comparable_data, excluded_data = rebuild_product_lists()
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Ofertas", matching.get("total_offers", 0))
+    with col2:
+        st.metric("✅ Comparables", len(comparable_data))
+    with col3:
+        st.metric("❌ Excluidas", len(excluded_data))
+
+    # Display all offers found with images and selection controls
+    if comparable_data:
+        st.markdown("#### 📦 Productos Comparables (Seleccionados)")
+
+        to_exclude = _offer_selector(
+            comparable_data,
+            detail_label="Condición",
+            details=[p.get('condition', 'N/A') for p in comparable_data],
+            check_label="❌ Excluir",
+            check_help="Mover a excluidos"
+        )
+        if to_exclude:
+            # Only rerun when something moved, otherwise the ticked box
+            # would loop reruns
+            excluded_ids = st.session_state.products_to_exclude_ids
+            moved = False
+            for product in to_exclude:
+                pid = _offer_id(product)
+                if pid not in excluded_ids:
+                    excluded_ids.add(pid)
+                    moved = True
+            if moved:
+                st.rerun(scope="fragment")
+
+    # Display excluded offers with reasons
+    if excluded_data:
+        st.markdown("#### ❌ Productos Excluidos")
+
+        to_include = _offer_selector(
+            excluded_data,
+            detail_label="Motivo",
+            details=[p.get('exclusion_reason', 'N/A') for p in excluded_data],
+            check_label="✅ Incluir",
+            check_help="Mover a comparables"
+        )
+        if to_include:
+            # Rerun only if something moved
+            included_ids = st.session_state.products_to_include_ids
+            moved = False
+            for product in to_include:
+                pid = _offer_id(product)
+                if pid not in included_ids:
+                    included_ids.add(pid)
+                    moved = True
+            if moved:
+                st.rerun(scope="fragment")
+
+        # Button to re-run analysis with new selections
+        if st.session_state.get("products_to_exclude_ids") or st.session_state.get("products_to_include_ids"):
+            st.markdown("### 🔄 Modificaciones Pendientes")
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                st.info(f"✅ {len(st.session_state.get('products_to_include_ids', ()))} producto(s) a incluir | ❌ {len(st.session_state.get('products_to_exclude_ids', ()))} a excluir")
+            with col2:
+                if st.button("🔄 Re-ejecutar Análisis", type="primary", key="rerun_analysis_btn"):
+                    # Actualizar el analysis_result con las nuevas selecciones
+                    if st.session_state.get("analysis_result"):
+                        result = st.session_state.analysis_result
+                        steps = result.get("pipeline_steps", {})
+                        matching = steps.get("matching", {})
+
+                        # Reconstruir listas actualizadas
+                        updated_comparable, updated_excluded = rebuild_product_lists()
+
+                        # Actualizar el matching en el result
+                        matching["comparable_offers"] = updated_comparable
+                        matching["excluded_offers"] = updated_excluded
+                        matching["comparable"] = len(updated_comparable)
+                        matching["excluded"] = len(updated_excluded)
+
+                        # Recalcular estadísticas basadas en los nuevos comparables
+                        if updated_comparable:
+                            prices = [p.get("price", 0) for p in updated_comparable if p.get("price", 0) > 0]
+                            if prices:
+                                import statistics
+                                stats = {
+                                    "overall": {
+                                        "mean": statistics.mean(prices),
+                                        "median": statistics.median(prices),
+                                        "std_dev": statistics.stdev(prices) if len(prices) > 1 else 0,
+                                        "min": min(prices),
+                                        "max": max(prices),
+                                        "range": max(prices) - min(prices)
+                                    }
+                                }
+                                steps["statistics"] = stats
+
+                                # Recalcular recomendación de precio
+                                pivot_price = steps.get("pivot_product", {}).get("price", 0)
+                                avg_price = stats["overall"]["mean"]
+
+                                result["final_recommendation"] = {
+                                    "recommended_price": round(avg_price, 2),
+                                    "suggested_margin_percent": 30.0,
+                                    "profit_per_unit": round(avg_price - cost, 2),
+                                    "roi_percent": round(((avg_price - cost) / cost) * 100, 2) if cost > 0 else 0,
+                                    "strategy": "Precio basado en selección manual de comparables"
+                                }
+
+                        # Limpiar selecciones pendientes
+                        st.session_state.products_to_exclude_ids = set()
+                        st.session_state.products_to_include_ids = set()
+
+                        # Rerun de toda la app: estadísticas y recomendación están
+                        # fuera del fragmento
+                        st.rerun()
+                    # Clear session state
+                    st.session_state.products_to_exclude_ids = set()
+                    st.session_state.products_to_include_ids = set()
+
 
 st.set_page_config(
     page_title="Louder - Análisis de Precios",
@@ -51,8 +323,7 @@ with st.sidebar:
     
     # Load catalog
     try:
-        catalog = CatalogService()
-        products_list = catalog.get_all_products()
+        products_list = _get_products()
     except Exception as e:
         st.error(f"Error cargando catálogo: {e}")
         products_list = []
@@ -77,15 +348,10 @@ with st.sidebar:
                 help="Busca por marca, línea o título"
             )
             
-            # Filter products based on search
-            if search_query:
-                filtered_products = catalog.search_products(search_query)
-            else:
-                filtered_products = products_list
+            # Filter products based on search (display names cached per query)
+            product_options = _product_options(search_query)
             
-            if filtered_products:
-                # Create options with display names
-                product_options = {p.get_display_name(): p for p in filtered_products}
+            if product_options:
                 selected_option = st.selectbox(
                     "Selecciona un producto:",
                     options=list(product_options.keys()),
@@ -157,32 +423,17 @@ if product_url and analyze_button:
     st.info("⏳ Analizando producto...")
     
     try:
-        # Import here to avoid startup errors
-        from app.mcp_servers.mercadolibre.scraper import MLWebScraper
-        from app.agents.pricing_pipeline import PricingPipeline
-        
-        # Initialize pipeline
-        pipeline = PricingPipeline()
-        
-        # Run analysis
-        import asyncio
-        
-        async def run_analysis():
-            return await pipeline.analyze_product(
-                product_input=product_url,
-                max_offers=25,
-                cost_price=cost,
-                target_margin=margin,
-                price_tolerance=tolerance / 100
-            )
-        
-        result = asyncio.run(run_analysis())
+        # Run analysis (successful results cached per URL/cost/margin/tolerance)
+        try:
+            result = _run_analysis(product_url, cost, margin, tolerance / 100)
+        except _AnalysisFailed as failed:
+            result = failed.result
         
         # Save result to session state
         st.session_state.analysis_result = result
         # Clear any previous selections
-        st.session_state.products_to_exclude = []
-        st.session_state.products_to_include = []
+        st.session_state.products_to_exclude_ids = set()
+        st.session_state.products_to_include_ids = set()
     
     except Exception as e:
         st.error(f"❌ Error: {e}")
@@ -210,9 +461,20 @@ if st.session_state.get("analysis_result"):
         
         steps = result.get("pipeline_steps", {})
         
+        # Steps 0-3 en pestañas (una por paso presente) en lugar de expanders
+        # siempre abiertos; clasificación, estadísticas y precio quedan a la vista
+        step_labels = {
+            "pivot_product": "✅ Paso 0: Producto Analizado",
+            "enrichment": "✅ Paso 1: Enriquecimiento con IA",
+            "search_strategy": "✅ Paso 2: Estrategia de Búsqueda",
+            "scraping": "✅ Paso 3: Búsqueda en Mercado Libre",
+        }
+        present_steps = [k for k in step_labels if k in steps]
+        step_tabs = dict(zip(present_steps, st.tabs([step_labels[k] for k in present_steps]))) if present_steps else {}
+        
         # Step 0: Pivot Product
         if "pivot_product" in steps:
-            with st.expander("✅ Paso 0: Producto Analizado", expanded=True):
+            with step_tabs["pivot_product"]:
                 pivot = steps["pivot_product"]
                 
                 # Create columns for image and details
@@ -243,7 +505,7 @@ if st.session_state.get("analysis_result"):
         
         # Step 1: Data enrichment
         if "enrichment" in steps:
-            with st.expander("✅ Paso 1: Enriquecimiento con IA", expanded=True):
+            with step_tabs["enrichment"]:
                 enrichment = steps["enrichment"]
                 st.write(f"**Categoría:** {enrichment.get('enriched_category', 'N/A')}")
                 st.write(f"**Segmento:** {enrichment.get('market_segment', 'N/A')}")
@@ -254,7 +516,7 @@ if st.session_state.get("analysis_result"):
         
         # Step 2: Search strategy
         if "search_strategy" in steps:
-            with st.expander("✅ Paso 2: Estrategia de Búsqueda", expanded=True):
+            with step_tabs["search_strategy"]:
                 strategy = steps["search_strategy"]
                 st.write(f"🔍 **Búsqueda Primaria:** {strategy.get('primary_search', 'N/A')}")
                 alts = strategy.get('alternative_searches', [])
@@ -265,7 +527,7 @@ if st.session_state.get("analysis_result"):
         
         # Step 3: Scraping
         if "scraping" in steps:
-            with st.expander("✅ Paso 3: Búsqueda en Mercado Libre", expanded=True):
+            with step_tabs["scraping"]:
                 scraping = steps["scraping"]
                 col1, col2 = st.columns(2)
                 with col1:
@@ -275,198 +537,7 @@ if st.session_state.get("analysis_result"):
         
         # Step 4: Matching results with detailed table
         if "matching" in steps:
-            matching = steps["matching"]
-            st.markdown("### 🎯 Clasificación de Productos")
-            
-            # Initialize session state for selections at the top of result display
-            if "products_to_exclude" not in st.session_state:
-                st.session_state.products_to_exclude = []
-            if "products_to_include" not in st.session_state:
-                st.session_state.products_to_include = []
-            
-            # FUNCIÓN: Reconstruir listas de productos basadas en selecciones del usuario
-            def rebuild_product_lists():
-                """Reconstruir comparable_offers y excluded_offers basado en user_selections"""
-                all_comparable = matching.get("comparable_offers", [])
-                all_excluded = matching.get("excluded_offers", [])
-                
-                # Obtener títulos de los seleccionados por usuario
-                included_titles = {p.get('title') for p in st.session_state.products_to_include}
-                excluded_titles = {p.get('title') for p in st.session_state.products_to_exclude}
-                
-                # Reconstruir listas
-                new_comparable = [
-                    p for p in all_comparable 
-                    if p.get('title') not in excluded_titles
-                ]
-                # Agregar los que el usuario movió a comparables desde excluidos
-                new_comparable.extend([
-                    p for p in all_excluded 
-                    if p.get('title') in included_titles
-                ])
-                
-                new_excluded = [
-                    p for p in all_excluded 
-                    if p.get('title') not in included_titles
-                ]
-                # Agregar los que el usuario movió a excluidos desde comparables
-                new_excluded.extend([
-                    p for p in all_comparable 
-                    if p.get('title') in excluded_titles
-                ])
-                
-                return new_comparable, new_excluded
-            
-            # Reconstruir las listas con las selecciones del usuario
-            comparable_data, excluded_data = rebuild_product_lists()
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Ofertas", matching.get("total_offers", 0))
-            with col2:
-                st.metric("✅ Comparables", len(comparable_data))
-            with col3:
-                st.metric("❌ Excluidas", len(excluded_data))
-            
-            # Display all offers found with images and selection controls
-            if comparable_data:
-                st.markdown("#### 📦 Productos Comparables (Seleccionados)")
-            
-            for idx, product in enumerate(comparable_data):
-                    col1, col2, col3 = st.columns([1, 6, 1])
-                    
-                    with col1:
-                        # Show thumbnail - usar image_url en lugar de thumbnail
-                        image_url = product.get("image_url") or product.get("thumbnail")
-                        if image_url:
-                            try:
-                                st.image(image_url, width=80)
-                            except Exception as e:
-                                st.write("🖼️")
-                        else:
-                            st.write("🖼️")
-                    
-                    with col2:
-                        # Product details
-                        st.markdown(f"**{product.get('title', 'Sin título')}**")
-                        price_str = f"${product.get('price', 0):,.0f}"
-                        condition = product.get('condition', 'N/A')
-                        st.caption(f"💰 {price_str} | 📦 {condition}")
-                        if product.get('permalink'):
-                            st.caption(f"🔗 [Ver en ML]({product['permalink']})")
-                    
-                    with col3:
-                        # Button to move to excluded
-                        product_key = product.get('title', f"product_{idx}")
-                        if st.button("❌", key=f"exclude_{idx}_{product_key[:10]}", help="Mover a excluidos"):
-                            # Check if already excluded using title as unique key
-                            excluded_titles = [p.get('title') for p in st.session_state.products_to_exclude]
-                            if product.get('title') not in excluded_titles:
-                                st.session_state.products_to_exclude.append(product)
-                            st.rerun()
-                    
-                    st.markdown("---")
-            
-        # Display excluded offers with reasons
-        if excluded_data:
-            st.markdown("#### ❌ Productos Excluidos")
-            
-            for idx, product in enumerate(excluded_data):
-                    col1, col2, col3 = st.columns([1, 6, 1])
-                    
-                    with col1:
-                        # Show thumbnail - usar image_url en lugar de thumbnail
-                        image_url = product.get("image_url") or product.get("thumbnail")
-                        if image_url:
-                            try:
-                                st.image(image_url, width=80)
-                            except Exception as e:
-                                st.write("🖼️")
-                        else:
-                            st.write("🖼️")
-                    
-                    with col2:
-                        # Product details
-                        st.markdown(f"**{product.get('title', 'Sin título')}**")
-                        price_str = f"${product.get('price', 0):,.0f}"
-                        reason = product.get('exclusion_reason', 'N/A')
-                        st.caption(f"💰 {price_str} | 🚫 {reason}")
-                        if product.get('permalink'):
-                            st.caption(f"🔗 [Ver en ML]({product['permalink']})")
-                    
-                    with col3:
-                        # Button to move to comparable
-                        product_key = product.get('title', f"product_{idx}")
-                        if st.button("✅", key=f"include_{idx}_{product_key[:10]}", help="Mover a comparables"):
-                            # Check if already included using title as unique key
-                            included_titles = [p.get('title') for p in st.session_state.products_to_include]
-                            if product.get('title') not in included_titles:
-                                st.session_state.products_to_include.append(product)
-                            st.rerun()
-                    
-                    st.markdown("---")
-            
-            # Button to re-run analysis with new selections
-            if st.session_state.get("products_to_exclude") or st.session_state.get("products_to_include"):
-                st.markdown("### 🔄 Modificaciones Pendientes")
-                col1, col2 = st.columns([2, 1])
-                with col1:
-                    st.info(f"✅ {len(st.session_state.get('products_to_include', []))} producto(s) a incluir | ❌ {len(st.session_state.get('products_to_exclude', []))} a excluir")
-                with col2:
-                    if st.button("🔄 Re-ejecutar Análisis", type="primary", key="rerun_analysis_btn"):
-                        # Actualizar el analysis_result con las nuevas selecciones
-                        if st.session_state.get("analysis_result"):
-                            result = st.session_state.analysis_result
-                            steps = result.get("pipeline_steps", {})
-                            matching = steps.get("matching", {})
-                            
-                            # Reconstruir listas actualizadas
-                            updated_comparable, updated_excluded = rebuild_product_lists()
-                            
-                            # Actualizar el matching en el result
-                            matching["comparable_offers"] = updated_comparable
-                            matching["excluded_offers"] = updated_excluded
-                            matching["comparable"] = len(updated_comparable)
-                            matching["excluded"] = len(updated_excluded)
-                            
-                            # Recalcular estadísticas basadas en los nuevos comparables
-                            if updated_comparable:
-                                prices = [p.get("price", 0) for p in updated_comparable if p.get("price", 0) > 0]
-                                if prices:
-                                    import statistics
-                                    stats = {
-                                        "overall": {
-                                            "mean": statistics.mean(prices),
-                                            "median": statistics.median(prices),
-                                            "std_dev": statistics.stdev(prices) if len(prices) > 1 else 0,
-                                            "min": min(prices),
-                                            "max": max(prices),
-                                            "range": max(prices) - min(prices)
-                                        }
-                                    }
-                                    steps["statistics"] = stats
-                                    
-                                    # Recalcular recomendación de precio
-                                    pivot_price = steps.get("pivot_product", {}).get("price", 0)
-                                    avg_price = stats["overall"]["mean"]
-                                    
-                                    result["final_recommendation"] = {
-                                        "recommended_price": round(avg_price, 2),
-                                        "suggested_margin_percent": 30.0,
-                                        "profit_per_unit": round(avg_price - cost, 2),
-                                        "roi_percent": round(((avg_price - cost) / cost) * 100, 2) if cost > 0 else 0,
-                                        "strategy": "Precio basado en selección manual de comparables"
-                                    }
-                            
-                            # Limpiar selecciones pendientes
-                            st.session_state.products_to_exclude = []
-                            st.session_state.products_to_include = []
-                            
-                            # Rerun para mostrar cambios
-                            st.rerun()
-                        # Clear session state
-                        st.session_state.products_to_exclude = []
-                        st.session_state.products_to_include = []
+            _matching_section(result, cost)
         
         # Step 5: Statistics with charts
         if "statistics" in steps:
@@ -491,16 +562,33 @@ if st.session_state.get("analysis_result"):
                 if "comparable_offers" in steps.get("matching", {}):
                     offers_data = steps["matching"]["comparable_offers"]
                     if offers_data:
-                        prices = [o.get("price", 0) for o in offers_data if o.get("price", 0) > 0]
+                        import numpy as np
                         
-                        if prices:
-                            # Histogram
-                            fig = px.histogram(
-                                x=prices,
-                                nbins=15,
+                        # One pass into a float64 array; plotly serializes ndarrays directly
+                        prices = np.fromiter(
+                            (o.get("price", 0) for o in offers_data),
+                            dtype=np.float64,
+                            count=len(offers_data)
+                        )
+                        prices = prices[prices > 0]
+                        
+                        if prices.size:
+                            import plotly.graph_objects as go
+                            
+                            # Histogram binned here: the browser gets 15 bars instead of every raw price
+                            counts, edges = np.histogram(prices, bins=15)
+                            fig = go.Figure(data=[go.Bar(
+                                x=(edges[:-1] + edges[1:]) / 2,
+                                y=counts,
+                                width=np.diff(edges),
+                                marker_color="#1f77b4"
+                            )])
+                            fig.update_layout(
                                 title="Distribución de Precios",
-                                labels={"x": "Precio ($)", "count": "Cantidad"},
-                                color_discrete_sequence=["#1f77b4"]
+                                xaxis_title="Precio ($)",
+                                yaxis_title="Cantidad",
+                                hovermode="x",
+                                bargap=0
                             )
                             fig.add_vline(
                                 x=overall.get('mean', 0),
@@ -516,16 +604,17 @@ if st.session_state.get("analysis_result"):
                                 annotation_text="Mediana",
                                 annotation_position="top right"
                             )
-                            st.plotly_chart(fig, width="stretch")
+                            st.plotly_chart(fig, width="stretch", config={"responsive": True})
                             
-                            # Box plot for price ranges
-                            fig_box = go.Figure(data=[go.Box(y=prices, name="Precios")])
+                            # Box plot for price ranges (only outliers drawn as individual points)
+                            fig_box = go.Figure(data=[go.Box(y=prices, name="Precios", boxpoints="outliers")])
                             fig_box.update_layout(
                                 title="Rango de Precios (Box Plot)",
                                 yaxis_title="Precio ($)",
-                                height=400
+                                height=400,
+                                hovermode="x"
                             )
-                            st.plotly_chart(fig_box, width="stretch")
+                            st.plotly_chart(fig_box, width="stretch", config={"responsive": True})
                 
                 # Price by condition (if available)
                 condition_data = stats.get("by_condition") or {}
@@ -534,19 +623,27 @@ if st.session_state.get("analysis_result"):
                 if valid_conditions:
                     st.markdown("#### Precios por Condición")
                     try:
-                        condition_rows = []
-                        for k, v in valid_conditions.items():
-                            stats_data = v.get('stats_all', {}) or v.get('stats_clean', {})
-                            if stats_data:
-                                condition_rows.append({
-                                    "Condición": k.title(),
-                                    "Promedio": f"${stats_data.get('mean', 0):,.0f}",
-                                    "Cantidad": v.get('count', 0),
-                                    "Rango": f"${stats_data.get('min', 0):,.0f} - ${stats_data.get('max', 0):,.0f}"
-                                })
-                        if condition_rows:
-                            condition_df = pd.DataFrame(condition_rows)
-                            st.dataframe(condition_df, width="stretch")
+                        # Columnas numéricas; el formato de moneda lo aplica la tabla
+                        condition_stats = {
+                            k.title(): {
+                                "Promedio": stats_data.get('mean', 0),
+                                "Cantidad": v.get('count', 0),
+                                "Mínimo": stats_data.get('min', 0),
+                                "Máximo": stats_data.get('max', 0),
+                            }
+                            for k, v in valid_conditions.items()
+                            if (stats_data := v.get('stats_all', {}) or v.get('stats_clean', {}))
+                        }
+                        if condition_stats:
+                            import pandas as pd
+                            condition_df = pd.DataFrame.from_dict(condition_stats, orient="index")
+                            condition_df.index.name = "Condición"
+                            price_col = st.column_config.NumberColumn(format="dollar")
+                            st.dataframe(
+                                condition_df,
+                                column_config={"Promedio": price_col, "Mínimo": price_col, "Máximo": price_col},
+                                width="stretch"
+                            )
                     except Exception as e:
                         st.warning(f"Error en desglose por condición: {str(e)}")
         
@@ -36,7 +36,6 @@ async def main():
         sys.stdout.reconfigure(encoding='utf-8')
         
     print("Testing Real Scraper with Multiple Queries...")
-    scraper = MLWebScraper()
     
     queries = [
         "audifonos bluetooth sony", # The one that worked
@@ -45,9 +44,10 @@ async def main():
         "silla de oficina"          # Generic
     ]
     
-    for q in queries:
-        await test_query(scraper, q)
-        await asyncio.sleep(2) # Polite delay
+    async with MLWebScraper() as scraper:
+        for q in queries:
+            await test_query(scraper, q)
+            await asyncio.sleep(2) # Polite delay
 
 if __name__ == "__main__":
     asyncio.run(main())
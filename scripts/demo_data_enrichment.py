@@ -84,6 +84,8 @@ async def main():
     except Exception as e:
         print(f"❌ Error extracting product: {e}")
         return
+    finally:
+        await scraper.aclose()
     
     # Step 2: Enrich product data
     print_section("Step 2: Enriching Product Data with Detailed Analysis")
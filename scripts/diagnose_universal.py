@@ -11,27 +11,22 @@ from app.agents.pricing_pipeline import PricingPipeline
 from app.core.config import settings
 
 # FORCE API KEY FROM ENV (for CLI script usage)
-# Try loading from .env manually if needed, or just set a dummy key to test scraper behavior (LLM will fail but match might run partially)
-if not settings.OPENAI_API_KEY:
-    import os
-    k = os.getenv("OPENAI_API_KEY")
-    if k:
-        settings.OPENAI_API_KEY = k
-    else:
-        # Try reading .env manually
-        try:
-            with open(".env", "r") as f:
-                for line in f:
-                    if line.startswith("OPENAI_API_KEY="):
-                        settings.OPENAI_API_KEY = line.split("=", 1)[1].strip()
-                        print("Loaded API Key from .env")
-                        break
-        except:
-             pass
+# Settings are frozen, so expose the key through the environment; agents fall back to
+# os.getenv("OPENAI_API_KEY") when settings.OPENAI_API_KEY is empty.
+if not settings.OPENAI_API_KEY and not os.getenv("OPENAI_API_KEY"):
+    # Try reading .env manually
+    try:
+        with open(".env", "r") as f:
+            for line in f:
+                if line.startswith("OPENAI_API_KEY="):
+                    os.environ["OPENAI_API_KEY"] = line.split("=", 1)[1].strip()
+                    print("Loaded API Key from .env")
+                    break
+    except:
+         pass
 
-    if not settings.OPENAI_API_KEY:
+    if not os.getenv("OPENAI_API_KEY"):
          print("WARNING: No API KEY found. Setting dummy key to allow initialization (Verification will fail).")
-         settings.OPENAI_API_KEY = "sk-dummy-key-for-diagnosis"
          os.environ["OPENAI_API_KEY"] = "sk-dummy-key-for-diagnosis"
 
 async def diagnose():
@@ -29,6 +29,8 @@ async def test_scraper():
     except Exception as e:
         print(f"[ERROR] {str(e)}")
         return False
+    finally:
+        await scraper.aclose()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,194 @@
+"""
+Tests for the bulk catalog analysis endpoints.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents.pricing_pipeline import PricingPipeline
+from app.api.endpoints.products import _analyze_catalog_product, bulk_analyze_catalog_stream
+from app.core.token_costs import get_tracker
+
+# LLM calls each fake analysis makes, keyed by product URL
+LLM_CALLS = {
+    "https://www.mercadolibre.com.mx/bocina-a/p/MLM1": 2,
+    "https://www.mercadolibre.com.mx/bocina-b/p/MLM2": 5,
+}
+
+
+async def fake_analyze_from_url(product_url, *args, **kwargs):
+    """Stand-in for the URL workflow: records LLM calls, yielding between them."""
+    for _ in range(LLM_CALLS[product_url]):
+        await asyncio.sleep(0)  # Let the other analysis interleave its calls
+        get_tracker().add_call(model="gpt-4o-mini", input_tokens=100, output_tokens=10)
+    summary = get_tracker().get_summary()
+    return {
+        "final_recommendation": {"recommended_price": 1000.0},
+        "pipeline_steps": {"pivot_product": {"price": 1100.0}},
+        "errors": [],
+        "token_usage": {
+            "input_tokens": summary["total_input_tokens"],
+            "output_tokens": summary["total_output_tokens"],
+            "total_cost_usd": summary["total_cost_usd"],
+            "api_calls": summary["total_calls"],
+        },
+    }
+
+
+@pytest.fixture
+def pipeline():
+    """PricingPipeline with the URL workflow replaced (no scraping or LLM)."""
+    pipeline = PricingPipeline.__new__(PricingPipeline)
+    pipeline._analyze_from_url = fake_analyze_from_url
+    return pipeline
+
+
+def make_product(product_id, url):
+    return SimpleNamespace(
+        id=product_id,
+        sku=f"SKU{product_id}",
+        title=f"Producto {product_id}",
+        ml_url=url,
+        cost_price=500,
+    )
+
+
+@pytest.mark.asyncio
+class TestConcurrentTokenTracking:
+    """Concurrent analyses must not share or reset each other's token usage."""
+
+    async def test_concurrent_analyses_keep_separate_totals(self, pipeline):
+        """Each analysis reports only its own LLM calls."""
+        results = await asyncio.gather(*(
+            pipeline.analyze_product(product_input=url, cost_price=500)
+            for url in LLM_CALLS
+        ))
+
+        for url, result in zip(LLM_CALLS, results, strict=True):
+            assert result["token_usage"]["api_calls"] == LLM_CALLS[url]
+            assert result["token_usage"]["input_tokens"] == 100 * LLM_CALLS[url]
+
+    async def test_bulk_entries_carry_their_own_usage(self, pipeline):
+        """Bulk result entries report the usage of their own product."""
+        products = [make_product(i, url) for i, url in enumerate(LLM_CALLS, 1)]
+        semaphore = asyncio.Semaphore(len(products))
+
+        results = await asyncio.gather(*(
+            _analyze_catalog_product(pipeline, semaphore, product, idx, len(products), 0.30, 25)
+            for idx, product in enumerate(products, 1)
+        ))
+
+        for product, entry in zip(products, results, strict=True):
+            assert entry["status"] == "success"
+            assert entry["token_usage"]["api_calls"] == LLM_CALLS[product.ml_url]
+            assert entry["token_usage"]["output_tokens"] == 10 * LLM_CALLS[product.ml_url]
+
+    async def test_analysis_does_not_touch_callers_tracker(self, pipeline):
+        """The caller's tracker is neither reset nor charged by an analysis."""
+        outer = get_tracker()
+        outer.add_call(model="gpt-4o-mini", input_tokens=1, output_tokens=1)
+
+        await pipeline.analyze_product(product_input=next(iter(LLM_CALLS)))
+
+        assert get_tracker() is outer
+        assert outer.get_summary()["total_calls"] == 1
+
+
+@pytest.mark.asyncio
+class TestBulkAnalyzeStream:
+    """Test suite for the Server-Sent Events bulk endpoint."""
+
+    async def read_events(self, pipeline, products):
+        """Run the streaming endpoint and return its decoded SSE payloads."""
+        session = MagicMock(close=AsyncMock())
+        with patch("app.api.endpoints.products._query_bulk_products", return_value=products), \
+                patch("app.api.endpoints.products.create_scraper_session", return_value=session), \
+                patch("app.api.endpoints.products.PricingPipeline", return_value=pipeline):
+            response = await bulk_analyze_catalog_stream(
+                product_ids=None,
+                category=None,
+                concurrency=2,
+                search_complexity_threshold=None,
+                db=None,
+            )
+            chunks = [chunk async for chunk in response.body_iterator]
+
+        session.close.assert_awaited_once()
+        events = []
+        for chunk in chunks:
+            assert chunk.startswith("data: ") and chunk.endswith("\n\n")
+            data = chunk[len("data: "):-2]
+            events.append(data if data == "[DONE]" else json.loads(data))
+        return events
+
+    async def test_event_order(self, pipeline):
+        """started, one event per product, completed, then [DONE]."""
+        products = [make_product(i, url) for i, url in enumerate(LLM_CALLS, 1)]
+
+        events = await self.read_events(pipeline, products)
+
+        assert events[0] == {"status": "started", "total": 2}
+        results = events[1:-2]
+        assert sorted(r["product_id"] for r in results) == [1, 2]
+        assert all(r["status"] == "success" for r in results)
+        assert events[-2]["status"] == "completed"
+        assert events[-2]["analyzed"] == 2
+        assert events[-2]["successful"] == 2
+        assert events[-1] == "[DONE]"
+
+    async def test_results_carry_their_own_usage(self, pipeline):
+        """Streamed results report the usage of their own product."""
+        products = [make_product(i, url) for i, url in enumerate(LLM_CALLS, 1)]
+        urls = {product.id: product.ml_url for product in products}
+
+        events = await self.read_events(pipeline, products)
+
+        for result in events[1:-2]:
+            assert result["token_usage"]["api_calls"] == LLM_CALLS[urls[result["product_id"]]]
+
+    async def test_no_products(self, pipeline):
+        """An empty selection still opens and closes the stream."""
+        events = await self.read_events(pipeline, [])
+
+        assert events[0] == {"status": "started", "total": 0}
+        assert events[1]["status"] == "completed"
+        assert events[1]["analyzed"] == 0
+        assert events[2] == "[DONE]"
+
+    async def test_disconnect_after_started_cancels_analyses(self):
+        """Closing the stream after the first event cancels work and closes the session."""
+        products = [make_product(i, f"https://www.mercadolibre.com.mx/p/MLM{i}") for i in range(1, 4)]
+        started, cancelled = [], []
+
+        async def blocked_analysis(product_url, *args, **kwargs):
+            started.append(product_url)
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(product_url)
+                raise
+
+        pipeline = PricingPipeline.__new__(PricingPipeline)
+        pipeline._analyze_from_url = blocked_analysis
+        session = MagicMock(close=AsyncMock())
+        with patch("app.api.endpoints.products._query_bulk_products", return_value=products), \
+                patch("app.api.endpoints.products.create_scraper_session", return_value=session), \
+                patch("app.api.endpoints.products.PricingPipeline", return_value=pipeline):
+            response = await bulk_analyze_catalog_stream(
+                product_ids=None,
+                category=None,
+                concurrency=2,
+                search_complexity_threshold=None,
+                db=None,
+            )
+            body = response.body_iterator
+            first = await body.__anext__()
+            await asyncio.sleep(0)  # Let the analyses start
+            await body.aclose()
+
+        assert json.loads(first[len("data: "):-2]) == {"status": "started", "total": 3}
+        assert started and sorted(cancelled) == sorted(started)
+        session.close.assert_awaited_once()
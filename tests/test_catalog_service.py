@@ -0,0 +1,204 @@
+"""
+Tests for CatalogService loading, indexes and search.
+"""
+import os
+import random
+import threading
+
+import pytest
+
+from app.services.catalog_service import CatalogProduct, CatalogService, _build_snapshot
+
+CSV_HEADER = "Id_Articulo,Marca,Linea,Titulo,Ubicacion,enlace,costo\n"
+
+
+def linear_search(products, query):
+    """Reference implementation: the original per-product scan."""
+    query_lower = query.lower()
+    return [
+        p for p in products
+        if query_lower in p.titulo.lower() or query_lower in p.id_articulo.lower()
+    ]
+
+
+def random_catalog(rng, size):
+    alphabet = "abcAB 12-ñ"
+    return [
+        CatalogProduct(
+            id_articulo=f"{rng.choice(['ACB', 'MEZ', 'Bo'])}-{rng.randint(0, 99):02d}",
+            marca=rng.choice(["FUSSION", "Louder", "WAHRGENOMEN"]),
+            linea=rng.choice(["BOCINAS", "ACCESORIOS"]),
+            titulo="".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))),
+            ubicacion="C01",
+            enlace="https://articulo.mercadolibre.com.mx/MLM-1",
+            costo=float(rng.randint(1, 5000)),
+        )
+        for _ in range(size)
+    ]
+
+
+def make_service(products):
+    """CatalogService holding the given products (bypasses the CSV singleton)."""
+    service = object.__new__(CatalogService)
+    service._snapshot = _build_snapshot(products, None)
+    return service
+
+
+@pytest.fixture
+def catalog_csv(tmp_path, monkeypatch):
+    """Point CatalogService at a temporary CSV and reset the singleton."""
+    path = tmp_path / "productos_catalogo.csv"
+    monkeypatch.setattr(CatalogService, "get_catalog_path", staticmethod(lambda: path))
+    monkeypatch.setattr(CatalogService, "_instance", None)
+    return path
+
+
+def write_catalog(path, rows, mtime=None):
+    path.write_text(CSV_HEADER + "".join(rows), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestSearch:
+    """search_products must match the original linear scan."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_linear_scan(self, seed):
+        rng = random.Random(seed)
+        products = random_catalog(rng, rng.randint(0, 60))
+        service = make_service(products)
+        queries = ["", "a", "ab", "B", "1", "-", "ñ", " ", "acb-", "zzz"]
+        queries += ["".join(rng.choice("abAB 12-") for _ in range(rng.randint(1, 4))) for _ in range(30)]
+
+        for query in queries:
+            assert service.search_products(query) == linear_search(products, query), query
+
+    def test_query_cannot_span_title_and_id(self):
+        product = CatalogProduct("ACB-1", "M", "L", "tripie", "C1", "https://ml/1", 1.0)
+        service = make_service([product])
+
+        assert service.search_products("tripie") == [product]
+        assert service.search_products("ieacb") == []
+        assert service.search_products("\x00") == []
+        assert service.search_products("\x01") == []
+
+    def test_empty_catalog(self):
+        assert make_service([]).search_products("bocina") == []
+
+
+class TestLoading:
+    """CSV loading and change detection."""
+
+    def test_load_and_indexes(self, catalog_csv):
+        write_catalog(catalog_csv, [
+            "ACB-1,FUSSION,ACCESORIOS,Tripie para bafle,C11,https://ml/1,\"$1,155.50\"\n",
+            "MEZ-2,Louder,MEZCLADORAS,Interfaz USB,C05,https://ml/2,$139.71\n",
+            "SIN-3,Louder,MEZCLADORAS,Sin enlace,C05,,$10\n",
+        ])
+
+        service = CatalogService()
+
+        assert [p.id_articulo for p in service.get_all_products()] == ["ACB-1", "MEZ-2"]
+        assert service.get_product_by_id("ACB-1").costo == 1155.50
+        assert [p.id_articulo for p in service.get_products_by_marca("louder")] == ["MEZ-2"]
+        assert service.get_marcas() == ["FUSSION", "Louder"]
+        assert [p.id_articulo for p in service.search_products("TRIPIE")] == ["ACB-1"]
+
+    def test_blank_cost_row_skipped(self, catalog_csv):
+        """A row with an empty costo is an error, not a $0 product."""
+        write_catalog(catalog_csv, [
+            "ACB-1,FUSSION,ACC,Tripie,C11,https://ml/1,$1\n",
+            "MEZ-2,Louder,MEZ,Interfaz,C05,https://ml/2,\n",
+            "MEZ-3,Louder,MEZ,Mezcladora,C05,https://ml/3,$3\n",
+        ])
+
+        service = CatalogService()
+
+        assert [p.id_articulo for p in service.get_all_products()] == ["ACB-1", "MEZ-3"]
+
+    def test_missing_cost_column_defaults_to_zero(self, catalog_csv):
+        catalog_csv.write_text(
+            "Id_Articulo,Marca,Linea,Titulo,Ubicacion,enlace\n"
+            "ACB-1,FUSSION,ACC,Tripie,C11,https://ml/1\n",
+            encoding="utf-8",
+        )
+
+        service = CatalogService()
+
+        assert service.get_product_by_id("ACB-1").costo == 0.0
+
+    def test_reload_if_changed(self, catalog_csv):
+        write_catalog(catalog_csv, ["ACB-1,FUSSION,ACC,Tripie,C11,https://ml/1,$1\n"], mtime=1_000_000)
+        service = CatalogService()
+
+        assert service.reload_if_changed() is False
+
+        write_catalog(catalog_csv, ["MEZ-2,Louder,MEZ,Interfaz,C05,https://ml/2,$2\n"], mtime=2_000_000)
+
+        assert service.reload_if_changed() is True
+        assert [p.id_articulo for p in service.search_products("")] == ["MEZ-2"]
+        assert service.reload_if_changed() is False
+
+    def test_reload_skipped_when_csv_missing(self, catalog_csv):
+        """A CSV that is briefly missing keeps the current catalog."""
+        write_catalog(catalog_csv, ["ACB-1,FUSSION,ACC,Tripie,C11,https://ml/1,$1\n"], mtime=1_000_000)
+        service = CatalogService()
+        catalog_csv.unlink()
+
+        assert service.reload_if_changed() is False
+        assert [p.id_articulo for p in service.get_all_products()] == ["ACB-1"]
+
+    def test_concurrent_reload_loads_once(self, catalog_csv, monkeypatch):
+        """Only the thread that actually reloads reports True."""
+        write_catalog(catalog_csv, ["ACB-1,FUSSION,ACC,Tripie,C11,https://ml/1,$1\n"], mtime=1_000_000)
+        service = CatalogService()
+        write_catalog(catalog_csv, ["MEZ-2,Louder,MEZ,Interfaz,C05,https://ml/2,$2\n"], mtime=2_000_000)
+        loads = []
+        load_catalog = CatalogService.load_catalog
+        monkeypatch.setattr(CatalogService, "load_catalog", lambda self: (loads.append(1), load_catalog(self)))
+        barrier = threading.Barrier(4)
+        results = []
+
+        def reload():
+            barrier.wait()
+            results.append(service.reload_if_changed())
+
+        threads = [threading.Thread(target=reload) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(loads) == 1
+        assert sorted(results) == [False, False, False, True]
+
+    def test_search_during_reload_sees_one_snapshot(self, catalog_csv):
+        """Readers never mix offsets of one load with products of another."""
+        big = [f"ID-{i},M,L,bocina {i},C1,https://ml/{i},$1\n" for i in range(300)]
+        small = ["ID-0,M,L,bocina 0,C1,https://ml/0,$1\n"]
+        write_catalog(catalog_csv, big, mtime=1_000_000)
+        service = CatalogService()
+        failures = []
+        stop = threading.Event()
+
+        def search():
+            while not stop.is_set():
+                try:
+                    found = service.search_products("bocina")
+                    assert len(found) in (1, 300)
+                    assert all(p.titulo.startswith("bocina") for p in found)
+                except Exception as exc:  # Collected for the assertion below
+                    failures.append(exc)
+                    return
+
+        reader = threading.Thread(target=search)
+        reader.start()
+        try:
+            for i in range(50):
+                write_catalog(catalog_csv, small if i % 2 == 0 else big, mtime=2_000_000 + i)
+                service.reload_if_changed()
+        finally:
+            stop.set()
+            reader.join()
+
+        assert not failures
@@ -0,0 +1,160 @@
+"""
+Tests for ProductMatchingAgent result caching.
+"""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.agents import product_matching
+from app.agents.product_matching import ProductClassification, ProductMatchingAgent
+
+OFFERS = [
+    {"item_id": "MLM1", "title": "Bocina 15 pulgadas 500W", "price": 2500.0, "image_url": "https://img/1.jpg"},
+    {"item_id": "MLM2", "title": "Cable XLR 6m", "price": 150.0, "image_url": "https://img/2.jpg"},
+]
+
+
+def classification(offer, comparable=True, degraded=False):
+    return ProductClassification(
+        item_id=offer["item_id"],
+        title=offer["title"],
+        is_comparable=comparable,
+        is_accessory=False,
+        is_bundle=False,
+        confidence=0.9,
+        reason="Heuristic Fallback" if degraded else "LLM decision",
+        degraded=degraded,
+    )
+
+
+def final_state(state, degraded=False, errors=()):
+    """Graph output: first offer comparable, second excluded."""
+    offers = state["raw_offers"]
+    return {
+        **state,
+        "classified_offers": [
+            classification(offers[0], degraded=degraded),
+            classification(offers[1], comparable=False, degraded=degraded),
+        ],
+        "comparable_offers": [offers[0]],
+        "excluded_count": 1,
+        "degraded": degraded,
+        "errors": list(errors),
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    product_matching._MATCH_CACHE.clear()
+    yield
+    product_matching._MATCH_CACHE.clear()
+
+
+def make_agent(**final_state_kwargs):
+    """Agent whose graph returns a canned final state (no LLM/embeddings)."""
+    agent = ProductMatchingAgent.__new__(ProductMatchingAgent)
+    agent.graph = MagicMock()
+    agent.graph.ainvoke = AsyncMock(side_effect=lambda state: final_state(state, **final_state_kwargs))
+    return agent
+
+
+@pytest.mark.asyncio
+class TestMatchCache:
+    """Test suite for the matching result cache."""
+
+    async def test_repeat_run_served_from_cache(self):
+        """Same inputs skip the graph on the second run."""
+        agent = make_agent()
+
+        first = await agent.execute("Bocina 15 500W", OFFERS, 2400.0)
+        second = await agent.execute("Bocina 15 500W", OFFERS, 2400.0)
+
+        assert agent.graph.ainvoke.await_count == 1
+        assert second == first
+        assert second["comparable_count"] == 1
+        assert second["degraded"] is False
+
+    async def test_cached_result_is_a_copy(self):
+        """Mutating a returned result does not alter the cached one."""
+        agent = make_agent()
+
+        first = await agent.execute("Bocina 15 500W", OFFERS, 2400.0)
+        first["comparable_offers"].clear()
+        second = await agent.execute("Bocina 15 500W", OFFERS, 2400.0)
+
+        assert len(second["comparable_offers"]) == 1
+
+    async def test_degraded_result_not_cached(self):
+        """Fallback verdicts are returned but never replayed from the cache."""
+        agent = make_agent(degraded=True)
+
+        result = await agent.execute("Bocina 15 500W", OFFERS, 2400.0)
+        await agent.execute("Bocina 15 500W", OFFERS, 2400.0)
+
+        assert result["degraded"] is True
+        assert agent.graph.ainvoke.await_count == 2
+        assert not product_matching._MATCH_CACHE
+
+    async def test_result_with_errors_not_cached(self):
+        """Runs that reported errors are not cached."""
+        agent = make_agent(errors=["No offers received from scraper"])
+
+        await agent.execute("Bocina 15 500W", OFFERS, 2400.0)
+        await agent.execute("Bocina 15 500W", OFFERS, 2400.0)
+
+        assert agent.graph.ainvoke.await_count == 2
+
+    async def test_offer_image_changes_key(self):
+        """A different offer image is a different input for vision classification."""
+        agent = make_agent()
+        reimaged = [{**OFFERS[0], "image_url": "https://img/other.jpg"}, OFFERS[1]]
+
+        await agent.execute("Bocina 15 500W", OFFERS, 2400.0)
+        await agent.execute("Bocina 15 500W", reimaged, 2400.0)
+
+        assert agent.graph.ainvoke.await_count == 2
+
+    async def test_offer_order_does_not_change_key(self):
+        """The fingerprint ignores offer order."""
+        agent = make_agent()
+
+        await agent.execute("Bocina 15 500W", OFFERS, 2400.0)
+        await agent.execute("Bocina 15 500W", OFFERS[::-1], 2400.0)
+
+        assert agent.graph.ainvoke.await_count == 1
+
+
+@pytest.mark.asyncio
+class TestClassificationFallbacks:
+    """Fallback classification paths are flagged as degraded."""
+
+    @pytest.fixture
+    def agent(self):
+        agent = ProductMatchingAgent.__new__(ProductMatchingAgent)
+        agent.llm = MagicMock()
+        return agent
+
+    async def test_llm_error_uses_degraded_heuristic(self, agent):
+        agent.llm.ainvoke = AsyncMock(side_effect=RuntimeError("rate limited"))
+
+        result = await agent._classify_single_product("Bocina 15 500W", OFFERS[0])
+
+        assert result.reason == "Heuristic Fallback"
+        assert result.degraded is True
+
+    async def test_unparseable_reply_is_degraded(self, agent):
+        agent.llm.ainvoke = AsyncMock(return_value=MagicMock(content="looks comparable to me", response_metadata={}))
+
+        result = await agent._classify_single_product("Bocina 15 500W", OFFERS[0])
+
+        assert result.reason == "Regex fallback"
+        assert result.degraded is True
+
+    async def test_llm_verdict_is_not_degraded(self, agent):
+        reply = '{"classification": "comparable", "confidence": 0.8, "reason": "same family"}'
+        agent.llm.ainvoke = AsyncMock(return_value=MagicMock(content=reply, response_metadata={}))
+
+        result = await agent._classify_single_product("Bocina 15 500W", OFFERS[0])
+
+        assert result.is_comparable is True
+        assert result.degraded is False
@@ -0,0 +1,68 @@
+"""
+Tests for SearchStrategyAgent simple-product routing.
+"""
+import inspect
+
+import pytest
+
+from app.agents.pricing_pipeline import PricingPipeline
+from app.agents.search_strategy import BULK_COMPLEXITY_THRESHOLD, SearchStrategyAgent
+from app.api.endpoints.products import bulk_analyze_catalog, bulk_analyze_catalog_stream
+from app.mcp_servers.mercadolibre.scraper import ProductDetails
+
+
+def make_product(attributes, description=None):
+    return ProductDetails(
+        product_id="MLM1",
+        title="Bocina 15 pulgadas 500W",
+        price=2500.0,
+        currency="MXN",
+        condition="new",
+        brand="Louder",
+        model=None,
+        category=None,
+        attributes=attributes,
+        description=description,
+        images=[],
+        seller_name=None,
+        permalink="https://www.mercadolibre.com.mx/p/MLM1",
+    )
+
+
+def make_agent(threshold):
+    agent = SearchStrategyAgent.__new__(SearchStrategyAgent)
+    agent.complexity_threshold = threshold
+    return agent
+
+
+class TestRouting:
+    """Routing is opt-in and only applies to products with known attributes."""
+
+    def test_off_by_default(self):
+        for func in (SearchStrategyAgent.__init__, PricingPipeline.__init__):
+            params = inspect.signature(func).parameters
+            threshold = params.get("complexity_threshold") or params["search_complexity_threshold"]
+            assert threshold.default is None
+
+    def test_bulk_endpoints_opt_in(self):
+        for endpoint in (bulk_analyze_catalog, bulk_analyze_catalog_stream):
+            query = inspect.signature(endpoint).parameters["search_complexity_threshold"].default
+            assert query.default == BULK_COMPLEXITY_THRESHOLD
+
+    @pytest.mark.parametrize("threshold", [None, 0])
+    def test_disabled_never_routes(self, threshold):
+        assert not make_agent(threshold)._is_simple(make_product({"Potencia": "500W"}))
+
+    def test_few_attributes_routed(self):
+        assert make_agent(3)._is_simple(make_product({"Potencia": "500W", "Tamaño": "15"}))
+
+    def test_unknown_attributes_not_routed(self):
+        """JSON-LD / search-bypass products carry no attributes at all."""
+        assert not make_agent(3)._is_simple(make_product({}))
+
+    def test_many_attributes_not_routed(self):
+        attributes = {f"Spec {i}": str(i) for i in range(4)}
+        assert not make_agent(3)._is_simple(make_product(attributes))
+
+    def test_long_description_not_routed(self):
+        assert not make_agent(3)._is_simple(make_product({"Potencia": "500W"}, "x" * 201))
@@ -0,0 +1,75 @@
+"""
+Tests for the Redis-backed semantic LLM cache wrapper.
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.core import semantic_cache
+from app.core.semantic_cache import SemanticLLMCache
+
+
+@pytest.fixture
+def redis_enabled(monkeypatch):
+    settings = semantic_cache.settings.model_copy(update={"REDIS_ENABLED": True})
+    monkeypatch.setattr(semantic_cache, "settings", settings)
+
+
+@pytest.fixture
+def redisvl_cache(redis_enabled):
+    """Patch redisvl's SemanticCache and vectorizer at the import path the wrapper uses."""
+    with patch("redisvl.extensions.cache.llm.SemanticCache") as cache_cls, \
+            patch("redisvl.utils.vectorize.OpenAITextVectorizer") as vectorizer_cls:
+        yield cache_cls, vectorizer_cls
+
+
+class TestSemanticLLMCache:
+    """SemanticLLMCache must build a real redisvl cache when Redis is enabled."""
+
+    def test_disabled_without_redis(self, monkeypatch):
+        settings = semantic_cache.settings.model_copy(update={"REDIS_ENABLED": False})
+        monkeypatch.setattr(semantic_cache, "settings", settings)
+
+        assert SemanticLLMCache("search_strategy").enabled is False
+
+    def test_builds_redisvl_cache(self, redisvl_cache):
+        cache_cls, vectorizer_cls = redisvl_cache
+
+        cache = SemanticLLMCache("search_strategy", distance_threshold=0.1, ttl=60)
+
+        assert cache.enabled
+        kwargs = cache_cls.call_args.kwargs
+        assert kwargs["name"] == "search_strategy"
+        assert kwargs["redis_url"] == semantic_cache.settings.REDIS_URL
+        assert kwargs["distance_threshold"] == 0.1
+        assert kwargs["ttl"] == 60
+        assert kwargs["vectorizer"] is vectorizer_cls.return_value
+
+    def test_check_and_store_round_trip(self, redisvl_cache):
+        cache_cls, _ = redisvl_cache
+        backend = cache_cls.return_value
+        cache = SemanticLLMCache("search_strategy")
+        response = {"primary_search": "bocina 15 pulgadas"}
+
+        cache.store("prompt", response)
+        backend.check.return_value = [{"response": backend.store.call_args.kwargs["response"]}]
+
+        assert json.loads(backend.store.call_args.kwargs["response"]) == response
+        assert cache.check("similar prompt") == response
+
+    def test_miss_returns_none(self, redisvl_cache):
+        cache_cls, _ = redisvl_cache
+        cache_cls.return_value.check.return_value = []
+
+        assert SemanticLLMCache("search_strategy").check("prompt") is None
+
+    def test_connection_failure_disables_cache(self, redisvl_cache):
+        cache_cls, _ = redisvl_cache
+        cache_cls.side_effect = ConnectionError("Redis unavailable")
+
+        cache = SemanticLLMCache("search_strategy")
+
+        assert cache.enabled is False
+        assert cache.check("prompt") is None
+        cache.store("prompt", {"a": 1})  # No-op, no exception
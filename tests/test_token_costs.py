@@ -0,0 +1,52 @@
+"""
+Tests for token cost calculation.
+"""
+import random
+
+import pytest
+
+from app.core.token_costs import TokenUsage, compute_costs
+
+
+class TestComputeCosts:
+    """Bulk costing must price every call exactly like TokenUsage."""
+
+    def test_priced_unpriced_and_cached_models(self):
+        calls = [
+            ("gpt-4o", 1000, 200, 400),           # Priced, with a cached-input rate
+            ("gpt-4o-mini", 5000, 50, 0),
+            ("gpt-4-turbo", 300, 30, 100),        # Cached input billed at the input rate
+            ("text-embedding-3-small", 800, 0, 0),
+            ("some-future-model", 1000, 1000, 0), # Unpriced: zero cost
+        ]
+        models, ins, outs, cached = zip(*calls, strict=True)
+
+        costs = compute_costs(models, ins, outs, cached)
+
+        expected = [TokenUsage(*call).total_cost_usd for call in calls]
+        assert costs.tolist() == pytest.approx(expected, rel=1e-12)
+        assert costs[-1] == 0.0
+
+    def test_cached_tokens_default_to_zero(self):
+        costs = compute_costs(["gpt-4o", "gpt-4o"], [1000, 2000], [10, 20])
+
+        assert costs.tolist() == pytest.approx([
+            TokenUsage("gpt-4o", 1000, 10).total_cost_usd,
+            TokenUsage("gpt-4o", 2000, 20).total_cost_usd,
+        ], rel=1e-12)
+
+    def test_random_usage_log(self):
+        rng = random.Random(0)
+        models = ["gpt-4o", "gpt-4o-mini", "gpt-3.5-turbo", "text-embedding-3-large", "unknown"]
+        calls = []
+        for _ in range(500):
+            input_tokens = rng.randint(0, 20000)
+            calls.append((rng.choice(models), input_tokens, rng.randint(0, 4000), rng.randint(0, input_tokens)))
+        models_col, ins, outs, cached = zip(*calls, strict=True)
+
+        costs = compute_costs(models_col, ins, outs, cached)
+
+        assert costs.tolist() == pytest.approx([TokenUsage(*call).total_cost_usd for call in calls], rel=1e-12)
+
+    def test_empty_log(self):
+        assert compute_costs([], [], []).tolist() == []
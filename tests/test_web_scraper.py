@@ -0,0 +1,149 @@
+"""
+Tests for MLWebScraper helpers: JS object scanning and the page fetch cache.
+"""
+import asyncio
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.mcp_servers.mercadolibre import scraper
+from app.mcp_servers.mercadolibre.scraper import MLWebScraper, extract_js_object_by_brackets
+
+
+def char_scan(text, start_idx):
+    """Reference implementation: the original per-character bracket scan."""
+    i = start_idx
+    if i < 0 or i >= len(text) or text[i] != "{":
+        return None
+    depth = 0
+    in_str = False
+    esc = False
+    quote = ""
+    for j in range(i, len(text)):
+        ch = text[j]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == quote:
+                in_str = False
+            continue
+        if ch in ("'", '"'):
+            in_str = True
+            quote = ch
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[i:j + 1]
+    return None
+
+
+class TestExtractJsObject:
+    """The token scanner must match the original character loop."""
+
+    @pytest.mark.parametrize("seed", range(50))
+    def test_matches_char_scan(self, seed):
+        rng = random.Random(seed)
+        alphabet = ['{', '}', '"', "'", '\\', 'a', ':', ',', ' ', '\n']
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+        starts = [i for i, ch in enumerate(text) if ch == "{"] + [-1, 0, len(text)]
+
+        for start in starts:
+            assert extract_js_object_by_brackets(text, start) == char_scan(text, start), (text, start)
+
+    @pytest.mark.parametrize("text", [
+        'window.__PRELOADED_STATE__ = {"a": {"b": "}"}, "c": \'{\'};',
+        '{"escaped": "quote \\" and brace }"}',
+        '{"unterminated": "never closes}',
+        '{"trailing backslash": "\\',
+        '{{}',
+    ])
+    def test_edge_cases(self, text):
+        start = text.index("{")
+        assert extract_js_object_by_brackets(text, start) == char_scan(text, start)
+
+
+@pytest.fixture
+def fetch_scraper(monkeypatch):
+    """Scraper whose network layer is a counting stub."""
+    monkeypatch.setattr(scraper, "create_scraper_session", MagicMock())
+    instance = MLWebScraper()
+    instance.fetches = []
+
+    async def fetch(client, url, max_retries, base_delay):
+        instance.fetches.append(url)
+        await asyncio.sleep(0)  # Let concurrent callers find the in-flight request
+        if "missing" in url:
+            raise Exception(f"404 Not Found: {url}")
+        return f"<html>{url}</html>"
+
+    instance._fetch_with_retries = fetch
+    return instance
+
+
+@pytest.mark.asyncio
+class TestFetchCache:
+    """Recent fetches are cached and concurrent fetches are coalesced."""
+
+    async def test_concurrent_fetches_share_one_request(self, fetch_scraper):
+        url = "https://listado.mercadolibre.com.mx/bocina"
+
+        pages = await asyncio.gather(*(fetch_scraper._fetch_url(url) for _ in range(5)))
+
+        assert fetch_scraper.fetches == [url]
+        assert pages == [f"<html>{url}</html>"] * 5
+
+    async def test_repeat_fetch_served_from_cache(self, fetch_scraper):
+        url = "https://listado.mercadolibre.com.mx/bocina"
+
+        first = await fetch_scraper._fetch_url(url)
+        second = await fetch_scraper._fetch_url(url)
+
+        assert first == second
+        assert fetch_scraper.fetches == [url]
+
+    async def test_expired_entry_refetched(self, fetch_scraper, monkeypatch):
+        url = "https://listado.mercadolibre.com.mx/bocina"
+        now = [1000.0]
+        monkeypatch.setattr(scraper.time, "monotonic", lambda: now[0])
+
+        await fetch_scraper._fetch_url(url)
+        now[0] += scraper.FETCH_CACHE_TTL + 1
+        await fetch_scraper._fetch_url(url)
+
+        assert fetch_scraper.fetches == [url, url]
+
+    async def test_failures_not_cached(self, fetch_scraper):
+        url = "https://articulo.mercadolibre.com.mx/missing"
+
+        for _ in range(2):
+            with pytest.raises(Exception, match="404"):
+                await fetch_scraper._fetch_url(url)
+
+        assert fetch_scraper.fetches == [url, url]
+        assert not fetch_scraper._inflight
+
+    async def test_cache_bounded(self, fetch_scraper, monkeypatch):
+        monkeypatch.setattr(scraper, "FETCH_CACHE_MAX_ENTRIES", 2)
+        urls = [f"https://listado.mercadolibre.com.mx/q{i}" for i in range(3)]
+
+        for url in urls:
+            await fetch_scraper._fetch_url(url)
+
+        assert list(fetch_scraper._fetch_cache) == urls[1:]
+
+    async def test_cancelled_caller_does_not_abort_shared_fetch(self, fetch_scraper):
+        url = "https://listado.mercadolibre.com.mx/bocina"
+        cancelled = asyncio.ensure_future(fetch_scraper._fetch_url(url))
+        waiting = asyncio.ensure_future(fetch_scraper._fetch_url(url))
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+
+        assert await waiting == f"<html>{url}</html>"
+        assert fetch_scraper.fetches == [url]
@@ -20,8 +20,8 @@ def validate_files():
         "pricing_pipeline.py": {
             "path": backend_root / "app/agents/pricing_pipeline.py",
             "checks": [
-                ("reset_tracker import", "from app.core.token_costs import get_tracker, reset_tracker"),
-                ("reset_tracker call", "reset_tracker()"),
+                ("tracking_scope import", "from app.core.token_costs import get_tracker, tracking_scope"),
+                ("tracking_scope block", "with tracking_scope():"),
                 ("token_usage capture", 'result["token_usage"]'),
             ]
         },